@@ -1,9 +1,20 @@
 import streamlit as st
 import pandas as pd
-from io import BytesIO
-import sqlite3
 from datetime import datetime
-import re
+import itertools
+from collections import Counter
+
+from app.db import get_engine
+from app.models import ReservationStatus
+from config import QUERY_CACHE_MAX_ENTRIES, RESERVATION_PAGE_SIZE
+from export import EXPORT_FORMATS, export_reservations
+from ingest import load_performance_info, parse_files_parallel
+from platforms import PLATFORM_PROFILES
+from storage import (
+    CANCELLED_STATUS, STATUS_LABELS, count_reservations, create_schema, fetch_catalog_version,
+    fetch_data_version, fetch_performance_names, fetch_performance_sessions, fetch_reservation_page,
+    fetch_summary, save_reservations, status_label,
+)
 
 # 페이지 설정
 st.set_page_config(
@@ -12,46 +23,18 @@ st.set_page_config(
     layout="wide"
 )
 
+# 예약 리스트 표시 컬럼
+RESERVATION_COLUMNS = ['예매처', '예매번호', '예매자명', '연락처', '좌석정보', '매수', '배정상태']
+
 # 데이터베이스 초기화
 @st.cache_resource
 def init_db():
-    """데이터베이스 초기화"""
-    conn = sqlite3.connect('ticketz.db', check_same_thread=False)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS performances (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            performance_name TEXT NOT NULL,
-            performance_date TEXT NOT NULL,
-            performance_time TEXT NOT NULL,
-            created_at TEXT NOT NULL,
-            updated_at TEXT NOT NULL,
-            total_reservations INTEGER DEFAULT 0,
-            UNIQUE(performance_name, performance_date, performance_time)
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS reservations (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            performance_id INTEGER NOT NULL,
-            platform TEXT NOT NULL,
-            reservation_number TEXT,
-            name TEXT,
-            phone TEXT,
-            seat_info TEXT,
-            quantity INTEGER DEFAULT 0,
-            status TEXT,
-            created_at TEXT NOT NULL,
-            FOREIGN KEY (performance_id) REFERENCES performances (id)
-        )
-    ''')
-    
-    conn.commit()
-    return conn
+    """데이터베이스 초기화 (QR API와 같은 SQLAlchemy 엔진/연결 풀 반환)"""
+    engine = get_engine()
+    create_schema(engine)
+    return engine
 
-conn = init_db()
+db_engine = init_db()
 
 # 제목
 st.title("📋 티켓츠 예매 관리 시스템")
@@ -78,199 +61,28 @@ with tab1:
         
         st.markdown("---")
         st.markdown("**📌 지원 예매처**")
-        st.markdown("- 인터파크")
-        st.markdown("- 티켓링크")
-        st.markdown("- 예스24")
+        for profile in PLATFORM_PROFILES:
+            st.markdown(f"- {profile['name']}")
     
     with col_content:
         def extract_performance_info(uploaded_file):
             """Excel 파일에서 공연 정보 추출"""
             try:
-                file_name = uploaded_file.name
-                
-                # 모든 플랫폼에 대해 넓게 헤더 읽기
-                df_header = pd.read_excel(uploaded_file, header=None, nrows=25)
-                
-                performance_name = ""
-                performance_date = ""
-                performance_time = ""
-                source = ""
-                
-                # 파일명으로 플랫폼 감지
-                if '티켓링크' in file_name or 'ticketlink' in file_name.lower():
-                    source = '티켓링크'
-                elif '인터파크' in file_name or 'interpark' in file_name.lower():
-                    source = '인터파크'
-                elif '예스24' in file_name or 'yes24' in file_name.lower():
-                    source = '예스24'
-                else:
-                    source = '알 수 없음'
-                
-                # 모든 셀을 순회하며 정보 찾기
-                for idx, row in df_header.iterrows():
-                    for col_idx in range(min(10, len(row))):  # 최대 10개 컬럼까지 확인
-                        cell_value = str(row.iloc[col_idx]) if col_idx < len(row) else ""
-                        
-                        if pd.isna(cell_value) or cell_value == 'nan':
-                            continue
-                        
-                        # 공연명/상품명 찾기
-                        if not performance_name and ('공연명' in cell_value or '상품명' in cell_value or '제목' in cell_value):
-                            # 콜론(:) 뒤의 내용 추출
-                            if ':' in cell_value or '：' in cell_value:
-                                parts = re.split(r'[:：]', cell_value, 1)
-                                if len(parts) > 1:
-                                    performance_name = parts[1].strip()
-                                    # 괄호나 추가 정보 제거
-                                    performance_name = re.sub(r'\([^)]*\)', '', performance_name).strip()
-                        
-                        # 날짜 찾기 (YYYY.MM.DD 또는 YYYY-MM-DD 형식)
-                        if not performance_date:
-                            date_match = re.search(r'(\d{4})[.-](\d{2})[.-](\d{2})', cell_value)
-                            if date_match:
-                                performance_date = f"{date_match.group(1)}.{date_match.group(2)}.{date_match.group(3)}"
-                        
-                        # 시간 찾기 (HH:MM 형식)
-                        if not performance_time:
-                            time_match = re.search(r'(\d{1,2}):(\d{2})', cell_value)
-                            if time_match and '조회' not in cell_value:  # "조회시간" 같은 건 제외
-                                hour = time_match.group(1).zfill(2)
-                                minute = time_match.group(2)
-                                performance_time = f"{hour}:{minute}"
-                
-                # 정보가 추출되었는지 확인
-                if performance_name or performance_date:
-                    return {
-                        'name': performance_name if performance_name else '(공연명 없음)',
-                        'date': performance_date if performance_date else '(날짜 없음)',
-                        'time': performance_time,
-                        'source': source
-                    }
-                
-                return None
-                
+                return load_performance_info(uploaded_file)
             except Exception as e:
                 st.error(f"파일 읽기 오류: {str(e)}")
                 return None
         
         
-        def parse_excel_file(uploaded_file):
-            """Excel 파일 파싱"""
-            try:
-                file_name = uploaded_file.name
-                
-                if '인터파크' in file_name or 'interpark' in file_name.lower():
-                    platform = '인터파크'
-                    header_row = 5
-                elif '티켓링크' in file_name or 'ticketlink' in file_name.lower():
-                    platform = '티켓링크'
-                    header_row = 5
-                elif '예스24' in file_name or 'yes24' in file_name.lower():
-                    platform = '예스24'
-                    header_row = 19
-                else:
-                    return [], '알 수 없음'
-                
-                try:
-                    df = pd.read_excel(uploaded_file, header=header_row, engine='openpyxl')
-                except:
-                    df = pd.read_excel(uploaded_file, header=header_row, engine='xlrd')
-                
-                result_data = []
-                
-                for idx, row in df.iterrows():
-                    try:
-                        if platform == '인터파크':
-                            data = {
-                                '예매처': '인터파크',
-                                '예매번호': str(row.get('예매번호', '')),
-                                '예매자명': str(row.get('예매자명', '')),
-                                '연락처': str(row.get('휴대폰번호', '')),
-                                '좌석정보': str(row.get('좌석정보', '')),
-                                '매수': int(row.get('매수', 0)) if pd.notna(row.get('매수', 0)) else 0,
-                                '배정상태': '지정' if pd.notna(row.get('좌석정보', '')) and str(row.get('좌석정보', '')) != '' else '비지정'
-                            }
-                            result_data.append(data)
-                            
-                        elif platform == '티켓링크':
-                            data = {
-                                '예매처': '티켓링크',
-                                '예매번호': str(row.get('예매번호(연동사 예매번호)', '')),
-                                '예매자명': str(row.get('성명', '')),
-                                '연락처': str(row.get('연락처(SMS)', '')),
-                                '좌석정보': str(row.get('좌석번호', '')),
-                                '매수': int(row.get('매수', 0)) if pd.notna(row.get('매수', 0)) else 0,
-                                '배정상태': '지정' if pd.notna(row.get('좌석번호', '')) and str(row.get('좌석번호', '')) != '' else '비지정'
-                            }
-                            result_data.append(data)
-                            
-                        elif platform == '예스24':
-                            data = {
-                                '예매처': '예스24',
-                                '예매번호': str(row.get('주문번호', '')),
-                                '예매자명': str(row.get('예매자명', '')),
-                                '연락처': str(row.get('휴대폰번호', '')),
-                                '좌석정보': str(row.get('좌석', '')),
-                                '매수': int(row.get('매수', 0)) if pd.notna(row.get('매수', 0)) else 0,
-                                '배정상태': '지정' if pd.notna(row.get('좌석', '')) and str(row.get('좌석', '')) != '' else '비지정'
-                            }
-                            result_data.append(data)
-                            
-                    except Exception as e:
-                        continue
-                
-                return result_data, platform
-                
-            except Exception as e:
-                return [], '오류'
-        
-        
-        def save_to_database(performance_info, reservation_data):
-            """데이터베이스에 저장"""
-            cursor = conn.cursor()
-            
+        def save_to_database(performance_info, reservation_chunks):
+            """데이터베이스에 저장 (기존 회차는 변경분만 반영하고 (성공 여부, 공연 ID, 건수 요약) 반환)"""
             try:
-                cursor.execute('''
-                    SELECT id FROM performances 
-                    WHERE performance_name = ? AND performance_date = ? AND performance_time = ?
-                ''', (performance_info['name'], performance_info['date'], performance_info['time']))
-                
-                result = cursor.fetchone()
-                
-                if result:
-                    performance_id = result[0]
-                    cursor.execute('''
-                        UPDATE performances 
-                        SET updated_at = ?, total_reservations = ?
-                        WHERE id = ?
-                    ''', (datetime.now().isoformat(), len(reservation_data), performance_id))
-                    
-                    cursor.execute('DELETE FROM reservations WHERE performance_id = ?', (performance_id,))
-                    
-                else:
-                    cursor.execute('''
-                        INSERT INTO performances (performance_name, performance_date, performance_time, created_at, updated_at, total_reservations)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (performance_info['name'], performance_info['date'], performance_info['time'], 
-                          datetime.now().isoformat(), datetime.now().isoformat(), len(reservation_data)))
-                    
-                    performance_id = cursor.lastrowid
-                
-                for reservation in reservation_data:
-                    cursor.execute('''
-                        INSERT INTO reservations (performance_id, platform, reservation_number, name, phone, seat_info, quantity, status, created_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (performance_id, reservation['예매처'], reservation['예매번호'], reservation['예매자명'],
-                          reservation['연락처'], reservation['좌석정보'], reservation['매수'], reservation['배정상태'],
-                          datetime.now().isoformat()))
-                
-                conn.commit()
-                return True, performance_id
+                performance_id, counts = save_reservations(db_engine, performance_info, reservation_chunks)
+                return True, performance_id, counts
                 
             except Exception as e:
-                conn.rollback()
                 st.error(f"저장 오류: {str(e)}")
-                return False, None
+                return False, None, None
         
         
         # 메인 로직
@@ -370,27 +182,45 @@ with tab1:
                 
                 if st.button("🔄 통합하고 저장하기", type="primary", use_container_width=True):
                     with st.spinner("파일을 통합하고 저장하는 중..."):
-                        all_data = []
+                        # 파일은 프로세스 풀에서 동시에 파싱해 캐시에 기록한 뒤(쓰기 트랜잭션 전에 끝남)
+                        # 업로드 순서대로 chunk 단위로 저장하며 요약만 집계
+                        summary = {'total': 0, 'platforms': Counter()}
+                        failed_files = []
+                        parsed_files = parse_files_parallel(uploaded_files)
                         
-                        for uploaded_file in uploaded_files:
-                            data, platform = parse_excel_file(uploaded_file)
-                            all_data.extend(data)
+                        def iter_upload_chunks():
+                            for file_name, platform, chunks, error in parsed_files:
+                                if error:
+                                    failed_files.append((file_name, error))
+                                    continue
+                                for chunk in chunks:
+                                    summary['total'] += len(chunk)
+                                    summary['platforms'].update(reservation['예매처'] for reservation in chunk)
+                                    yield chunk
                         
-                        if all_data:
-                            df_integrated = pd.DataFrame(all_data)
-                            
-                            success, performance_id = save_to_database(
+                        chunks = iter_upload_chunks()
+                        first_chunk = next((chunk for chunk in chunks if chunk), None)
+                        
+                        if first_chunk:
+                            success, performance_id, counts = save_to_database(
                                 st.session_state['performance_confirmed_info'],
-                                all_data
+                                itertools.chain([first_chunk], chunks)
                             )
                             
                             if success:
-                                st.session_state['integrated_data'] = df_integrated
+                                st.session_state['integrated_summary'] = summary
                                 st.session_state['saved'] = True
-                                st.success(f"✅ 총 {len(df_integrated)}건이 저장되었습니다!")
+                                platform_counts = ", ".join(f"{platform} {count:,}건" for platform, count in summary['platforms'].items())
+                                st.success(f"✅ 총 {summary['total']}건이 저장되었습니다! ({platform_counts})")
+                                st.info(f"🔄 신규 {counts['inserted']:,}건 · 변경 {counts['updated']:,}건 · 유지 {counts['unchanged']:,}건 · 취소 처리 {counts['cancelled']:,}건")
+                                if counts['kept']:
+                                    st.warning(f"⚠️ 파일에 없는 발권/입장 예약 {counts['kept']:,}건은 QR이 이미 전달되어 취소하지 않았습니다. 취소가 맞다면 예약 상태를 직접 바꿔 주세요.")
                                 st.balloons()
                         else:
                             st.error("통합할 데이터가 없습니다.")
+                        
+                        for file_name, error in failed_files:
+                            st.warning(f"⚠️ **{file_name}** 파일을 읽지 못해 제외했습니다: {error}")
         
         else:
             st.info("👈 왼쪽에서 예매 파일을 업로드하세요!")
@@ -399,43 +229,60 @@ with tab1:
 with tab2:
     st.header("📋 예약 리스트")
     
-    def get_all_performances():
+    # 조회 결과는 데이터 버전별로 캐시: 같은 데이터로 다시 그릴 때(검색어 입력, 필터 변경 등)는
+    # 메모리에서 바로 반환하고, 저장/상태 변경으로 버전이 바뀌면 새로 조회한다
+    def get_catalog_version():
+        """공연/회차 목록 버전 조회"""
+        with db_engine.connect() as conn:
+            return fetch_catalog_version(conn)
+    
+    
+    def get_data_version(performance_id):
+        """특정 공연 회차의 데이터 버전 조회"""
+        with db_engine.connect() as conn:
+            return fetch_data_version(conn, performance_id)
+    
+    
+    @st.cache_data(max_entries=QUERY_CACHE_MAX_ENTRIES, show_spinner=False)
+    def get_all_performances(catalog_version):
         """모든 공연 목록 조회"""
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT DISTINCT performance_name
-            FROM performances
-            ORDER BY performance_name
-        ''')
-        return [row[0] for row in cursor.fetchall()]
+        with db_engine.connect() as conn:
+            return fetch_performance_names(conn)
     
     
-    def get_performance_sessions(performance_name):
+    @st.cache_data(max_entries=QUERY_CACHE_MAX_ENTRIES, show_spinner=False)
+    def get_performance_sessions(performance_name, catalog_version):
         """특정 공연의 회차 목록 조회"""
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT id, performance_date, performance_time, updated_at, total_reservations
-            FROM performances
-            WHERE performance_name = ?
-            ORDER BY performance_date, performance_time
-        ''', (performance_name,))
-        return cursor.fetchall()
+        with db_engine.connect() as conn:
+            return fetch_performance_sessions(conn, performance_name)
+    
+    
+    @st.cache_data(max_entries=QUERY_CACHE_MAX_ENTRIES, show_spinner=False)
+    def get_reservation_page(performance_id, data_version, platforms, statuses, search_text, after):
+        """특정 공연 회차의 예약 리스트 한 페이지 조회 (반환값: (DataFrame, 다음 페이지 커서))"""
+        with db_engine.connect() as conn:
+            rows, next_cursor = fetch_reservation_page(
+                conn, performance_id, platforms, statuses, search_text, after
+            )
+        return pd.DataFrame(rows, columns=RESERVATION_COLUMNS), next_cursor
+    
     
+    @st.cache_data(max_entries=QUERY_CACHE_MAX_ENTRIES, show_spinner=False)
+    def count_filtered_reservations(performance_id, data_version, platforms, statuses, search_text):
+        """필터/검색 조건에 맞는 예약 건수"""
+        with db_engine.connect() as conn:
+            return count_reservations(conn, performance_id, platforms, statuses, search_text)
     
-    def get_reservations(performance_id):
-        """특정 공연 회차의 예약 리스트 조회"""
-        query = '''
-            SELECT platform, reservation_number, name, phone, seat_info, quantity, status
-            FROM reservations
-            WHERE performance_id = ?
-            ORDER BY platform, name
-        '''
-        df = pd.read_sql_query(query, conn, params=(performance_id,))
-        df.columns = ['예매처', '예매번호', '예매자명', '연락처', '좌석정보', '매수', '배정상태']
-        return df
     
+    @st.cache_data(max_entries=QUERY_CACHE_MAX_ENTRIES, show_spinner=False)
+    def get_summary(performance_id, data_version):
+        """특정 공연 회차의 저장된 통계 조회 (예약 행은 읽지 않음)"""
+        with db_engine.connect() as conn:
+            return fetch_summary(conn, performance_id)
     
-    performances = get_all_performances()
+    
+    catalog_version = get_catalog_version()
+    performances = get_all_performances(catalog_version)
     
     if not performances:
         st.warning("⚠️ 저장된 공연이 없습니다. '통합명부 작성' 탭에서 먼저 데이터를 저장해주세요.")
@@ -450,7 +297,7 @@ with tab2:
         st.markdown("---")
         
         if selected_performance:
-            sessions = get_performance_sessions(selected_performance)
+            sessions = get_performance_sessions(selected_performance, catalog_version)
             
             st.markdown("## 📅 공연 회차 목록")
             
@@ -466,7 +313,7 @@ with tab2:
                     st.markdown(f"**⏰ {perf_time if perf_time else '시간 미정'}**")
                 
                 with col3:
-                    update_time = datetime.fromisoformat(updated_at)
+                    update_time = updated_at.astimezone()
                     st.markdown(f"🔄 {update_time.strftime('%Y-%m-%d %H:%M')}")
                 
                 with col4:
@@ -507,35 +354,23 @@ with tab2:
                 with col2:
                     st.metric("총 예약", f"{session_info['total']}건")
                 
-                # 예약 데이터 조회
-                with st.spinner("예약 데이터를 조회하는 중..."):
-                    df_reservations = get_reservations(st.session_state['selected_session_id'])
-                
-                # 디버깅 정보
-                st.info(f"💾 데이터베이스에서 {len(df_reservations)}건의 예약을 찾았습니다")
-                st.write(f"**DataFrame shape:** {df_reservations.shape}")
-                st.write(f"**DataFrame columns:** {df_reservations.columns.tolist()}")
-                
-                # 강제로 구분선 추가
-                st.markdown("---")
-                st.markdown("### 🔽 아래에 예약 데이터가 표시됩니다")
-                st.markdown("---")
+                session_id = st.session_state['selected_session_id']
+                data_version = get_data_version(session_id)
+                summary = get_summary(session_id, data_version)
                 
-                if len(df_reservations) > 0:
-                    # 통계
+                if summary['reservations'] > 0:
+                    # 통계 (저장 시 갱신된 회차 요약 사용)
                     col3, col4, col5 = st.columns(3)
                     
                     with col3:
-                        total_seats = df_reservations['매수'].sum()
-                        st.metric("총 좌석", f"{total_seats}석")
+                        st.metric("총 좌석", f"{summary['seats']}석")
                     
+                    # 지정/비지정은 좌석정보로 구분 (발권/입장한 예약도 포함, 취소 제외)
                     with col4:
-                        assigned = len(df_reservations[df_reservations['배정상태'] == '지정'])
-                        st.metric("지정석", f"{assigned}건")
+                        st.metric("지정석", f"{summary['assigned']}건")
                     
                     with col5:
-                        unassigned = len(df_reservations[df_reservations['배정상태'] == '비지정'])
-                        st.metric("비지정석", f"{unassigned}건")
+                        st.metric("비지정석", f"{summary['unassigned']}건")
                     
                     st.markdown("---")
                     
@@ -545,55 +380,87 @@ with tab2:
                     filter_col1, filter_col2, filter_col3 = st.columns(3)
                     
                     with filter_col1:
+                        platforms = list(summary['by_platform'])
                         platform_filter = st.multiselect(
                             "예매처",
-                            df_reservations['예매처'].unique().tolist(),
-                            df_reservations['예매처'].unique().tolist()
+                            platforms,
+                            platforms
                         )
                     
                     with filter_col2:
                         status_filter = st.multiselect(
                             "배정 상태",
-                            ['지정', '비지정'],
-                            ['지정', '비지정']
+                            list(STATUS_LABELS),
+                            [status for status in STATUS_LABELS
+                             if status not in (CANCELLED_STATUS, ReservationStatus.expired)],
+                            format_func=status_label
                         )
                     
                     with filter_col3:
-                        search_text = st.text_input("예매자명 검색")
+                        search_text = st.text_input("예매자명/연락처/예매번호 검색")
                     
-                    # 필터 적용
-                    filtered_df = df_reservations.copy()
+                    # 필터가 바뀌면 첫 페이지부터
+                    filters = (session_id, tuple(platform_filter), tuple(status_filter), search_text)
+                    if st.session_state.get('page_filters') != filters:
+                        st.session_state['page_filters'] = filters
+                        st.session_state['page_cursors'] = [None]
+                    page_cursors = st.session_state['page_cursors']
                     
-                    if platform_filter:
-                        filtered_df = filtered_df[filtered_df['예매처'].isin(platform_filter)]
+                    filtered_count = count_filtered_reservations(
+                        session_id, data_version, platform_filter, status_filter, search_text
+                    )
+                    page_df, next_cursor = get_reservation_page(
+                        session_id, data_version, platform_filter, status_filter, search_text, page_cursors[-1]
+                    )
                     
-                    if status_filter:
-                        filtered_df = filtered_df[filtered_df['배정상태'].isin(status_filter)]
+                    page_number = len(page_cursors)
+                    page_count = max(1, -(-filtered_count // RESERVATION_PAGE_SIZE))
+                    st.markdown(f"**검색 결과: {filtered_count}건** (페이지 {page_number}/{page_count})")
                     
-                    if search_text:
-                        filtered_df = filtered_df[filtered_df['예매자명'].str.contains(search_text, na=False)]
+                    # 데이터 테이블 (현재 페이지만 조회)
+                    st.dataframe(page_df, use_container_width=True)
                     
-                    st.markdown(f"**검색 결과: {len(filtered_df)}건**")
+                    prev_col, next_col = st.columns(2)
                     
-                    # 데이터 테이블
-                    st.dataframe(filtered_df, use_container_width=True, height=500)
+                    with prev_col:
+                        if st.button("◀ 이전", disabled=page_number == 1, use_container_width=True):
+                            page_cursors.pop()
+                            st.rerun()
                     
-                    # 다운로드
-                    def create_download_excel(df):
-                        output = BytesIO()
-                        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                            df.to_excel(writer, index=False, sheet_name='예약리스트')
-                        output.seek(0)
-                        return output
+                    with next_col:
+                        if st.button("다음 ▶", disabled=next_cursor is None, use_container_width=True):
+                            page_cursors.append(next_cursor)
+                            st.rerun()
                     
-                    excel_data = create_download_excel(filtered_df)
-                    st.download_button(
-                        label="📥 Excel 다운로드",
-                        data=excel_data,
-                        file_name=f"예약리스트_{session_info['name']}_{session_info['date']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        use_container_width=True
-                    )
+                    # 다운로드 (요청할 때만 만들고, 같은 회차/필터/데이터 버전이면 캐시된 파일 사용)
+                    export_col1, export_col2 = st.columns([1, 3])
+                    
+                    with export_col1:
+                        export_format = st.radio("파일 형식", ['xlsx', 'csv'], horizontal=True)
+                    
+                    with export_col2:
+                        if st.button("📄 다운로드 파일 만들기", use_container_width=True):
+                            export_args = (
+                                db_engine, session_id, export_format,
+                                platform_filter, status_filter, search_text
+                            )
+                            with st.spinner("다운로드 파일을 만드는 중..."):
+                                export_path = export_reservations(*export_args)
+                                try:
+                                    export_file = open(export_path, 'rb')
+                                except FileNotFoundError:
+                                    # 다른 세션이 캐시 용량을 정리하며 파일을 지웠으면 다시 만든다
+                                    export_file = open(export_reservations(*export_args), 'rb')
+                            
+                            extension, mime = EXPORT_FORMATS[export_format]
+                            with export_file as f:
+                                st.download_button(
+                                    label=f"📥 {export_format.upper()} 다운로드",
+                                    data=f,
+                                    file_name=f"예약리스트_{session_info['name']}_{session_info['date']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}",
+                                    mime=mime,
+                                    use_container_width=True
+                                )
                 
                 else:
                     st.error("❌ 해당 회차의 예약 데이터가 없습니다!")
@@ -0,0 +1,316 @@
+﻿"""Door scanning: admission decided in the database, an in-process token index, batched event writes."""
+from __future__ import annotations
+
+import enum
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy.engine import Engine
+
+from app.db import get_engine
+from app.models import ReservationStatus
+from config import (
+    CHECKIN_INDEX_REFRESH_SECONDS,
+    CHECKIN_WRITE_BATCH_SIZE,
+    CHECKIN_WRITE_FLUSH_SECONDS,
+    CHECKIN_WRITE_QUEUE_SIZE,
+    CHECKIN_WRITE_QUEUE_TIMEOUT,
+    CHECKIN_WRITE_RETRIES,
+)
+from storage import (
+    claim_checkin,
+    fetch_data_version,
+    fetch_data_versions,
+    fetch_issued_tokens,
+    fetch_token,
+    read_transaction,
+    record_checkin_events,
+)
+
+logger = logging.getLogger(__name__)
+
+# Signed tickets of reservations in these states are rejected even though their signature is valid.
+REVOKED_STATUSES = {ReservationStatus.cancelled, ReservationStatus.expired}
+
+
+class CheckinOutcome(str, enum.Enum):
+    checked_in = "checked_in"
+    already_checked_in = "already_checked_in"
+    not_issued = "not_issued"
+    unknown_token = "unknown_token"
+    busy = "busy"
+
+
+class TokenEntry:
+    __slots__ = ("reservation_id", "performance_id", "status", "checked_in_at")
+
+    def __init__(self, reservation_id: int, performance_id: int, status: ReservationStatus):
+        self.reservation_id = reservation_id
+        self.performance_id = performance_id
+        self.status = status
+        self.checked_in_at: Optional[datetime] = None
+
+
+class TokenIndex:
+    """Token -> reservation state for every reservation that has a QR token.
+
+    A cache in front of the database: it rejects repeat scans of tokens already checked in without
+    a round trip, but admission itself is decided in the database (see CheckinService.check_in),
+    so any number of API processes can scan against the same tickets. Performances are reloaded
+    when their data_version moves. The reservation ids in REVOKED_STATUSES double as the
+    revocation set for signed tickets.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[str, TokenEntry] = {}
+        self._versions: dict[int, int] = {}
+        self._revoked: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self, conn, performance_id: Optional[int] = None) -> None:
+        """Upsert the tokens of one performance (or all) from the database."""
+        # Read the version first: a change that lands mid-read leaves it stale for the next refresh.
+        if performance_id is None:
+            versions = fetch_data_versions(conn)
+        else:
+            versions = {performance_id: fetch_data_version(conn, performance_id)}
+        rows = fetch_issued_tokens(conn, performance_id)
+
+        with self._lock:
+            for token, reservation_id, row_performance_id, status in rows:
+                self._set(token, TokenEntry(reservation_id, row_performance_id, status))
+            self._versions.update(versions)
+
+    def refresh(self, conn) -> int:
+        """Reload performances whose data_version changed; returns how many were reloaded."""
+        stale = [
+            performance_id
+            for performance_id, version in fetch_data_versions(conn).items()
+            if self._versions.get(performance_id) != version
+        ]
+        for performance_id in stale:
+            self.load(conn, performance_id)
+        return len(stale)
+
+    def get(self, token: str) -> Optional[TokenEntry]:
+        with self._lock:
+            return self._entries.get(token)
+
+    def track(self, token: str, reservation_id: int, performance_id: int, status: ReservationStatus) -> TokenEntry:
+        """Record a committed issue or status change; returns the new entry."""
+        entry = TokenEntry(reservation_id, performance_id, status)
+        with self._lock:
+            self._set(token, entry)
+        return entry
+
+    def admit(self, token: str, reservation_id: int, performance_id: int, scanned_at: datetime) -> TokenEntry:
+        """Record a check-in the database accepted."""
+        entry = TokenEntry(reservation_id, performance_id, ReservationStatus.checked_in)
+        entry.checked_in_at = scanned_at
+        with self._lock:
+            self._set(token, entry)
+        return entry
+
+    def _set(self, token: str, entry: TokenEntry) -> None:
+        self._entries[token] = entry
+        if entry.status in REVOKED_STATUSES:
+            self._revoked.add(entry.reservation_id)
+        else:
+            self._revoked.discard(entry.reservation_id)
+
+    def is_revoked(self, reservation_id: int) -> bool:
+        return reservation_id in self._revoked
+
+
+_STOP = object()
+
+
+class CheckinService:
+    """Owns the token index and the thread that writes check-in events and refreshes the index.
+
+    A scan is admitted by claim_checkin, a conditional UPDATE that only succeeds while the
+    reservation is still issued, so two scans of the same ticket (in this process or another
+    worker) can never both be admitted. The index only short-cuts tokens it already knows are
+    checked in; a token it does not know, or knows in another state, is looked up in the database
+    first, since another process may have issued or changed it since the last refresh.
+
+    The checked_in events of admitted scans wait on a FIFO queue with queue_size slots. The writer
+    thread takes the first waiting scan, keeps gathering until it has batch_size scans or
+    flush_seconds have passed, and commits the batch in one transaction. Batches are written
+    strictly in scan order, and a failed batch is retried before anything after it; one that
+    keeps failing is dropped (the status change itself is already committed). When every slot is
+    taken, check_in blocks the calling thread for up to queue_timeout and then rejects the scan
+    as busy without admitting it; stop() writes everything still queued.
+    """
+
+    def __init__(
+        self,
+        engine: Optional[Engine] = None,
+        refresh_seconds: float = CHECKIN_INDEX_REFRESH_SECONDS,
+        batch_size: int = CHECKIN_WRITE_BATCH_SIZE,
+        flush_seconds: float = CHECKIN_WRITE_FLUSH_SECONDS,
+        queue_size: int = CHECKIN_WRITE_QUEUE_SIZE,
+        queue_timeout: float = CHECKIN_WRITE_QUEUE_TIMEOUT,
+        retries: int = CHECKIN_WRITE_RETRIES,
+    ):
+        self.index = TokenIndex()
+        self._engine = engine
+        self._refresh_seconds = refresh_seconds
+        self._batch_size = batch_size
+        self._flush_seconds = flush_seconds
+        self._queue_timeout = queue_timeout
+        self._retries = retries
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def engine(self) -> Engine:
+        return self._engine or get_engine()
+
+    @property
+    def backlog(self) -> int:
+        """Scans admitted but not yet handed to the writer."""
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        with self.engine.connect() as conn:
+            self.index.load(conn)
+        self._thread = threading.Thread(target=self._run, name="checkin-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Write every queued check-in event, then stop the background thread."""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def flush(self, timeout: float = CHECKIN_WRITE_QUEUE_TIMEOUT) -> bool:
+        """Wait until every scan admitted so far is written; False if that took longer than timeout."""
+        if self._thread is None:
+            return True
+        written = threading.Event()
+        self._queue.put(written)
+        return written.wait(timeout)
+
+    def check_in(self, token: str) -> tuple[CheckinOutcome, Optional[TokenEntry]]:
+        """Decide a scan in the database and queue its event; blocks while every write slot is taken."""
+        entry = self.index.get(token)
+        if entry is None or entry.status not in (ReservationStatus.issued, ReservationStatus.checked_in):
+            entry = self._reload(token)
+        if entry is None or entry.status != ReservationStatus.issued:
+            return _verdict(entry), entry
+
+        if not self._slots.acquire(timeout=self._queue_timeout):
+            return CheckinOutcome.busy, entry
+        try:
+            scanned_at = datetime.now(timezone.utc)
+            claimed = claim_checkin(self.engine, entry.reservation_id)
+        except Exception:
+            self._slots.release()
+            raise
+        if claimed is None:
+            # Another scan got there first, or the reservation left issued since it was read.
+            self._slots.release()
+            entry = self._reload(token)
+            return _verdict(entry), entry
+
+        entry = self.index.admit(token, *claimed, scanned_at)
+        self._queue.put(entry)
+        return CheckinOutcome.checked_in, entry
+
+    def track(self, token: Optional[str], reservation_id: int, performance_id: int, status: ReservationStatus) -> None:
+        if token is not None:
+            self.index.track(token, reservation_id, performance_id, status)
+
+    def _reload(self, token: str) -> Optional[TokenEntry]:
+        with read_transaction(self.engine) as conn:
+            row = fetch_token(conn, token)
+        if row is None:
+            return None
+        return self.index.track(*row)
+
+    def _run(self) -> None:
+        next_refresh = time.monotonic() + self._refresh_seconds
+        while True:
+            batch, stopping = self._next_batch(next_refresh)
+            if batch:
+                self._write(batch)
+            if stopping:
+                return
+            if time.monotonic() >= next_refresh:
+                self._refresh()
+                next_refresh = time.monotonic() + self._refresh_seconds
+
+    def _next_batch(self, next_refresh: float) -> tuple[list, bool]:
+        """Wait (until the next refresh) for a scan, then gather a batch; also reports a stop request."""
+        try:
+            item = self._queue.get(timeout=max(next_refresh - time.monotonic(), 0))
+        except queue.Empty:
+            return [], False
+
+        batch = []
+        flush_at = time.monotonic() + self._flush_seconds
+        while item is not _STOP:
+            batch.append(item)
+            if len(batch) >= self._batch_size:
+                return batch, False
+            try:
+                item = self._queue.get(timeout=max(flush_at - time.monotonic(), 0))
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+    def _write(self, batch: list) -> None:
+        # flush() markers ride the queue with the scans; they are released once the scans before them are written.
+        markers = [item for item in batch if isinstance(item, threading.Event)]
+        batch = [item for item in batch if not isinstance(item, threading.Event)]
+        if batch:
+            self._write_scans(batch)
+        for marker in markers:
+            marker.set()
+
+    def _write_scans(self, batch: list[TokenEntry]) -> None:
+        scans = [(entry.reservation_id, entry.checked_in_at) for entry in batch]
+        for attempt in range(self._retries + 1):
+            try:
+                record_checkin_events(self.engine, scans)
+                break
+            except Exception:
+                logger.exception("Failed to write %d check-in events (attempt %d)", len(batch), attempt + 1)
+                if attempt < self._retries:
+                    time.sleep(min(0.1 * 2**attempt, 2))
+        else:
+            logger.warning("Dropped %d check-in events after %d attempts", len(batch), self._retries + 1)
+        for _ in batch:
+            self._slots.release()
+
+    def _refresh(self) -> None:
+        try:
+            with self.engine.connect() as conn:
+                self.index.refresh(conn)
+        except Exception:
+            logger.exception("Failed to refresh the check-in token index")
+
+
+def _verdict(entry: Optional[TokenEntry]) -> CheckinOutcome:
+    """Outcome for a scan that was not admitted, from the reservation's current state."""
+    if entry is None:
+        return CheckinOutcome.unknown_token
+    if entry.status == ReservationStatus.checked_in:
+        return CheckinOutcome.already_checked_in
+    return CheckinOutcome.not_issued
+
+
+@lru_cache()
+def get_checkin_service() -> CheckinService:
+    return CheckinService()
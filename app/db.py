@@ -2,17 +2,27 @@
 
 import os
 from functools import lru_cache
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from pydantic import BaseSettings
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from config import DB_BUSY_TIMEOUT, DB_PATH, DB_POOL_SIZE
 
 
 class Settings(BaseSettings):
     """Application settings sourced from the environment."""
 
-    database_url: str = os.getenv("DATABASE_URL", "")
+    # Without DATABASE_URL a local SQLite file stands in for Postgres.
+    database_url: str = os.getenv("DATABASE_URL", f"sqlite:///{DB_PATH}")
+    # Secret for the QR token permutation; every worker must share it or tokens can collide.
+    qr_token_key: str = os.getenv("QR_TOKEN_KEY", "")
+    # Secret for HS256 signed tickets; issuers and every verifier need the same value.
+    qr_signing_key: str = os.getenv("QR_SIGNING_KEY", "")
 
     class Config:
         env_file = ".env"
@@ -39,16 +49,94 @@ def _build_database_url(raw_url: str) -> str:
     return raw_url
 
 
+# Applied to every new SQLite connection.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",  # readers keep working while an import is written
+    "PRAGMA synchronous = NORMAL",  # safe under WAL without an fsync per commit
+    "PRAGMA cache_size = -65536",  # 64MB page cache (negative means KiB)
+    "PRAGMA temp_store = MEMORY",
+)
+
+
+def _configure_sqlite(engine: Engine) -> None:
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record) -> None:
+        # Let the "begin" hook below emit BEGIN instead of pysqlite's implicit one.
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn) -> None:
+        # Writers ask for BEGIN IMMEDIATE so the rows they read before writing cannot
+        # change underneath them and the lock upgrade never fails with SQLITE_BUSY.
+        if conn.get_execution_options().get("sqlite_immediate"):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        else:
+            conn.exec_driver_sql("BEGIN")
+
+
+def create_db_engine(raw_url: str) -> Engine:
+    """Create a pooled engine; SQLite gets WAL, a busy timeout and explicit BEGIN handling."""
+
+    database_url = _build_database_url(raw_url)
+    if database_url.startswith("sqlite"):
+        engine = create_engine(
+            database_url,
+            pool_size=DB_POOL_SIZE,
+            future=True,
+            connect_args={"timeout": DB_BUSY_TIMEOUT, "check_same_thread": False},
+        )
+        _configure_sqlite(engine)
+        return engine
+
+    return create_engine(database_url, pool_size=DB_POOL_SIZE, pool_pre_ping=True, future=True)
+
+
+def create_async_db_engine(raw_url: str) -> AsyncEngine:
+    """Async counterpart of create_db_engine: psycopg async for Postgres, aiosqlite for SQLite."""
+
+    database_url = _build_database_url(raw_url)
+    if database_url.startswith("sqlite"):
+        # SQLite admits one writer and the async routes all write: requests wait their turn for a
+        # single connection in the (event-loop friendly) pool instead of spinning in the busy handler.
+        # The pool class is explicit because aiosqlite defaults to NullPool before SQLAlchemy 2.0.38,
+        # which rejects the pool sizing arguments.
+        engine = create_async_engine(
+            database_url.replace("sqlite://", "sqlite+aiosqlite://", 1),
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=DB_BUSY_TIMEOUT,
+            connect_args={"timeout": DB_BUSY_TIMEOUT},
+        )
+        _configure_sqlite(engine.sync_engine)
+        return engine
+
+    # postgresql+psycopg resolves to the psycopg async dialect under create_async_engine.
+    return create_async_engine(database_url, pool_size=DB_POOL_SIZE, pool_pre_ping=True)
+
+
 _engine = None
 _SessionLocal = None
+_async_engine = None
+_AsyncSessionLocal = None
 
 
 def get_engine():
     global _engine, _SessionLocal
     if _engine is None or _SessionLocal is None:
-        database_url = _build_database_url(get_settings().database_url)
-        _engine = create_engine(database_url, pool_pre_ping=True, future=True)
-        _SessionLocal = sessionmaker(bind=_engine, autoflush=False, autocommit=False, future=True)
+        _engine = create_db_engine(get_settings().database_url)
+        # API sessions write, so on SQLite they take the write lock at BEGIN: concurrent
+        # read-then-write requests then wait for each other instead of failing the lock upgrade.
+        _SessionLocal = sessionmaker(
+            bind=_engine.execution_options(sqlite_immediate=True),
+            autoflush=False,
+            autocommit=False,
+            future=True,
+        )
     return _engine
 
 
@@ -67,3 +155,29 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None or _AsyncSessionLocal is None:
+        _async_engine = create_async_db_engine(get_settings().database_url)
+        _AsyncSessionLocal = async_sessionmaker(
+            bind=_async_engine.execution_options(sqlite_immediate=True),
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _async_engine
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    if _AsyncSessionLocal is None:
+        get_async_engine()
+    return _AsyncSessionLocal
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Yield an async session for the non-blocking routes; closed when the request ends."""
+
+    AsyncSessionLocal = get_async_sessionmaker()
+    async with AsyncSessionLocal() as db:
+        yield db
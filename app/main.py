@@ -1,11 +1,34 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from app.routers import reservations
+from app.checkin import get_checkin_service
+from app.routers import checkin, performances, reservations, tickets
+from app.tokens import get_ticket_signer, get_token_allocator
+from storage import create_schema
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # QR 토큰/서명 키가 없으면 첫 발권 요청이 아니라 시작할 때 바로 실패한다
+    get_token_allocator()
+    get_ticket_signer()
+    # 새 DB면 테이블을 만들고(이전 SQLite 스키마는 변환), 입장 처리용 토큰 인덱스를 읽어 두고,
+    # 종료할 때 대기 중인 입장 기록을 모두 DB에 쓴다
+    checkin_service = get_checkin_service()
+    create_schema(checkin_service.engine)
+    checkin_service.start()
+    yield
+    checkin_service.stop()
+
 
-app = FastAPI(title="QR Ticketing API", version="0.1.0")
+app = FastAPI(title="QR Ticketing API", version="0.1.0", lifespan=lifespan)
 
 app.include_router(reservations.router)
+app.include_router(performances.router)
+app.include_router(checkin.router)
+app.include_router(tickets.router)
 
 # 루트 엔드포인트
 @app.get("/")
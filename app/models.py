@@ -4,7 +4,9 @@ import enum
 from datetime import datetime
 from typing import Any, Optional
 
-from sqlalchemy import JSON, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    JSON, DateTime, ForeignKey, Index, Integer, LargeBinary, String, Text, UniqueConstraint, text,
+)
 from sqlalchemy.dialects.postgresql import ENUM
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -32,11 +34,65 @@ reservation_status_enum = ENUM(
 )
 
 
+class Performance(Base):
+    __tablename__ = "performances"
+    __table_args__ = (
+        UniqueConstraint("performance_name", "performance_date", "performance_time"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    performance_name: Mapped[str] = mapped_column(String(256), nullable=False)
+    performance_date: Mapped[str] = mapped_column(String(64), nullable=False)
+    performance_time: Mapped[str] = mapped_column(String(64), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+    # Bumped on every import or status change; used as a cache key by readers.
+    data_version: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
+
+
+class PerformanceSummary(Base):
+    """Reservation, seat and assigned-seat counts per (performance, platform, status), kept in sync on write."""
+
+    __tablename__ = "performance_summary"
+
+    performance_id: Mapped[int] = mapped_column(ForeignKey("performances.id"), primary_key=True)
+    platform: Mapped[str] = mapped_column(String(50), primary_key=True)
+    status: Mapped[ReservationStatus] = mapped_column(reservation_status_enum, primary_key=True)
+    reservations: Mapped[int] = mapped_column(default=0, nullable=False)
+    seats: Mapped[int] = mapped_column(default=0, nullable=False)
+    # Reservations with seat info; tracked per status so issuing or checking in keeps them counted.
+    assigned: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
+
+
 class Reservation(Base):
     __tablename__ = "reservations"
+    __table_args__ = (
+        # Keyset order of the reservation list; reservations without a name sort as "".
+        Index(
+            "ix_reservations_performance_platform_sort_name",
+            "performance_id",
+            "platform",
+            text("coalesce(name, '')"),
+        ),
+        # Only issued reservations have a token; leaving the NULLs out keeps imports from
+        # writing an index entry per row. Same partial index as migrations/001.
+        Index(
+            "ux_reservations_token",
+            "token",
+            unique=True,
+            sqlite_where=text("token IS NOT NULL"),
+            postgresql_where=text("token IS NOT NULL"),
+        ),
+    )
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    performance_id: Mapped[int] = mapped_column(nullable=False, index=True)
+    # The primary key is already indexed and performance_id is the leading column of the list
+    # index, so neither gets its own index (each extra index slows down bulk imports).
+    id: Mapped[int] = mapped_column(primary_key=True)
+    performance_id: Mapped[int] = mapped_column(ForeignKey("performances.id"), nullable=False)
     platform: Mapped[str] = mapped_column(String(50), nullable=False)
     reservation_number: Mapped[Optional[str]] = mapped_column(String(128))
     name: Mapped[Optional[str]] = mapped_column(String(120))
@@ -48,7 +104,7 @@ class Reservation(Base):
         nullable=False,
         server_default=ReservationStatus.reserved_unassigned.value,
     )
-    token: Mapped[Optional[str]] = mapped_column(String(16), unique=True, index=True)
+    token: Mapped[Optional[str]] = mapped_column(String(16))
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -79,6 +135,18 @@ class SeatStatus(Base):
     reservation: Mapped[Optional[Reservation]] = relationship(back_populates="seat_statuses")
 
 
+class PerformanceSeatMap(Base):
+    """A performance's bitmap seat map (seat_map.SeatMap.to_bytes); rebuilt from seat_status when missing."""
+
+    __tablename__ = "performance_seat_maps"
+
+    performance_id: Mapped[int] = mapped_column(ForeignKey("performances.id"), primary_key=True)
+    bitmap: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+
 class ReservationEvent(Base):
     __tablename__ = "reservation_events"
 
@@ -0,0 +1,213 @@
+﻿"""Offline gate bundles: a compact binary snapshot of a performance's admissible tokens, and deltas.
+
+A bundle is a fixed header followed by a zlib-compressed body; all integers are big-endian.
+
+    header  magic "TKOB" | format u8 | kind u8 (0 full, 1 delta) | performance_id u32
+            | base_version u64 (0 for a full bundle) | version u64
+    full    tokens | seats | revoked
+    delta   added tokens | seats of the added tokens | removed tokens | revoked | reinstated
+
+"tokens" is a u32 count and that many 6-byte token numbers (int(token, 36) < 2**42) in ascending
+order, so a reader can binary-search the block as it is. "seats" holds one u16-length-prefixed
+UTF-8 seat code per token, in the same order. "revoked"/"reinstated" are a u32 count and sorted
+u32 reservation ids: signed tickets carry the reservation id, and a gate rejects revoked ones.
+
+A token in a delta's added block replaces any seat code the reader already has for it. The
+version is the performance data_version; snapshots are kept per version so a reader can ask for
+the changes since the version it holds, and gets a full bundle when that version is gone.
+"""
+from __future__ import annotations
+
+import struct
+import zlib
+from functools import lru_cache
+from typing import Optional
+
+from app.checkin import REVOKED_STATUSES
+from app.models import ReservationStatus
+from app.tokens import token_number
+from config import OFFLINE_BUNDLE_CACHE_DIR, OFFLINE_BUNDLE_CACHE_MAX_BYTES
+from disk_cache import DiskCache
+from storage import fetch_offline_snapshot
+
+BUNDLE_MAGIC = b"TKOB"
+BUNDLE_FORMAT = 1
+BUNDLE_FULL = 0
+BUNDLE_DELTA = 1
+
+_HEADER = struct.Struct(">4sBBIQQ")
+_COUNT = struct.Struct(">I")
+_SEAT_LENGTH = struct.Struct(">H")
+_TOKEN_BYTES = 6
+
+
+class Snapshot:
+    """The admissible tokens (token number -> seat code) and revoked reservation ids at one version."""
+
+    __slots__ = ("performance_id", "version", "tokens", "revoked")
+
+    def __init__(self, performance_id: int, version: int, tokens: dict[int, str], revoked: set[int]):
+        self.performance_id = performance_id
+        self.version = version
+        self.tokens = tokens
+        self.revoked = revoked
+
+
+def build_snapshot(conn, performance_id: int) -> Optional[Snapshot]:
+    """Read a performance's snapshot from the database; None if the performance does not exist."""
+    result = fetch_offline_snapshot(conn, performance_id)
+    if result is None:
+        return None
+
+    version, rows = result
+    tokens: dict[int, str] = {}
+    revoked: set[int] = set()
+    for token, reservation_id, status, seat_info in rows:
+        if status in REVOKED_STATUSES:
+            revoked.add(reservation_id)
+        elif status == ReservationStatus.issued:
+            number = token_number(token)
+            if number is not None:
+                tokens[number] = seat_info or ""
+    return Snapshot(performance_id, version, tokens, revoked)
+
+
+def _pack_tokens(numbers: list[int]) -> bytes:
+    return _COUNT.pack(len(numbers)) + b"".join(number.to_bytes(_TOKEN_BYTES, "big") for number in numbers)
+
+
+def _pack_seats(seats: list[str]) -> bytes:
+    parts = []
+    for seat in seats:
+        data = seat.encode()
+        parts.append(_SEAT_LENGTH.pack(len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+
+def _pack_ids(ids: list[int]) -> bytes:
+    return _COUNT.pack(len(ids)) + struct.pack(f">{len(ids)}I", *ids)
+
+
+def _bundle(kind: int, snapshot: Snapshot, base_version: int, sections: list[bytes]) -> bytes:
+    header = _HEADER.pack(BUNDLE_MAGIC, BUNDLE_FORMAT, kind, snapshot.performance_id, base_version, snapshot.version)
+    return header + zlib.compress(b"".join(sections))
+
+
+def encode_full(snapshot: Snapshot) -> bytes:
+    numbers = sorted(snapshot.tokens)
+    return _bundle(BUNDLE_FULL, snapshot, 0, [
+        _pack_tokens(numbers),
+        _pack_seats([snapshot.tokens[number] for number in numbers]),
+        _pack_ids(sorted(snapshot.revoked)),
+    ])
+
+
+def encode_delta(base: Snapshot, snapshot: Snapshot) -> bytes:
+    """The changes that turn base into snapshot."""
+    added = sorted(
+        number for number, seat in snapshot.tokens.items()
+        if base.tokens.get(number) != seat
+    )
+    removed = sorted(number for number in base.tokens if number not in snapshot.tokens)
+    return _bundle(BUNDLE_DELTA, snapshot, base.version, [
+        _pack_tokens(added),
+        _pack_seats([snapshot.tokens[number] for number in added]),
+        _pack_tokens(removed),
+        _pack_ids(sorted(snapshot.revoked - base.revoked)),
+        _pack_ids(sorted(base.revoked - snapshot.revoked)),
+    ])
+
+
+class _Reader:
+    def __init__(self, body: bytes):
+        self._body = body
+        self._offset = 0
+
+    def _take(self, size: int) -> bytes:
+        end = self._offset + size
+        if end > len(self._body):
+            raise ValueError("Truncated offline bundle")
+        data = self._body[self._offset:end]
+        self._offset = end
+        return data
+
+    def _count(self) -> int:
+        return _COUNT.unpack(self._take(_COUNT.size))[0]
+
+    def tokens(self) -> list[int]:
+        data = self._take(self._count() * _TOKEN_BYTES)
+        return [int.from_bytes(data[start:start + _TOKEN_BYTES], "big") for start in range(0, len(data), _TOKEN_BYTES)]
+
+    def seats(self, count: int) -> list[str]:
+        seats = []
+        for _ in range(count):
+            length = _SEAT_LENGTH.unpack(self._take(_SEAT_LENGTH.size))[0]
+            seats.append(self._take(length).decode())
+        return seats
+
+    def ids(self) -> list[int]:
+        count = self._count()
+        return list(struct.unpack(f">{count}I", self._take(count * 4)))
+
+
+def apply_bundle(data: bytes, base: Optional[Snapshot] = None) -> Snapshot:
+    """Reference reader: decode a full bundle, or apply a delta to the snapshot it was made against."""
+    if len(data) < _HEADER.size:
+        raise ValueError("Truncated offline bundle")
+    magic, bundle_format, kind, performance_id, base_version, version = _HEADER.unpack_from(data)
+    if magic != BUNDLE_MAGIC or bundle_format != BUNDLE_FORMAT:
+        raise ValueError("Not an offline bundle of a supported format")
+    reader = _Reader(zlib.decompress(data[_HEADER.size:]))
+
+    if kind == BUNDLE_FULL:
+        numbers = reader.tokens()
+        tokens = dict(zip(numbers, reader.seats(len(numbers))))
+        return Snapshot(performance_id, version, tokens, set(reader.ids()))
+
+    if base is None or base.performance_id != performance_id or base.version != base_version:
+        raise ValueError("Delta does not apply to this snapshot")
+    tokens = dict(base.tokens)
+    added = reader.tokens()
+    tokens.update(zip(added, reader.seats(len(added))))
+    for number in reader.tokens():
+        tokens.pop(number, None)
+    revoked = base.revoked | set(reader.ids())
+    revoked.difference_update(reader.ids())
+    return Snapshot(performance_id, version, tokens, revoked)
+
+
+class SnapshotCache(DiskCache):
+    """Disk cache of served snapshots per (performance, version), the bases deltas are computed from.
+
+    A version's content is fixed (the snapshot query reads rows and data_version together), so
+    workers sharing the directory can serve deltas for each other's bundles.
+    """
+
+    suffix = ".bundle"
+
+    def __init__(self, directory=OFFLINE_BUNDLE_CACHE_DIR, max_bytes=OFFLINE_BUNDLE_CACHE_MAX_BYTES):
+        super().__init__(directory, max_bytes)
+
+    @staticmethod
+    def _key(performance_id: int, version: int) -> str:
+        return f"{BUNDLE_FORMAT}-{performance_id}-{version}"
+
+    def load(self, conn, performance_id: int) -> Optional[Snapshot]:
+        """Read the current snapshot from the database and keep it as a future delta base."""
+        snapshot = build_snapshot(conn, performance_id)
+        if snapshot is not None and not self.contains(self._key(performance_id, snapshot.version)):
+            self.put(self._key(performance_id, snapshot.version), (snapshot.tokens, snapshot.revoked))
+        return snapshot
+
+    def get_snapshot(self, performance_id: int, version: int) -> Optional[Snapshot]:
+        entry = self.get(self._key(performance_id, version))
+        if entry is None:
+            return None
+        tokens, revoked = entry
+        return Snapshot(performance_id, version, tokens, revoked)
+
+
+@lru_cache()
+def get_snapshot_cache() -> SnapshotCache:
+    return SnapshotCache()
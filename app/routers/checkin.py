@@ -0,0 +1,130 @@
+﻿from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, status
+from pydantic import BaseModel, Field
+
+from app import models
+from app.checkin import CheckinOutcome, get_checkin_service
+from config import CHECKIN_BATCH_MAX_ITEMS
+from storage import merge_offline_checkins
+
+router = APIRouter(prefix="/checkin", tags=["checkin"])
+
+
+class CheckinResponse(BaseModel):
+    token: str
+    reservation_id: int
+    performance_id: int
+    status: models.ReservationStatus
+    checked_in_at: datetime
+
+
+class OfflineScan(BaseModel):
+    token: str = Field(..., max_length=16)
+    reader_id: str = Field(..., max_length=64)
+    # Naive timestamps are taken as UTC.
+    scanned_at: datetime
+
+
+class CheckinBatchRequest(BaseModel):
+    scans: list[OfflineScan]
+
+
+class CheckinBatchResult(BaseModel):
+    index: int
+    token: str
+    verdict: CheckinOutcome
+    reservation_id: Optional[int] = None
+    status: Optional[models.ReservationStatus] = None
+    # The scan that counts as the entry: this one, an earlier one in the batch, or one already recorded.
+    first_scanned_at: Optional[datetime] = None
+    first_reader_id: Optional[str] = None
+
+
+class CheckinBatchResponse(BaseModel):
+    received: int
+    checked_in: int
+    results: list[CheckinBatchResult]
+
+
+@router.post("/batch", response_model=CheckinBatchResponse)
+def check_in_batch(payload: CheckinBatchRequest):
+    """Merge scans a reader collected while offline, with a verdict per scan.
+
+    Scans of the same token are resolved first-scan-wins by scanned_at, against each other and
+    against check-ins already recorded; the winner admits the reservation if it is still issued.
+    Online scans still waiting in the write queue are flushed first so they take part, and the
+    merge runs as a few set-based statements in one transaction. Registered before /{token}.
+    """
+    if len(payload.scans) > CHECKIN_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {CHECKIN_BATCH_MAX_ITEMS} scans per request",
+        )
+
+    checkin_service = get_checkin_service()
+    if not checkin_service.flush():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Check-in writer is busy, retry the upload",
+            headers={"Retry-After": "1"},
+        )
+    results = merge_offline_checkins(
+        checkin_service.engine,
+        [(scan.token, scan.reader_id, scan.scanned_at) for scan in payload.scans],
+    )
+
+    admitted = 0
+    tracked = set()
+    for index, (scan, result) in enumerate(zip(payload.scans, results)):
+        result["index"] = index
+        result["token"] = scan.token
+        if result["verdict"] == CheckinOutcome.checked_in.value:
+            admitted += 1
+        # Mark merged check-ins in the index so a repeat online scan is rejected right away.
+        if result.get("status") == models.ReservationStatus.checked_in and scan.token not in tracked:
+            tracked.add(scan.token)
+            checkin_service.track(
+                scan.token, result["reservation_id"], result["performance_id"], models.ReservationStatus.checked_in
+            )
+
+    return {"received": len(results), "checked_in": admitted, "results": results}
+
+
+@router.post("/{token}", response_model=CheckinResponse)
+def check_in(token: str):
+    """Admit a scanned QR token.
+
+    The status change is one conditional UPDATE, so a ticket is admitted once however many API
+    workers scan it; its checked_in event is group-committed in the background. Repeat scans of
+    a token the in-process index knows as checked in get 409 without a database round trip. A
+    plain def so that, while the write queue is full, the wait happens on a threadpool worker
+    instead of the event loop; a scan that cannot be queued gets 503 and is not admitted.
+    """
+    outcome, entry = get_checkin_service().check_in(token)
+    if outcome is CheckinOutcome.busy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Check-in writer is busy, retry the scan",
+            headers={"Retry-After": "1"},
+        )
+    if outcome is CheckinOutcome.unknown_token:
+        raise HTTPException(status_code=404, detail="Unknown token")
+    if outcome is CheckinOutcome.already_checked_in:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Already checked in")
+    if outcome is CheckinOutcome.not_issued:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Reservation is {entry.status.value}, not issued",
+        )
+
+    return {
+        "token": token,
+        "reservation_id": entry.reservation_id,
+        "performance_id": entry.performance_id,
+        "status": entry.status,
+        "checked_in_at": entry.checked_in_at,
+    }
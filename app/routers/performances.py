@@ -0,0 +1,96 @@
+﻿from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.checkin import get_checkin_service
+from app.db import get_async_db, get_engine
+from app.offline import encode_delta, encode_full, get_snapshot_cache
+from app.tokens import get_token_allocator
+from storage import issue_performance_tokens
+
+router = APIRouter(prefix="/performances", tags=["performances"])
+
+
+class IssuedTicket(BaseModel):
+    reservation_id: int
+    token: str
+
+
+class PerformanceQRIssueResponse(BaseModel):
+    performance_id: int
+    issued: int
+    issued_at: datetime
+    tickets: list[IssuedTicket]
+
+
+@router.post("/{performance_id}/issue-qr", response_model=PerformanceQRIssueResponse)
+async def issue_performance_qr(performance_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Issue QR tokens for every reserved (assigned or unassigned) reservation of a performance.
+
+    Tokens are derived from reservation ids, so no collision lookups are needed; the reservation
+    updates and qr_issued events are each written with a single executemany in one transaction.
+    """
+    conn = await db.connection()
+    if (await conn.execute(
+        select(models.Performance.id).where(models.Performance.id == performance_id)
+    )).first() is None:
+        raise HTTPException(status_code=404, detail="Performance not found")
+
+    issued = await conn.run_sync(issue_performance_tokens, performance_id, get_token_allocator().token_for)
+    await db.commit()
+
+    checkin_service = get_checkin_service()
+    for reservation_id, token in issued:
+        checkin_service.track(token, reservation_id, performance_id, models.ReservationStatus.issued)
+
+    return {
+        "performance_id": performance_id,
+        "issued": len(issued),
+        "issued_at": datetime.now(timezone.utc),
+        "tickets": [
+            {"reservation_id": reservation_id, "token": token}
+            for reservation_id, token in issued
+        ],
+    }
+
+
+def _bundle_response(data: bytes, version: int) -> Response:
+    return Response(
+        content=data,
+        media_type="application/octet-stream",
+        headers={"X-Bundle-Version": str(version)},
+    )
+
+
+@router.get("/{performance_id}/offline-bundle", response_class=Response)
+def get_offline_bundle(performance_id: int):
+    """Binary snapshot for gates that scan without a connection (format in app/offline.py)."""
+    # A plain connection: API sessions take the SQLite write lock at BEGIN, and this only reads.
+    with get_engine().connect() as conn:
+        snapshot = get_snapshot_cache().load(conn, performance_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Performance not found")
+    return _bundle_response(encode_full(snapshot), snapshot.version)
+
+
+@router.get("/{performance_id}/offline-bundle/delta", response_class=Response)
+def get_offline_bundle_delta(
+    performance_id: int,
+    since: int = Query(..., ge=0, description="Bundle version the reader holds"),
+):
+    """Changes since the reader's bundle version; a full bundle if that version is no longer kept."""
+    cache = get_snapshot_cache()
+    with get_engine().connect() as conn:
+        snapshot = cache.load(conn, performance_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Performance not found")
+
+    base = snapshot if since == snapshot.version else cache.get_snapshot(performance_id, since)
+    data = encode_full(snapshot) if base is None else encode_delta(base, snapshot)
+    return _bundle_response(data, snapshot.version)
@@ -1,19 +1,32 @@
 ﻿from __future__ import annotations
 
-import secrets
-import string
 from datetime import datetime, timezone
-from typing import Any, Optional
+from typing import Any, Optional, Union
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, Field
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import models
-from app.db import get_db
+from app.checkin import get_checkin_service
+from app.db import get_async_db, get_db
+from app.tokens import get_ticket_signer, get_token_allocator
+from config import BULK_MAX_ITEMS
+from storage import insert_reservations, track_reservation_change
 
 router = APIRouter(prefix="/reservations", tags=["reservations"])
 
+# issue-qr refuses these instead of moving them back to issued.
+QR_BLOCKED_STATUSES = {
+    models.ReservationStatus.checked_in,
+    models.ReservationStatus.cancelled,
+    models.ReservationStatus.expired,
+}
+
 
 class ReservationCreate(BaseModel):
     performance_id: int
@@ -41,6 +54,25 @@ class ReservationResponse(BaseModel):
 
     class Config:
         from_attributes = True
+        orm_mode = True  # pydantic<2 (requirements.txt) name of from_attributes
+
+
+class BulkReservationCreate(BaseModel):
+    # Each item is a ReservationCreate, validated one by one so a bad item (including a
+    # non-object) gets its own error result instead of failing the whole batch.
+    items: list[Any] = Field(..., description="ReservationCreate objects")
+
+
+class BulkReservationResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkReservationResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[BulkReservationResult]
 
 
 class StatusUpdatePayload(BaseModel):
@@ -52,44 +84,23 @@ class QRIssueResponse(BaseModel):
     token: str
     status: models.ReservationStatus
     issued_at: datetime
+    # Present when requested with ?signed=true; verifiable offline via POST /tickets/verify.
+    signed_token: Optional[str] = None
 
     class Config:
         from_attributes = True
+        orm_mode = True  # pydantic<2 (requirements.txt) name of from_attributes
 
 
-BASE36_ALPHABET = string.digits + string.ascii_lowercase
-TOKEN_LENGTH = 8
-
+class _ModelResponse(ORJSONResponse):
+    """Encodes an already validated model with orjson, reading field values straight from it."""
 
-def _base36_encode(number: int) -> str:
-    if number < 0:
-        raise ValueError("Number must be positive")
-    if number == 0:
-        return "0"
-
-    digits = []
-    while number:
-        number, remainder = divmod(number, 36)
-        digits.append(BASE36_ALPHABET[remainder])
-    return "".join(reversed(digits))
-
-
-def _generate_base36_token() -> str:
-    max_value = 36**TOKEN_LENGTH
-    random_number = secrets.randbelow(max_value)
-    return _base36_encode(random_number).zfill(TOKEN_LENGTH)
-
-
-def _generate_unique_token(db: Session) -> str:
-    while True:
-        token = _generate_base36_token()
-        exists = db.query(models.Reservation).filter_by(token=token).first()
-        if not exists:
-            return token
+    def render(self, content: BaseModel) -> bytes:
+        return orjson.dumps(content, default=vars)
 
 
 def _record_event(
-    db: Session,
+    db: Union[Session, AsyncSession],
     reservation: models.Reservation,
     event_type: str,
     previous_status: Optional[models.ReservationStatus],
@@ -110,6 +121,12 @@ def _touch_updated_at(reservation: models.Reservation) -> None:
     reservation.updated_at = datetime.now(timezone.utc)
 
 
+def _format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+    )
+
+
 @router.post("/", response_model=ReservationResponse, status_code=status.HTTP_201_CREATED)
 def create_reservation(payload: ReservationCreate, db: Session = Depends(get_db)):
     reservation = models.Reservation(
@@ -133,18 +150,84 @@ def create_reservation(payload: ReservationCreate, db: Session = Depends(get_db)
         new_status=reservation.status,
         payload=payload.model_dump(exclude_none=True),
     )
+    track_reservation_change(db, reservation.id)
     db.commit()
     db.refresh(reservation)
     return reservation
 
 
+@router.post("/bulk", response_model=BulkReservationResponse, response_class=_ModelResponse)
+def create_reservations_bulk(payload: BulkReservationCreate, db: Session = Depends(get_db)):
+    """Create many reservations in one transaction and report an id or error per item.
+
+    Rows, their reservation_created events and the performance summaries are written with a
+    handful of set-based statements, not a round trip per reservation. Items that fail
+    ReservationCreate validation, or name an unknown performance, get an error result instead.
+    """
+    if len(payload.items) > BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {BULK_MAX_ITEMS} items per request",
+        )
+
+    results: list[dict[str, Any]] = [
+        {"index": index, "id": None, "error": None} for index in range(len(payload.items))
+    ]
+    valid: list[tuple[int, ReservationCreate]] = []
+    for index, item in enumerate(payload.items):
+        if not isinstance(item, dict):
+            results[index]["error"] = "Item must be a JSON object"
+            continue
+        try:
+            valid.append((index, ReservationCreate.parse_obj(item)))
+        except ValidationError as exc:
+            results[index]["error"] = _format_validation_error(exc)
+
+    performance_ids = {item.performance_id for _, item in valid}
+    known_performances = set(
+        db.execute(
+            select(models.Performance.id).where(models.Performance.id.in_(performance_ids))
+        ).scalars()
+    ) if performance_ids else set()
+
+    rows = []
+    indexes = []
+    for index, item in valid:
+        if item.performance_id not in known_performances:
+            results[index]["error"] = "Performance not found"
+            continue
+        indexes.append(index)
+        rows.append({
+            "performance_id": item.performance_id,
+            "platform": item.platform,
+            "reservation_number": item.reservation_number,
+            "name": item.name,
+            "phone": item.phone,
+            "seat_info": item.seat_info,
+            "quantity": item.quantity,
+            "status": item.status or models.ReservationStatus.reserved_unassigned,
+        })
+
+    # Core statements on the session's connection skip the ORM's per-row bulk bookkeeping.
+    for index, reservation_id in zip(indexes, insert_reservations(db.connection(), rows)):
+        results[index]["id"] = reservation_id
+    db.commit()
+
+    response = BulkReservationResponse(
+        created=len(rows), failed=len(results) - len(rows), results=results
+    )
+    # Validated once above and encoded by orjson: handing the model back to FastAPI would
+    # validate it again and run jsonable_encoder over every item, several times the cost.
+    return _ModelResponse(response)
+
+
 @router.patch("/{reservation_id}/status", response_model=ReservationResponse)
-def update_status(
+async def update_status(
     reservation_id: int,
     payload: StatusUpdatePayload,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    reservation = db.get(models.Reservation, reservation_id)
+    reservation = await db.get(models.Reservation, reservation_id)
     if reservation is None:
         raise HTTPException(status_code=404, detail="Reservation not found")
 
@@ -160,19 +243,35 @@ def update_status(
         payload={"note": payload.note} if payload.note else None,
     )
 
-    db.commit()
-    db.refresh(reservation)
+    await db.flush()
+    await db.run_sync(track_reservation_change, reservation.id, previous_status)
+    await db.commit()
+    await db.refresh(reservation)
+    get_checkin_service().track(
+        reservation.token, reservation.id, reservation.performance_id, reservation.status
+    )
     return reservation
 
 
 @router.post("/{reservation_id}/issue-qr", response_model=QRIssueResponse)
-def issue_qr(reservation_id: int, db: Session = Depends(get_db)):
-    reservation = db.get(models.Reservation, reservation_id)
+async def issue_qr(
+    reservation_id: int,
+    signed: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+):
+    reservation = await db.get(models.Reservation, reservation_id)
     if reservation is None:
         raise HTTPException(status_code=404, detail="Reservation not found")
+    if reservation.status in QR_BLOCKED_STATUSES:
+        # Re-issuing would move the reservation back to issued and re-admit it at the door.
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Reservation is {reservation.status.value}",
+        )
 
-    if reservation.token is None:
-        reservation.token = _generate_unique_token(db)
+    token_changed = reservation.token is None
+    if token_changed:
+        reservation.token = get_token_allocator().token_for(reservation.id)
 
     previous_status = reservation.status
     reservation.status = models.ReservationStatus.issued
@@ -187,11 +286,19 @@ def issue_qr(reservation_id: int, db: Session = Depends(get_db)):
         payload={"token": reservation.token},
     )
 
-    db.commit()
-    db.refresh(reservation)
+    await db.flush()
+    await db.run_sync(track_reservation_change, reservation.id, previous_status, token_changed)
+    await db.commit()
+    await db.refresh(reservation)
+    get_checkin_service().track(
+        reservation.token, reservation.id, reservation.performance_id, reservation.status
+    )
 
     return QRIssueResponse(
         token=reservation.token,
         status=reservation.status,
         issued_at=reservation.updated_at,
+        signed_token=get_ticket_signer().sign(
+            reservation.id, reservation.name, reservation.seat_info
+        ) if signed else None,
     )
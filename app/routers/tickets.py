@@ -0,0 +1,43 @@
+﻿from __future__ import annotations
+
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, status
+from pydantic import BaseModel
+
+from app.checkin import get_checkin_service
+from app.tokens import InvalidTicket, get_ticket_signer
+
+router = APIRouter(prefix="/tickets", tags=["tickets"])
+
+
+class TicketVerifyRequest(BaseModel):
+    token: str
+
+
+class TicketClaims(BaseModel):
+    ticket_id: int
+    owner_name: Optional[str]
+    seat_info: Optional[str]
+    issued_at: int
+    expires_at: int
+    nonce: str
+    version: int
+
+
+@router.post("/verify", response_model=TicketClaims)
+async def verify_ticket(payload: TicketVerifyRequest):
+    """Check a signed ticket's signature, version and expiry without touching the database.
+
+    Tickets of cancelled or expired reservations are rejected via the check-in token index.
+    """
+    try:
+        claims = get_ticket_signer().verify(payload.token)
+    except InvalidTicket as exc:
+        if exc.reason == "expired":
+            raise HTTPException(status_code=status.HTTP_410_GONE, detail="Ticket expired")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=f"Invalid ticket: {exc.reason}")
+
+    if get_checkin_service().index.is_revoked(claims["ticket_id"]):
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Ticket revoked")
+    return claims
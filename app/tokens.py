@@ -0,0 +1,198 @@
+﻿"""QR tokens: short base36 ids from a keyed permutation, and signed tickets verifiable offline."""
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import string
+import time
+from functools import lru_cache
+from typing import Any, Optional
+
+from app.db import get_settings
+from config import QR_VALID_HOURS
+
+BASE36_ALPHABET = string.digits + string.ascii_lowercase
+TOKEN_LENGTH = 8
+TOKEN_SPACE = 36**TOKEN_LENGTH
+_BASE36_DIGITS = frozenset(BASE36_ALPHABET)
+
+# The Feistel network permutes 42-bit numbers (2**42 > 36**8); outputs at or above
+# TOKEN_SPACE are permuted again ("cycle walking") until they land inside it.
+_HALF_BITS = 21
+_HALF_MASK = (1 << _HALF_BITS) - 1
+FEISTEL_ROUNDS = 8
+
+
+def base36_encode(number: int) -> str:
+    if number < 0:
+        raise ValueError("Number must be positive")
+    if number == 0:
+        return "0"
+
+    digits = []
+    while number:
+        number, remainder = divmod(number, 36)
+        digits.append(BASE36_ALPHABET[remainder])
+    return "".join(reversed(digits))
+
+
+def token_number(token: str) -> Optional[int]:
+    """The integer a token encodes (below TOKEN_SPACE); None if it is not a well-formed token."""
+    if len(token) != TOKEN_LENGTH or not _BASE36_DIGITS.issuperset(token):
+        return None
+    return int(token, 36)
+
+
+class TokenAllocator:
+    """Derive QR tokens from reservation ids with no database lookups.
+
+    The permutation is a bijection on [0, 36**8), so distinct reservation ids always give
+    distinct tokens and any number of workers sharing the key can issue concurrently. Without
+    the key, consecutive ids give unrelated-looking tokens.
+    """
+
+    def __init__(self, key: bytes):
+        if not key:
+            raise ValueError("Token key must not be empty")
+        self._rounds = [
+            hashlib.blake2b(key=key, digest_size=4, salt=index.to_bytes(16, "big"))
+            for index in range(FEISTEL_ROUNDS)
+        ]
+
+    def _round(self, index: int, half: int) -> int:
+        digest = self._rounds[index].copy()
+        digest.update(half.to_bytes(3, "big"))
+        return int.from_bytes(digest.digest(), "big") & _HALF_MASK
+
+    def _encrypt(self, number: int) -> int:
+        left, right = number >> _HALF_BITS, number & _HALF_MASK
+        for index in range(FEISTEL_ROUNDS):
+            left, right = right, left ^ self._round(index, right)
+        return (left << _HALF_BITS) | right
+
+    def _decrypt(self, number: int) -> int:
+        left, right = number >> _HALF_BITS, number & _HALF_MASK
+        for index in reversed(range(FEISTEL_ROUNDS)):
+            left, right = right ^ self._round(index, left), left
+        return (left << _HALF_BITS) | right
+
+    def token_for(self, reservation_id: int) -> str:
+        if not 0 <= reservation_id < TOKEN_SPACE:
+            raise ValueError("Reservation id is outside the token space")
+        number = self._encrypt(reservation_id)
+        while number >= TOKEN_SPACE:
+            number = self._encrypt(number)
+        return base36_encode(number).zfill(TOKEN_LENGTH)
+
+    def reservation_id_for(self, token: str) -> Optional[int]:
+        """Invert token_for; None if the string is not a well-formed token."""
+        number = token_number(token)
+        if number is None:
+            return None
+        number = self._decrypt(number)
+        while number >= TOKEN_SPACE:
+            number = self._decrypt(number)
+        return number
+
+
+@lru_cache()
+def get_token_allocator() -> TokenAllocator:
+    """Return the allocator keyed with QR_TOKEN_KEY (must be the same for every worker)."""
+
+    key = get_settings().qr_token_key
+    if not key:
+        raise RuntimeError("QR_TOKEN_KEY is not configured (set it in the environment or .env, see .env.example)")
+    return TokenAllocator(key.encode())
+
+
+TICKET_VERSION = 1
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+_TICKET_HEADER = _b64encode(b'{"alg":"HS256","typ":"JWT"}')
+
+
+class InvalidTicket(ValueError):
+    """A signed ticket failed verification; reason is malformed, signature, version or expired."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class TicketSigner:
+    """Compact HS256 JWS tickets carrying the claims a gate needs, checked without the database.
+
+    Only the fixed HS256 header is accepted, so a token cannot choose its own algorithm.
+    """
+
+    def __init__(self, key: bytes, valid_hours: float = QR_VALID_HOURS):
+        if not key:
+            raise ValueError("Signing key must not be empty")
+        self._mac = hmac.new(key, digestmod=hashlib.sha256)
+        self._valid_seconds = int(valid_hours * 3600)
+
+    def _signature(self, signing_input: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def sign(
+        self,
+        ticket_id: int,
+        owner_name: Optional[str],
+        seat_info: Optional[str],
+        issued_at: Optional[int] = None,
+    ) -> str:
+        issued_at = int(time.time()) if issued_at is None else issued_at
+        claims = {
+            "ticket_id": ticket_id,
+            "owner_name": owner_name,
+            "seat_info": seat_info,
+            "issued_at": issued_at,
+            "expires_at": issued_at + self._valid_seconds,
+            "nonce": secrets.token_urlsafe(6),
+            "version": TICKET_VERSION,
+        }
+        payload = _b64encode(json.dumps(claims, ensure_ascii=False, separators=(",", ":")).encode())
+        signing_input = f"{_TICKET_HEADER}.{payload}"
+        return f"{signing_input}.{_b64encode(self._signature(signing_input.encode()))}"
+
+    def verify(self, token: str, now: Optional[float] = None) -> dict[str, Any]:
+        """Return the claims of a valid ticket or raise InvalidTicket."""
+        parts = token.split(".")
+        if len(parts) != 3 or parts[0] != _TICKET_HEADER:
+            raise InvalidTicket("malformed")
+        try:
+            signature = _b64decode(parts[2])
+        except ValueError:
+            raise InvalidTicket("malformed") from None
+        if not hmac.compare_digest(signature, self._signature(f"{parts[0]}.{parts[1]}".encode())):
+            raise InvalidTicket("signature")
+
+        claims = json.loads(_b64decode(parts[1]))
+        if claims.get("version") != TICKET_VERSION:
+            raise InvalidTicket("version")
+        if claims["expires_at"] <= (time.time() if now is None else now):
+            raise InvalidTicket("expired")
+        return claims
+
+
+@lru_cache()
+def get_ticket_signer() -> TicketSigner:
+    """Return the signer keyed with QR_SIGNING_KEY (shared by issuers and verifiers)."""
+
+    key = get_settings().qr_signing_key
+    if not key:
+        raise RuntimeError("QR_SIGNING_KEY is not configured (set it in the environment or .env, see .env.example)")
+    return TicketSigner(key.encode())
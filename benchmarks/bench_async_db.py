@@ -0,0 +1,139 @@
+"""
+QR API DB 경로 벤치마크 - 동기 세션(스레드풀) vs 비동기 세션(aiosqlite)으로 예약 상태 변경
+
+게이트에 요청이 몰린 상황처럼 클라이언트 여러 개가 동시에 PATCH /reservations/{id}/status를
+보내고, 그동안 /health 응답 시간도 함께 잰다 (동기 경로는 스레드풀을 같이 쓴다).
+
+실행: python benchmarks/bench_async_db.py [동시 요청 수] [요청 수]
+"""
+import asyncio
+import os
+import signal
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from fastapi import Depends, HTTPException  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app import models  # noqa: E402
+from app.db import create_db_engine, get_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.routers.reservations import (  # noqa: E402
+    ReservationResponse, StatusUpdatePayload, _record_event, _touch_updated_at,
+)
+from bench_checkin import free_port, percentile, start_server  # noqa: E402
+from bench_save import PERFORMANCE_INFO, make_chunks  # noqa: E402
+from storage import create_schema, save_reservations, track_reservation_change  # noqa: E402
+
+STATUSES = ('pending', 'reserved_assigned')
+
+
+def sync_update_status(reservation_id: int, payload: StatusUpdatePayload, db: Session = Depends(get_db)):
+    """비동기로 바꾸기 전의 update_status (동기 세션, 스레드풀에서 실행)"""
+    reservation = db.get(models.Reservation, reservation_id)
+    if reservation is None:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+
+    previous_status = reservation.status
+    reservation.status = payload.status
+    _touch_updated_at(reservation)
+    _record_event(
+        db, reservation, event_type="status_updated", previous_status=previous_status,
+        new_status=payload.status, payload={"note": payload.note} if payload.note else None,
+    )
+    db.flush()
+    track_reservation_change(db, reservation.id, previous_status)
+    db.commit()
+    db.refresh(reservation)
+    return reservation
+
+
+app.add_api_route(
+    '/sync/reservations/{reservation_id}/status', sync_update_status,
+    methods=['PATCH'], response_model=ReservationResponse,
+)
+
+
+async def client_loop(client, path, reservation_id, count, latencies, errors):
+    for i in range(count):
+        start = time.perf_counter()
+        try:
+            response = await client.patch(
+                path.format(reservation_id=reservation_id), json={'status': STATUSES[i % 2]}
+            )
+            status_code = response.status_code
+        except httpx.TransportError as exc:
+            status_code = type(exc).__name__
+        latencies.append(time.perf_counter() - start)
+        if status_code != 200:
+            errors.append(status_code)
+
+
+async def health_probe(client, done, latencies):
+    while not done.is_set():
+        start = time.perf_counter()
+        try:
+            await client.get('/health')
+        except httpx.TransportError:
+            pass
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.05)
+
+
+async def rush(port, path, clients, requests):
+    latencies, errors, health = [], [], []
+    done = asyncio.Event()
+    limits = httpx.Limits(max_connections=clients + 1)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=120) as client:
+        probe = asyncio.create_task(health_probe(client, done, health))
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            client_loop(client, path, reservation_id, requests // clients, latencies, errors)
+            for reservation_id in range(1, clients + 1)
+        ))
+        seconds = time.perf_counter() - start
+        done.set()
+        await probe
+    return sorted(latencies), errors, sorted(health), seconds
+
+
+def report(title, latencies, errors, health, seconds):
+    print(f"- {title}: {len(latencies) / seconds:,.0f}건/s, 오류 {len(errors)}건 {dict(Counter(errors))}")
+    print(f"  P50 {percentile(latencies, 0.50) * 1000:.0f}ms / P95 {percentile(latencies, 0.95) * 1000:.0f}ms / "
+          f"P99 {percentile(latencies, 0.99) * 1000:.0f}ms, 그동안 /health P95 {percentile(health, 0.95) * 1000:.0f}ms")
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 1200
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'async_db.db')}"
+        engine = create_db_engine(database_url)
+        create_schema(engine)
+        save_reservations(engine, PERFORMANCE_INFO, make_chunks(clients))
+        engine.dispose()
+
+        port = free_port()
+        server = start_server(database_url, port, app='bench_async_db:app', app_dir=BENCH_DIR)
+        try:
+            sync_result = asyncio.run(rush(port, '/sync/reservations/{reservation_id}/status', clients, requests))
+            async_result = asyncio.run(rush(port, '/reservations/{reservation_id}/status', clients, requests))
+        finally:
+            server.send_signal(signal.SIGINT)
+            server.wait(timeout=60)
+
+    print(f"📊 예약 상태 변경 {requests:,}건 (동시 요청 {clients}개)")
+    report('동기 세션 (스레드풀)', *sync_result)
+    report('비동기 세션 (aiosqlite)', *async_result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+QR API 예약 일괄 등록 벤치마크 - POST /reservations/bulk 처리량
+
+처리량이 REQUIRED_ROWS_PER_SECOND보다 낮으면 실패한다. 같은 응답 본문을 FastAPI 기본 경로
+(response_model 검증 + jsonable_encoder)로 만들 때와, 엔드포인트처럼 BulkReservationResponse로
+한 번 검증해 orjson으로 인코딩할 때의 시간도 비교한다.
+
+실행: python benchmarks/bench_bulk_api.py [건수]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TMP_DIR = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(TMP_DIR, 'bulk_api.db')}"
+
+import orjson  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.db import get_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.routers.reservations import BulkReservationResponse, _ModelResponse  # noqa: E402
+from bench_save import PERFORMANCE_INFO  # noqa: E402
+from storage import create_schema, fetch_summary, save_reservations  # noqa: E402
+
+# 요구 처리량 (검증/응답 포함)
+REQUIRED_ROWS_PER_SECOND = 10_000
+
+
+def make_items(performance_id, rows):
+    """API 형식의 샘플 예약 (마지막 두 건은 검증/공연 오류)"""
+    items = [
+        {
+            'performance_id': performance_id,
+            'platform': '인터파크',
+            'reservation_number': f"T{1000000 + i}",
+            'name': f"예매자{i}",
+            'phone': f"010-{i % 10000:04d}-{(i * 7) % 10000:04d}",
+            'seat_info': f"{chr(65 + i % 8)}-{i % 30 + 1}" if i % 3 else None,
+            'quantity': i % 4 + 1,
+            'status': 'reserved_assigned' if i % 3 else 'reserved_unassigned',
+        }
+        for i in range(rows - 2)
+    ]
+    items.append({'performance_id': performance_id, 'platform': '인터파크', 'quantity': -1})
+    items.append({'performance_id': performance_id + 1, 'platform': '인터파크'})
+    return items
+
+
+def measure_encoding(body):
+    """응답 본문 하나를 (FastAPI 기본 경로, 모델 검증 + orjson)으로 만드는 데 걸린 시간"""
+    route = next(route for route in app.routes if getattr(route, 'path', None) == '/reservations/bulk')
+    start = time.perf_counter()
+    default = asyncio.run(serialize_response(
+        field=route.secure_cloned_response_field, response_content=body, is_coroutine=False
+    ))
+    default_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    encoded = _ModelResponse(BulkReservationResponse(**body)).body
+    model_seconds = time.perf_counter() - start
+    assert orjson.loads(encoded) == default
+    return default_seconds, model_seconds
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    engine = get_engine()
+    create_schema(engine)
+    performance_id, _ = save_reservations(engine, PERFORMANCE_INFO, [])
+    items = make_items(performance_id, rows)
+
+    client = TestClient(app)
+    start = time.perf_counter()
+    response = client.post('/reservations/bulk', json={'items': items})
+    seconds = time.perf_counter() - start
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body['created'] == rows - 2 and body['failed'] == 2
+    with engine.connect() as conn:
+        assert fetch_summary(conn, performance_id)['reservations'] == rows - 2
+    default_seconds, model_seconds = measure_encoding(body)
+
+    print(f"📊 {rows:,}건 일괄 등록 (HTTP 요청 1회, 검증/응답 포함)")
+    print(f"- 소요 시간: {seconds:.3f}s")
+    print(f"- 처리량:    {rows / seconds:,.0f}건/s")
+    print(f"- 오류 예시: {[result['error'] for result in body['results'][-2:]]}")
+    print("- 응답 만들기 (같은 본문)")
+    print(f"  FastAPI 기본 (response_model 검증 + jsonable_encoder): {default_seconds:.3f}s")
+    print(f"  BulkReservationResponse 검증 + orjson:                 {model_seconds:.3f}s "
+          f"({default_seconds / model_seconds:.1f}배 빠름)")
+
+    assert rows / seconds >= REQUIRED_ROWS_PER_SECOND, (
+        f"처리량 {rows / seconds:,.0f}건/s가 요구 처리량 {REQUIRED_ROWS_PER_SECOND:,}건/s보다 낮습니다"
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+QR 입장 처리 부하 테스트 - 스캐너 여러 대가 동시에 POST /checkin/{token} (uvicorn 서버)
+
+마지막으로 uvicorn 워커 WORKERS개로 띄운 서버에서 모든 표를 스캐너 두 대가 거의 동시에 스캔해,
+워커가 여럿이어도 표마다 정확히 한 번만 입장(200)되는지 확인한다.
+
+실행: python benchmarks/bench_checkin.py [좌석 수] [스캐너 수]
+"""
+import asyncio
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import func, select  # noqa: E402
+
+from app.db import create_db_engine  # noqa: E402
+from app.models import Reservation, ReservationEvent, ReservationStatus  # noqa: E402
+from app.tokens import TokenAllocator  # noqa: E402
+from bench_save import PERFORMANCE_INFO, make_chunks  # noqa: E402
+from storage import create_schema, issue_performance_tokens, save_reservations, write_transaction  # noqa: E402
+
+TOKEN_KEY = 'benchmark-key'
+REPEAT_RATIO = 0.1  # 같은 표를 다시 스캔하는 비율 (409로 거절되어야 함)
+SCAN_INTERVAL = 0.5  # 스캐너 한 대가 다음 입장객을 스캔하기까지 걸리는 시간 (초)
+WORKERS = 4  # 동시 스캔 확인에 쓰는 uvicorn 워커 수
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def prepare_database(database_url, seats):
+    """좌석 수만큼 예약을 저장하고 QR을 발급한 뒤 토큰 리스트 반환"""
+    engine = create_db_engine(database_url)
+    create_schema(engine)
+    performance_id, _ = save_reservations(engine, PERFORMANCE_INFO, make_chunks(seats))
+    with write_transaction(engine) as conn:
+        issued = issue_performance_tokens(conn, performance_id, TokenAllocator(TOKEN_KEY.encode()).token_for)
+    return engine, [token for _, token in issued]
+
+
+def start_server(database_url, port, app='app.main:app', app_dir=ROOT, workers=1):
+    env = {**os.environ, 'DATABASE_URL': database_url, 'QR_TOKEN_KEY': TOKEN_KEY, 'QR_SIGNING_KEY': TOKEN_KEY}
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', app, '--app-dir', app_dir, '--port', str(port),
+         '--log-level', 'critical', '--timeout-keep-alive', '120', '--workers', str(workers)],
+        cwd=ROOT, env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError('API server did not start')
+
+
+async def scanner(client, scans, interval, latencies, outcomes):
+    """스캐너 한 대: interval초마다 한 명씩 스캔하며 응답 시간 기록 (0이면 쉬지 않고 연속 스캔)"""
+    await asyncio.sleep(random.uniform(0, interval))
+    next_scan = time.perf_counter()
+    for token in scans:
+        start = time.perf_counter()
+        response = await client.post(f"/checkin/{token}")
+        latencies.append(time.perf_counter() - start)
+        outcomes[response.status_code] = outcomes.get(response.status_code, 0) + 1
+        next_scan += interval
+        await asyncio.sleep(max(next_scan - time.perf_counter(), 0))
+
+
+async def run_scanners(port, tokens, scanners, interval, contended=False):
+    # 스캐너마다 입장객 줄이 따로 있고, 일부는 같은 표를 다시 스캔
+    queues = [tokens[i::scanners] for i in range(scanners)]
+    if contended:
+        # 스캐너 두 대가 같은 줄을 같은 순서로 동시에 스캔 (서로 다른 워커로 갈 수 있다)
+        queues = [list(scans) for scans in queues for _ in range(2)]
+        scanners *= 2
+    else:
+        for scans in queues:
+            repeats = random.sample(scans, int(len(scans) * REPEAT_RATIO))
+            scans.extend(repeats)
+    latencies = []
+    outcomes = {}
+    limits = httpx.Limits(max_connections=scanners)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(scanner(client, scans, interval, latencies, outcomes) for scans in queues))
+        seconds = time.perf_counter() - start
+    return sorted(latencies), outcomes, seconds
+
+
+def percentile(sorted_values, ratio):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * ratio))]
+
+
+def report(title, latencies, outcomes, seconds):
+    print(f"- {title}: {len(latencies):,}회, 응답 {dict(sorted(outcomes.items()))}, {len(latencies) / seconds:,.0f}회/s")
+    print(f"  P50 {percentile(latencies, 0.50) * 1000:.1f}ms / P95 {percentile(latencies, 0.95) * 1000:.1f}ms / "
+          f"P99 {percentile(latencies, 0.99) * 1000:.1f}ms / 최대 {latencies[-1] * 1000:.1f}ms")
+
+
+def count_checked_in(engine):
+    """DB의 입장 처리 건수와 checked_in 이벤트 수"""
+    with engine.connect() as conn:
+        checked_in = conn.execute(
+            select(func.count()).where(Reservation.status == ReservationStatus.checked_in)
+        ).scalar()
+        events = conn.execute(
+            select(func.count()).where(ReservationEvent.event_type == 'checked_in')
+        ).scalar()
+    engine.dispose()
+    return checked_in, events
+
+
+def stop_server(server):
+    # SIGINT으로 정상 종료해야 대기 중인 입장 기록이 DB에 모두 쓰인다
+    server.send_signal(signal.SIGINT)
+    server.wait(timeout=120)
+
+
+def main():
+    seats = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    scanners = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'checkin.db')}"
+        engine, tokens = prepare_database(database_url, seats)
+        port = free_port()
+        server = start_server(database_url, port)
+        try:
+            # 앞쪽 절반은 입장 속도로, 나머지 절반은 쉬지 않고 연속 스캔해서 처리 한계 확인
+            half = len(tokens) // 2
+            paced = asyncio.run(run_scanners(port, tokens[:half], scanners, SCAN_INTERVAL))
+            burst = asyncio.run(run_scanners(port, tokens[half:], scanners, 0))
+        finally:
+            stop_server(server)
+        checked_in, events = count_checked_in(engine)
+
+        database_url = f"sqlite:///{os.path.join(tmp, 'workers.db')}"
+        workers_engine, tokens = prepare_database(database_url, seats)
+        port = free_port()
+        server = start_server(database_url, port, workers=WORKERS)
+        try:
+            contended = asyncio.run(run_scanners(port, tokens, scanners, 0, contended=True))
+        finally:
+            stop_server(server)
+        workers_checked_in, workers_events = count_checked_in(workers_engine)
+
+    assert paced[1].get(200, 0) + burst[1].get(200, 0) == seats, (paced[1], burst[1])
+    assert checked_in == events == seats, (checked_in, events)
+    assert contended[1] == {200: seats, 409: seats}, contended[1]
+    assert workers_checked_in == workers_events == seats, (workers_checked_in, workers_events)
+
+    print(f"📊 입장 스캔 (좌석 {seats:,}, 스캐너 {scanners}대 동시, 재스캔 {REPEAT_RATIO:.0%})")
+    report(f"스캐너마다 {SCAN_INTERVAL}초 간격", *paced)
+    report("연속 스캔 (처리 한계)", *burst)
+    print(f"- 종료 후 DB 입장 처리: {checked_in:,}건, 입장 이벤트 {events:,}건")
+    report(f"워커 {WORKERS}개, 표마다 스캐너 2대 동시 스캔", *contended)
+    print(f"- 종료 후 DB 입장 처리: {workers_checked_in:,}건, 입장 이벤트 {workers_events:,}건 (중복 입장 없음)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""
+오프라인 스캔 일괄 업로드 벤치마크 - POST /checkin/batch vs 스캔마다 PATCH /reservations/{id}/status
+
+리더 3대가 오프라인으로 모은 스캔(같은 표를 여러 리더가 스캔한 중복, 없는 토큰, 취소된 예약 포함)을
+두 번에 나눠 올린다. 업로드 전에 일부 표는 온라인 게이트에서 먼저(더 늦은 시각에) 입장했고, 두 번째
+업로드에는 첫 업로드보다 이른 스캔이 섞여 있어 첫 스캔 기록이 바로잡혀야 한다. 결과가 "표마다
+가장 이른 스캔이 입장"과 같은지 확인한다.
+
+실행: python benchmarks/bench_checkin_batch.py [좌석 수]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TMP_DIR = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(TMP_DIR, 'checkin_batch.db')}"
+os.environ.setdefault('QR_TOKEN_KEY', 'benchmark-key')
+os.environ.setdefault('QR_SIGNING_KEY', 'benchmark-signing-key')
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+
+from app.db import get_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Reservation, ReservationEvent, ReservationStatus  # noqa: E402
+from app.tokens import get_token_allocator  # noqa: E402
+from bench_save import PERFORMANCE_INFO, make_chunks  # noqa: E402
+from storage import (  # noqa: E402
+    create_schema, issue_performance_tokens, save_reservations, set_reservation_status, write_transaction,
+)
+
+READERS = ('gate-a', 'gate-b', 'gate-c')
+
+
+def prepare(engine, seats, time_slot):
+    performance_id, _ = save_reservations(engine, {**PERFORMANCE_INFO, 'time': time_slot}, make_chunks(seats))
+    with write_transaction(engine) as conn:
+        issued = issue_performance_tokens(conn, performance_id, get_token_allocator().token_for)
+    return performance_id, dict((token, reservation_id) for reservation_id, token in issued)
+
+
+def make_scans(tokens, cancelled, start):
+    """리더별 오프라인 스캔: 입장객의 80%를 스캔하고 30%는 다른 리더도 스캔, 없는 토큰/취소표 포함"""
+    rng = random.Random(7)
+    scans = []
+    for token in rng.sample(tokens, int(len(tokens) * 0.8)):
+        for reader in rng.sample(READERS, 2 if rng.random() < 0.3 else 1):
+            scans.append((token, reader, start + timedelta(seconds=rng.uniform(0, 3600))))
+    scans += [(f"zz{index:06d}", 'gate-a', start) for index in range(50)]
+    scans += [(token, 'gate-b', start + timedelta(seconds=10)) for token in cancelled]
+    rng.shuffle(scans)
+    return scans
+
+
+def as_payload(scans):
+    return {'scans': [
+        {'token': token, 'reader_id': reader, 'scanned_at': scanned_at.isoformat()}
+        for token, reader, scanned_at in scans
+    ]}
+
+
+def main():
+    seats = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    engine = get_engine()
+    create_schema(engine)
+    batch_id, batch_tokens = prepare(engine, seats, '19:00')
+    replay_id, replay_tokens = prepare(engine, seats, '14:00')
+    for tokens in (batch_tokens, replay_tokens):
+        for token in list(tokens)[:100]:
+            set_reservation_status(engine, tokens[token], ReservationStatus.cancelled)
+
+    start = datetime(2024, 11, 25, 18, 0, tzinfo=timezone.utc)
+    batch_scans = make_scans(list(batch_tokens)[100:], list(batch_tokens)[:100], start)
+    # 두 번째 업로드(gate-c)는 늦게 올라오지만 스캔 시각은 더 이르다
+    first_upload = [scan for scan in batch_scans if scan[1] != 'gate-c']
+    second_upload = [scan for scan in batch_scans if scan[1] == 'gate-c']
+
+    cancelled = set(list(batch_tokens)[:100])
+    online = sorted({token for token, _, _ in first_upload if token in batch_tokens} - cancelled)[:200]
+    with TestClient(app) as client:
+        # 온라인 게이트 스캔 (쓰기 대기열에 있는 채로 업로드가 들어와도 병합에 포함되어야 한다)
+        for token in online:
+            response = client.post(f"/checkin/{token}")
+            assert response.status_code == 200, response.text
+
+        started = time.perf_counter()
+        responses = []
+        for upload in (first_upload, second_upload):
+            response = client.post('/checkin/batch', json=as_payload(upload))
+            assert response.status_code == 200, response.text
+            responses.append(response.json())
+        batch_seconds = time.perf_counter() - started
+
+        # 같은 스캔을 다른 회차(같은 순서의 예약)에 스캔마다 하나씩 다시 적용
+        same_seat = dict(zip(batch_tokens, replay_tokens))
+        replay_scans = [(same_seat.get(token, token), reader, scanned_at) for token, reader, scanned_at in batch_scans]
+        started = time.perf_counter()
+        replay_errors = 0
+        for token, reader, scanned_at in replay_scans:
+            reservation_id = replay_tokens.get(token)
+            if reservation_id is None:
+                replay_errors += 1
+                continue
+            response = client.patch(
+                f"/reservations/{reservation_id}/status",
+                json={'status': 'checked_in', 'note': f"{reader} {scanned_at.isoformat()}"},
+            )
+            assert response.status_code == 200, response.text
+        replay_seconds = time.perf_counter() - started
+
+    # 표마다 가장 이른 스캔이 입장 기록이어야 한다
+    earliest = {}
+    for token, reader, scanned_at in batch_scans:
+        if token in batch_tokens and (token not in earliest or scanned_at < earliest[token][0]):
+            earliest[token] = (scanned_at, reader)
+    final = {}
+    for response, upload in zip(responses, (first_upload, second_upload)):
+        for result, (token, _, _) in zip(response['results'], upload):
+            if result['verdict'] == 'unknown_token':
+                assert token not in batch_tokens
+            elif token in cancelled:
+                assert result['verdict'] == 'not_issued' and result['status'] == 'cancelled'
+            else:
+                final[token] = (datetime.fromisoformat(result['first_scanned_at']), result['first_reader_id'])
+    assert final == {token: first for token, first in earliest.items() if token not in cancelled}
+
+    with engine.connect() as conn:
+        def count_events(performance_id):
+            return conn.execute(
+                select(func.count()).select_from(ReservationEvent)
+                .join(Reservation, Reservation.id == ReservationEvent.reservation_id)
+                .where(Reservation.performance_id == performance_id,
+                       ReservationEvent.new_status == ReservationStatus.checked_in)
+            ).scalar()
+
+        def count_checked_in(performance_id):
+            return conn.execute(
+                select(func.count()).where(Reservation.performance_id == performance_id,
+                                           Reservation.status == ReservationStatus.checked_in)
+            ).scalar()
+
+        batch_checked_in, replay_checked_in = count_checked_in(batch_id), count_checked_in(replay_id)
+        batch_events, replay_events = count_events(batch_id), count_events(replay_id)
+        corrected = conn.execute(
+            select(func.count()).select_from(ReservationEvent)
+            .where(ReservationEvent.previous_status == ReservationStatus.checked_in,
+                   ReservationEvent.new_status == ReservationStatus.checked_in,
+                   ReservationEvent.event_type == 'checked_in')
+        ).scalar()
+
+    admitted = len(final)
+    assert batch_checked_in == admitted
+    print(f"📊 오프라인 스캔 병합 (좌석 {seats:,}, 스캔 {len(batch_scans):,}건: 리더 {len(READERS)}대 중복/없는 토큰/취소표 포함)")
+    print(f"- POST /checkin/batch 2회: {batch_seconds:.2f}s, 입장 {batch_checked_in:,}건, "
+          f"입장 이벤트 {batch_events:,}건 (온라인 {len(online)}건 포함, 첫 스캔 기록 정정 {corrected:,}건)")
+    print(f"- 스캔마다 PATCH:          {replay_seconds:.2f}s, 입장 {replay_checked_in:,}건, "
+          f"입장 이벤트 {replay_events:,}건 (취소표도 입장 처리, 중복 이벤트, 없는 토큰 {replay_errors}건은 조회 불가)")
+    print(f"- 속도 향상: {replay_seconds / batch_seconds:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+QR 입장 기록 쓰기 벤치마크 - 이벤트를 스캔마다 커밋 vs 모아서 한 번에 커밋 (CheckinService 쓰기 스레드, HTTP 없이)
+
+입장 판정(상태 변경)은 두 경우 모두 스캔마다 조건부 UPDATE로 커밋하고, checked_in 이벤트만
+쓰기 스레드가 쓴다. 스캔을 모두 받은 직후 stop()으로 종료해 대기열에 남은 이벤트가 모두
+쓰이는지, 스캔 순서대로 쌓이는지 확인한다. 대기열이 작을 때 넘친 스캔이 입장 처리되지 않고
+busy로 거절되며 다시 스캔할 수 있는지도 확인한다.
+
+실행: python benchmarks/bench_checkin_writer.py [좌석 수]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, func, select  # noqa: E402
+
+from app.checkin import CheckinOutcome, CheckinService  # noqa: E402
+from app.models import Reservation, ReservationEvent, ReservationStatus  # noqa: E402
+from bench_checkin import prepare_database  # noqa: E402
+from storage import fetch_summary  # noqa: E402
+
+
+def run(tmp, name, seats, **options):
+    """좌석 수만큼 스캔하고 (응답 시간 합, 종료까지 걸린 시간, 커밋 수) 반환"""
+    engine, tokens = prepare_database(f"sqlite:///{os.path.join(tmp, name)}.db", seats)
+    service = CheckinService(engine, refresh_seconds=3600, **options)
+    service.start()
+    commits = []
+    event.listen(engine, 'commit', lambda conn: commits.append(1))
+
+    start = time.perf_counter()
+    for token in tokens:
+        assert service.check_in(token)[0] is CheckinOutcome.checked_in
+    accepted = time.perf_counter() - start
+    service.stop()
+    drained = time.perf_counter() - start
+
+    with engine.connect() as conn:
+        checked_in = conn.execute(
+            select(Reservation.token).where(Reservation.status == ReservationStatus.checked_in)
+        ).scalars().all()
+        event_order = conn.execute(
+            select(Reservation.token).join(ReservationEvent, ReservationEvent.reservation_id == Reservation.id)
+            .where(ReservationEvent.event_type == 'checked_in').order_by(ReservationEvent.id)
+        ).scalars().all()
+        performance_id = conn.execute(select(func.max(Reservation.performance_id))).scalar()
+        assert fetch_summary(conn, performance_id)['by_status'] == {ReservationStatus.checked_in: seats}
+    engine.dispose()
+
+    assert len(checked_in) == seats
+    assert event_order == tokens
+    return accepted, drained, len(commits)
+
+
+def run_backpressure(tmp, seats):
+    """대기열 100건, 기다리지 않음: 넘친 스캔은 busy로 거절되고 다시 스캔하면 입장된다"""
+    engine, tokens = prepare_database(f"sqlite:///{os.path.join(tmp, 'backpressure')}.db", seats)
+    service = CheckinService(engine, refresh_seconds=3600, queue_size=100, queue_timeout=0)
+    service.start()
+    rejected = [token for token in tokens if service.check_in(token)[0] is CheckinOutcome.busy]
+    retried = 0
+    for token in rejected:
+        while service.check_in(token)[0] is CheckinOutcome.busy:
+            time.sleep(0.01)
+        retried += 1
+    service.stop()
+
+    with engine.connect() as conn:
+        checked_in = conn.execute(
+            select(func.count()).where(Reservation.status == ReservationStatus.checked_in)
+        ).scalar()
+    engine.dispose()
+    assert checked_in == seats
+    return len(rejected), retried
+
+
+def main():
+    seats = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        single = run(tmp, 'single', seats, batch_size=1, flush_seconds=0)
+        batched = run(tmp, 'batched', seats)
+        rejected, retried = run_backpressure(tmp, seats)
+
+    print(f"📊 입장 기록 쓰기 ({seats:,}건, 모두 받은 직후 종료)")
+    for title, (accepted, drained, commits) in (('스캔마다 커밋', single), ('모아서 커밋', batched)):
+        print(f"- {title}: 스캔 응답 {accepted / seats * 1e6:.0f}µs/건, "
+              f"DB 반영까지 {drained:.2f}s ({seats / drained:,.0f}건/s), 커밋 {commits:,}회")
+    print(f"- 속도 향상: {single[1] / batched[1]:.1f}x")
+    print(f"- 대기열 100건: {rejected:,}건 busy 거절 → 다시 스캔해 {retried:,}건 입장, DB 누락 없음")
+
+
+if __name__ == '__main__':
+    main()
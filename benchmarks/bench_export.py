@@ -0,0 +1,84 @@
+"""
+예약 리스트 내보내기 벤치마크 - 기존 DataFrame + pd.ExcelWriter vs write-only 스트리밍
+
+실행: python benchmarks/bench_export.py [행 수]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import create_db_engine  # noqa: E402
+from bench_save import PERFORMANCE_INFO, make_chunks  # noqa: E402
+from export import EXPORT_COLUMNS, ExportCache, export_reservations  # noqa: E402
+from storage import create_schema, fetch_reservations, save_reservations  # noqa: E402
+
+
+def legacy_export(conn, performance_id):
+    """기존 create_download_excel (전체 DataFrame을 메모리 워크북으로)"""
+    df = pd.DataFrame(fetch_reservations(conn, performance_id), columns=EXPORT_COLUMNS)
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False, sheet_name='예약리스트')
+    output.seek(0)
+    return output
+
+
+def measure(func):
+    """(실행 시간, 최대 Python 메모리 사용량 MB) - tracemalloc이 실행을 느리게 하므로 따로 측정"""
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 1024 / 1024
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'export.db')}")
+        create_schema(engine)
+        performance_id, _ = save_reservations(engine, PERFORMANCE_INFO, make_chunks(rows))
+        conn = engine.connect()
+        cache = ExportCache(os.path.join(tmp, 'export_cache'))
+
+        runs = iter(range(100))
+
+        def export(file_format):
+            # 실행마다 빈 캐시 폴더를 써서 캐시를 거치지 않고 새로 생성
+            return lambda: export_reservations(
+                engine, performance_id, file_format,
+                cache=ExportCache(os.path.join(tmp, f"export_run_{next(runs)}"))
+            )
+
+        legacy_seconds, legacy_mb = measure(lambda: legacy_export(conn, performance_id))
+        xlsx_seconds, xlsx_mb = measure(export('xlsx'))
+        csv_seconds, csv_mb = measure(export('csv'))
+
+        export_reservations(engine, performance_id, 'xlsx', cache=cache)
+        start = time.perf_counter()
+        export_reservations(engine, performance_id, 'xlsx', cache=cache)
+        cached_seconds = time.perf_counter() - start
+        conn.close()
+        engine.dispose()
+
+    print(f"📊 {rows:,}건 내보내기")
+    print(f"- 기존 pd.ExcelWriter: {legacy_seconds:.3f}s, 최대 {legacy_mb:.1f}MB")
+    print(f"- write-only xlsx:     {xlsx_seconds:.3f}s, 최대 {xlsx_mb:.1f}MB")
+    print(f"- 스트리밍 csv:        {csv_seconds:.3f}s, 최대 {csv_mb:.1f}MB")
+    print(f"- 캐시된 xlsx:         {cached_seconds * 1000:.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+QR 발권 벤치마크 - 예약별 POST /reservations/{id}/issue-qr vs 회차 일괄 POST /performances/{id}/issue-qr
+
+실행: python benchmarks/bench_issue_qr.py [좌석 수]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TMP_DIR = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(TMP_DIR, 'issue_qr.db')}"
+os.environ.setdefault('QR_TOKEN_KEY', 'benchmark-key')
+os.environ.setdefault('QR_SIGNING_KEY', 'benchmark-signing-key')
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, func, select  # noqa: E402
+
+from app.db import get_async_engine, get_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Reservation, ReservationEvent, ReservationStatus  # noqa: E402
+from bench_save import PERFORMANCE_INFO, make_chunks  # noqa: E402
+from storage import create_schema, fetch_summary, save_reservations  # noqa: E402
+
+
+class QueryCounter:
+    """엔진들에서 실행된 SQL 문 수"""
+
+    def __init__(self, *engines):
+        self.count = 0
+        for engine in engines:
+            event.listen(engine, 'before_cursor_execute', self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+def measure(counter, request):
+    counter.count = 0
+    start = time.perf_counter()
+    request()
+    return time.perf_counter() - start, counter.count
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    engine = get_engine()
+    create_schema(engine)
+    single_id, _ = save_reservations(engine, {**PERFORMANCE_INFO, 'time': '14:00'}, make_chunks(rows))
+    batch_id, _ = save_reservations(engine, PERFORMANCE_INFO, make_chunks(rows))
+    with engine.connect() as conn:
+        single_ids = conn.execute(
+            select(Reservation.id).where(Reservation.performance_id == single_id)
+        ).scalars().all()
+
+    client = TestClient(app)
+    counter = QueryCounter(engine, get_async_engine().sync_engine)
+
+    def issue_one_by_one():
+        for reservation_id in single_ids:
+            assert client.post(f"/reservations/{reservation_id}/issue-qr").status_code == 200
+
+    def issue_batch():
+        response = client.post(f"/performances/{batch_id}/issue-qr")
+        assert response.status_code == 200, response.text
+        assert response.json()['issued'] == rows
+
+    single_seconds, single_queries = measure(counter, issue_one_by_one)
+    batch_seconds, batch_queries = measure(counter, issue_batch)
+
+    with engine.connect() as conn:
+        for performance_id in (single_id, batch_id):
+            assert fetch_summary(conn, performance_id)['by_status'] == {ReservationStatus.issued: rows}
+        assert conn.execute(
+            select(func.count(func.distinct(Reservation.token))).where(Reservation.token.is_not(None))
+        ).scalar() == rows * 2
+        assert conn.execute(
+            select(func.count()).select_from(ReservationEvent).where(ReservationEvent.event_type == 'qr_issued')
+        ).scalar() == rows * 2
+
+    print(f"📊 QR 발권 {rows:,}건")
+    print(f"- 예약별 발권: {single_seconds:.3f}s, SQL {single_queries:,}회")
+    print(f"- 회차 일괄:   {batch_seconds:.3f}s, SQL {batch_queries:,}회")
+    print(f"- 속도 향상:   {single_seconds / batch_seconds:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
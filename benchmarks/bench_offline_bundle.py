@@ -0,0 +1,92 @@
+"""
+오프라인 입장 번들 벤치마크 - GET /performances/{id}/offline-bundle(전체)과 /delta(변경분) 크기 비교
+
+예약 전체를 JSON으로 다시 받는 경우와, 리더가 오프라인인 동안 일부가 입장/취소된 뒤
+변경분만 받아 적용하는 경우를 비교한다. 변경분을 적용한 결과가 새 전체 번들과 같은지도 확인한다.
+
+실행: python benchmarks/bench_offline_bundle.py [좌석 수] [변경 비율]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TMP_DIR = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(TMP_DIR, 'offline_bundle.db')}"
+os.environ.setdefault('QR_TOKEN_KEY', 'benchmark-key')
+os.environ.setdefault('QR_SIGNING_KEY', 'benchmark-signing-key')
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from app.db import get_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Reservation, ReservationStatus  # noqa: E402
+from app.offline import apply_bundle  # noqa: E402
+from bench_save import PERFORMANCE_INFO, make_chunks  # noqa: E402
+from storage import claim_checkin, create_schema, save_reservations, set_reservation_status  # noqa: E402
+
+
+def fetch(client, url):
+    start = time.perf_counter()
+    response = client.get(url)
+    assert response.status_code == 200, response.text
+    return response.content, time.perf_counter() - start
+
+
+def main():
+    seats = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    change_ratio = float(sys.argv[2]) if len(sys.argv) > 2 else 0.02
+    # 스냅샷 캐시(data/offline_bundle_cache)가 저장소 안에 쌓이지 않도록 임시 폴더에서 실행
+    os.chdir(TMP_DIR)
+
+    engine = get_engine()
+    create_schema(engine)
+    performance_id, _ = save_reservations(engine, PERFORMANCE_INFO, make_chunks(seats))
+    client = TestClient(app)
+    assert client.post(f"/performances/{performance_id}/issue-qr").status_code == 200
+
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(Reservation.id, Reservation.token, Reservation.name, Reservation.phone,
+                   Reservation.seat_info, Reservation.quantity, Reservation.status)
+            .where(Reservation.performance_id == performance_id).order_by(Reservation.id)
+        ).all()
+        listing = json.dumps([
+            {**row._asdict(), 'status': row.status.value} for row in rows
+        ], ensure_ascii=False).encode()
+
+    full, full_seconds = fetch(client, f"/performances/{performance_id}/offline-bundle")
+    reader = apply_bundle(full)
+    assert len(reader.tokens) == seats
+
+    # 리더가 오프라인인 동안 다른 게이트에서 입장, 예매처에서 취소
+    changed = max(int(seats * change_ratio), 1)
+    for row in rows[:changed]:
+        claim_checkin(engine, row.id)
+    for row in rows[changed:changed * 3 // 2]:
+        set_reservation_status(engine, row.id, ReservationStatus.cancelled)
+
+    delta, delta_seconds = fetch(client, f"/performances/{performance_id}/offline-bundle/delta?since={reader.version}")
+    synced = apply_bundle(delta, reader)
+    latest, _ = fetch(client, f"/performances/{performance_id}/offline-bundle")
+    expected = apply_bundle(latest)
+    assert synced.version == expected.version
+    assert synced.tokens == expected.tokens and synced.revoked == expected.revoked
+    assert len(synced.tokens) == seats - changed * 3 // 2
+
+    unchanged, _ = fetch(client, f"/performances/{performance_id}/offline-bundle/delta?since={synced.version}")
+
+    print(f"📊 오프라인 입장 번들 (좌석 {seats:,}석, 오프라인 중 변경 {changed * 3 // 2:,}건)")
+    print(f"- 예약 전체 JSON:  {len(listing) / 1024:,.1f} KB")
+    print(f"- 전체 번들:       {len(full) / 1024:,.1f} KB ({full_seconds * 1000:.0f}ms)")
+    print(f"- 변경분(delta):   {len(delta) / 1024:,.1f} KB ({delta_seconds * 1000:.0f}ms)")
+    print(f"- 변경 없음:       {len(unchanged)} bytes")
+    print(f"- 전체 번들 대비:  {len(full) / len(delta):.0f}x 작음")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+"""
+예약 데이터 저장 벤치마크 - 기존 행 단위 INSERT vs executemany + WAL (SQLAlchemy 엔진)
+
+현재 스키마는 예약 리스트 정렬 인덱스와 검색 인덱스(FTS5 trigram)를 함께 갱신하므로, 인덱스가
+없는 기존 스키마와 같은 시간으로는 비교할 수 없다. 같은 스키마에 행 단위로 넣는 경우도 함께 잰다.
+5만 건 기준 (SQLite 3.40):
+- 기존 스키마 행 단위 INSERT: 약 0.23-0.43s
+- 현재 스키마 행 단위 INSERT: 약 0.56-0.68s
+- save_reservations: 약 0.73-0.77s (회차 요약과 데이터 버전 포함)
+- 변경 없는 재저장: 약 0.56-0.62s
+save_reservations는 행 단위 INSERT보다 빠르지 않다. 그중 약 0.6s가 DB 작업(여러 행 INSERT와
+RETURNING, 검색 인덱스 색인, 커밋)이고, 같은 스키마에서는 행 단위 INSERT도 비슷하게 걸린다.
+이 경로의 이점은 속도가 아니라 문장 수가 행 수와 무관하고 한 트랜잭션으로 끝난다는 점이다.
+
+실행: python benchmarks/bench_save.py [행 수]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import create_db_engine  # noqa: E402
+from storage import IMPORT_STATUSES, create_schema, save_reservations  # noqa: E402
+
+PERFORMANCE_INFO = {'name': '벤치마크 공연', 'date': '2024.11.25', 'time': '19:00'}
+
+
+def make_chunks(rows, chunk_size=5000):
+    """통합명부 형식의 샘플 예약 데이터 chunk 생성"""
+    data = [
+        {
+            '예매처': '인터파크',
+            '예매번호': f"T{1000000 + i}",
+            '예매자명': f"예매자{i}",
+            '연락처': f"010-{i % 10000:04d}-{(i * 7) % 10000:04d}",
+            '좌석정보': f"{chr(65 + i % 8)}-{i % 30 + 1}" if i % 3 else '',
+            '매수': i % 4 + 1,
+            '배정상태': '지정' if i % 3 else '비지정',
+        }
+        for i in range(rows)
+    ]
+    return [data[start:start + chunk_size] for start in range(0, rows, chunk_size)]
+
+
+def create_legacy_schema(conn):
+    """기존 app.py의 Streamlit 전용 SQLite 스키마"""
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS performances (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            performance_name TEXT NOT NULL,
+            performance_date TEXT NOT NULL,
+            performance_time TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            total_reservations INTEGER DEFAULT 0,
+            UNIQUE(performance_name, performance_date, performance_time)
+        );
+
+        CREATE TABLE IF NOT EXISTS reservations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            performance_id INTEGER NOT NULL,
+            platform TEXT NOT NULL,
+            reservation_number TEXT,
+            name TEXT,
+            phone TEXT,
+            seat_info TEXT,
+            quantity INTEGER DEFAULT 0,
+            status TEXT,
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (performance_id) REFERENCES performances (id)
+        );
+    ''')
+
+
+def legacy_save(conn, performance_info, reservation_data):
+    """기존 save_to_database의 행 단위 INSERT (기본 journal/sync 설정)"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO performances (performance_name, performance_date, performance_time, created_at, updated_at, total_reservations)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (performance_info['name'], performance_info['date'], performance_info['time'],
+          datetime.now().isoformat(), datetime.now().isoformat(), len(reservation_data)))
+    performance_id = cursor.lastrowid
+
+    for reservation in reservation_data:
+        cursor.execute('''
+            INSERT INTO reservations (performance_id, platform, reservation_number, name, phone, seat_info, quantity, status, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (performance_id, reservation['예매처'], reservation['예매번호'], reservation['예매자명'],
+              reservation['연락처'], reservation['좌석정보'], reservation['매수'], reservation['배정상태'],
+              datetime.now().isoformat()))
+
+    conn.commit()
+
+
+def row_by_row_save(path, performance_info, reservation_data):
+    """현재 스키마(create_schema)에 행 단위 INSERT 후 검색 인덱스 색인 (같은 스키마 기준선)"""
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.execute('BEGIN IMMEDIATE')
+    performance_id = conn.execute('''
+        INSERT INTO performances (performance_name, performance_date, performance_time, created_at, updated_at,
+                                  data_version)
+        VALUES (?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, 1)
+    ''', (performance_info['name'], performance_info['date'], performance_info['time'])).lastrowid
+
+    for reservation in reservation_data:
+        conn.execute('''
+            INSERT INTO reservations (performance_id, platform, reservation_number, seat_info, name, phone, quantity, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (performance_id, reservation['예매처'], reservation['예매번호'], reservation['좌석정보'],
+              reservation['예매자명'], reservation['연락처'], reservation['매수'],
+              IMPORT_STATUSES[reservation['배정상태']].value))
+
+    conn.execute('''
+        INSERT INTO reservations_fts (rowid, name, phone, reservation_number)
+        SELECT id, name, phone, reservation_number FROM reservations
+    ''')
+    conn.execute('COMMIT')
+    conn.close()
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    chunks = make_chunks(rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_conn = sqlite3.connect(os.path.join(tmp, 'legacy.db'))
+        create_legacy_schema(legacy_conn)
+        start = time.perf_counter()
+        legacy_save(legacy_conn, PERFORMANCE_INFO, [row for chunk in chunks for row in chunk])
+        legacy_seconds = time.perf_counter() - start
+        legacy_conn.close()
+
+        # 기존 DB를 공용 스키마로 변환한 뒤 같은 파일(+새 예약)을 다시 가져올 수 있어야 한다
+        legacy_engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'legacy.db')}")
+        start = time.perf_counter()
+        create_schema(legacy_engine)
+        migrate_seconds = time.perf_counter() - start
+        _, migrated_counts = save_reservations(legacy_engine, PERFORMANCE_INFO, make_chunks(rows + 100))
+        legacy_engine.dispose()
+
+        row_path = os.path.join(tmp, 'row.db')
+        row_engine = create_db_engine(f"sqlite:///{row_path}")
+        create_schema(row_engine)
+        row_engine.dispose()
+        start = time.perf_counter()
+        row_by_row_save(row_path, PERFORMANCE_INFO, [row for chunk in chunks for row in chunk])
+        row_seconds = time.perf_counter() - start
+
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'bulk.db')}")
+        create_schema(engine)
+        start = time.perf_counter()
+        _, counts = save_reservations(engine, PERFORMANCE_INFO, chunks)
+        bulk_seconds = time.perf_counter() - start
+
+        # 같은 회차를 다시 저장하면 변경분만 기록
+        start = time.perf_counter()
+        _, refresh_counts = save_reservations(engine, PERFORMANCE_INFO, chunks)
+        refresh_seconds = time.perf_counter() - start
+        engine.dispose()
+
+    assert counts['inserted'] == rows
+    assert refresh_counts['unchanged'] == rows
+    assert migrated_counts['unchanged'] == rows and migrated_counts['inserted'] == 100
+
+    print(f"📊 {rows:,}건 저장")
+    print(f"- 기존 행 단위 INSERT:   {legacy_seconds:.3f}s (인덱스 없는 기존 스키마)")
+    print(f"- 현재 스키마 행 단위:   {row_seconds:.3f}s (정렬/검색 인덱스 포함)")
+    print(f"- save_reservations:     {bulk_seconds:.3f}s (정렬/검색 인덱스, 요약 포함)")
+    print(f"- 같은 스키마 행 단위와 차이: {bulk_seconds - row_seconds:+.3f}s")
+    print(f"- 변경 없는 재저장:      {refresh_seconds:.3f}s")
+    print(f"- 기존 DB 스키마 변환:   {migrate_seconds:.3f}s (변환 후 가져오기 {migrated_counts['total']:,}건 확인)")
+
+
+if __name__ == '__main__':
+    main()
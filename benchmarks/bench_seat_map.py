@@ -0,0 +1,103 @@
+"""
+좌석 지도 벤치마크 - 판매 좌석 문자열 리스트(seat_status.json 방식) vs 비트맵 좌석 지도(seat_map.py)
+
+대형 공연장 배치에서 좌석 조회, 선점/해제, 저장 크기, seat_status 테이블로 다시 만드는 시간을 비교한다.
+
+실행: python benchmarks/bench_seat_map.py [열 수] [열당 좌석 수]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.db import create_db_engine  # noqa: E402
+from app.models import Reservation, SeatStatus  # noqa: E402
+from bench_save import PERFORMANCE_INFO, make_chunks  # noqa: E402
+from seat_map import SEAT_AVAILABLE, SEAT_OCCUPIED, SeatLayout, SeatMap  # noqa: E402
+from storage import create_schema, fetch_seat_statuses, save_reservations, write_transaction  # noqa: E402
+
+OCCUPIED_RATIO = 0.6
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    seats_per_row = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    layout = SeatLayout([
+        {'name': f"{section}구역", 'rows': [f"{section}{row}" for row in range(rows // 4)], 'seats_per_row': seats_per_row}
+        for section in 'ABCD'
+    ])
+    codes = [layout.code(index) for index in range(layout.size)]
+    rng = random.Random(1)
+    occupied = rng.sample(codes, int(len(codes) * OCCUPIED_RATIO))
+    probes = rng.choices(codes, k=2000)
+
+    # 문자열 리스트: 조회마다 리스트를 훑는다
+    occupied_list = list(occupied)
+    list_hits, list_seconds = timed(lambda: sum(code in occupied_list for code in probes))
+
+    seat_map = SeatMap.from_statuses(layout, [(code, SEAT_OCCUPIED) for code in occupied])
+    map_hits, map_seconds = timed(lambda: sum(seat_map.status(code) == SEAT_OCCUPIED for code in probes))
+    assert list_hits == map_hits
+
+    free = [code for code in dict.fromkeys(probes) if seat_map.is_available(code)]
+
+    def hold_release():
+        for code in free:
+            assert seat_map.hold(code)
+        for code in free:
+            assert seat_map.release(code)
+    _, hold_seconds = timed(hold_release)
+    assert seat_map.occupied_count == len(occupied) and seat_map.held_count == 0
+
+    data = seat_map.to_bytes()
+    json_data = json.dumps({'occupied': occupied, 'selected': []}, ensure_ascii=False).encode()
+    restored, restore_seconds = timed(SeatMap.from_bytes, layout, data)
+    assert restored.seats(SEAT_OCCUPIED) == seat_map.seats(SEAT_OCCUPIED)
+
+    # seat_status 테이블(판매 좌석마다 한 행)로 다시 만들기
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'seat_map.db')}")
+        create_schema(engine)
+        performance_id, _ = save_reservations(engine, PERFORMANCE_INFO, make_chunks(len(occupied) // 4 + 1))
+        with write_transaction(engine) as conn:
+            reservation_ids = conn.execute(
+                select(Reservation.id).where(Reservation.performance_id == performance_id)
+            ).scalars().all()
+            conn.execute(insert(SeatStatus), [
+                {'reservation_id': reservation_ids[index // 4], 'seat_code': code, 'status': SEAT_OCCUPIED}
+                for index, code in enumerate(occupied)
+            ])
+
+        with engine.connect() as conn:
+            statuses, fetch_seconds = timed(fetch_seat_statuses, conn, performance_id)
+        rebuilt, build_seconds = timed(SeatMap.from_statuses, layout, statuses)
+        engine.dispose()
+    assert rebuilt.to_bytes() == data
+
+    lookups = len(probes)
+    print(f"📊 좌석 지도 (좌석 {layout.size:,}석, 판매 {len(occupied):,}석)")
+    print(f"- 좌석 조회 {lookups:,}회: 문자열 리스트 {list_seconds * 1000:,.1f}ms, "
+          f"비트맵 {map_seconds * 1000:.1f}ms ({list_seconds / map_seconds:,.0f}x)")
+    print(f"- 선점+해제 {len(free) * 2:,}회: {hold_seconds * 1000:.1f}ms "
+          f"({len(free) * 2 / hold_seconds:,.0f}회/s), 빈 좌석 {seat_map.available_count:,}석 "
+          f"= {len(seat_map.seats(SEAT_AVAILABLE)):,}석")
+    print(f"- 저장 크기: JSON {len(json_data) / 1024:,.1f} KB, 비트맵 {len(data) / 1024:,.1f} KB "
+          f"(복원 {restore_seconds * 1e6:.0f}µs)")
+    print(f"- seat_status {len(statuses):,}행으로 다시 만들기: 조회 {fetch_seconds * 1000:.0f}ms + "
+          f"비트맵 {build_seconds * 1000:.0f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+서명 티켓 벤치마크 - HS256 서명/검증 처리량 vs 스캔마다 DB에서 토큰 조회
+
+실행: python benchmarks/bench_tickets.py [티켓 수]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import update  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.checkin import TokenIndex  # noqa: E402
+from app.db import create_db_engine  # noqa: E402
+from app.models import Reservation, ReservationStatus  # noqa: E402
+from app.tokens import TicketSigner  # noqa: E402
+from bench_save import PERFORMANCE_INFO, make_chunks  # noqa: E402
+from storage import create_schema, save_reservations, write_transaction  # noqa: E402
+
+
+def db_lookups(tokens):
+    """기존 방식: 스캔마다 ORM으로 reservations.token 조회 -> 초당 조회 수"""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'tickets.db')}")
+        create_schema(engine)
+        save_reservations(engine, PERFORMANCE_INFO, make_chunks(len(tokens)))
+        with write_transaction(engine) as conn:
+            conn.execute(update(Reservation).values(token=Reservation.id.cast(Reservation.token.type)))
+        db = sessionmaker(bind=engine)()
+        start = time.perf_counter()
+        for reservation_id in range(1, len(tokens) + 1):
+            assert db.query(Reservation).filter_by(token=str(reservation_id)).first() is not None
+        seconds = time.perf_counter() - start
+        db.close()
+        engine.dispose()
+    return len(tokens) / seconds
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    signer = TicketSigner(b'benchmark-key')
+    index = TokenIndex()
+    # 취소된 예약 몇 건 (검증은 통과하지만 폐기 목록에 걸려야 함)
+    for reservation_id in range(0, count, 100):
+        index.track(f"t{reservation_id}", reservation_id, 1, ReservationStatus.cancelled)
+
+    start = time.perf_counter()
+    tickets = [signer.sign(i, f"예매자{i}", f"{chr(65 + i % 8)}-{i % 30 + 1}") for i in range(count)]
+    sign_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    revoked = 0
+    for ticket in tickets:
+        claims = signer.verify(ticket)
+        revoked += index.is_revoked(claims['ticket_id'])
+    verify_seconds = time.perf_counter() - start
+    assert revoked == len(range(0, count, 100))
+
+    lookup_rate = db_lookups(tickets[:min(count, 10_000)])
+
+    print(f"📊 서명 티켓 {count:,}장 (HS256 JWS, 평균 {sum(map(len, tickets)) / count:.0f}자)")
+    print(f"- 서명:            {count / sign_seconds:,.0f}장/s")
+    print(f"- 검증 + 폐기 확인: {count / verify_seconds:,.0f}장/s (DB 조회 없음)")
+    print(f"- 기존 DB 토큰 조회: {lookup_rate:,.0f}건/s")
+
+
+if __name__ == '__main__':
+    main()
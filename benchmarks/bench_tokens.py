@@ -0,0 +1,93 @@
+"""
+QR 토큰 발급 벤치마크 - 기존 난수 + 중복 조회 vs 키 기반 순열 (조회 없음, 워커 간 충돌 없음)
+
+실행: python benchmarks/bench_tokens.py [토큰 수]
+"""
+import os
+import secrets
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, update  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.db import create_db_engine  # noqa: E402
+from app.models import Reservation  # noqa: E402
+from app.tokens import TOKEN_LENGTH, TOKEN_SPACE, TokenAllocator, base36_encode  # noqa: E402
+from bench_save import PERFORMANCE_INFO, make_chunks  # noqa: E402
+from storage import create_schema, save_reservations  # noqa: E402
+
+KEY = b'benchmark-key'
+WORKERS = 4
+
+
+def legacy_tokens(count, existing=100_000):
+    """기존 _generate_unique_token (난수 토큰마다 ORM 쿼리로 중복 확인)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'tokens.db')}")
+        create_schema(engine)
+        save_reservations(engine, PERFORMANCE_INFO, make_chunks(existing))
+        with engine.begin() as conn:
+            conn.execute(update(Reservation).values(token=func.printf('%08d', Reservation.id)))
+
+        db = sessionmaker(bind=engine)()
+        queries = 0
+        start = time.perf_counter()
+        for _ in range(count):
+            while True:
+                token = base36_encode(secrets.randbelow(TOKEN_SPACE)).zfill(TOKEN_LENGTH)
+                queries += 1
+                if not db.query(Reservation).filter_by(token=token).first():
+                    break
+        seconds = time.perf_counter() - start
+        db.close()
+        engine.dispose()
+    return seconds, queries
+
+
+def allocate_range(bounds):
+    """워커 하나가 예약 ID 구간의 토큰을 발급 (키만 공유하고 서로 조율하지 않음) -> (토큰, 시간)"""
+    allocator = TokenAllocator(KEY)
+    start = time.perf_counter()
+    tokens = [allocator.token_for(reservation_id) for reservation_id in range(*bounds)]
+    return tokens, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    allocator = TokenAllocator(KEY)
+
+    legacy_count = min(count, 20_000)
+    legacy_seconds, legacy_queries = legacy_tokens(legacy_count)
+
+    start = time.perf_counter()
+    tokens = [allocator.token_for(reservation_id) for reservation_id in range(1, count + 1)]
+    single_seconds = time.perf_counter() - start
+    assert len(set(tokens)) == count
+    assert all(len(token) == TOKEN_LENGTH for token in tokens)
+    assert all(allocator.reservation_id_for(token) == reservation_id
+               for reservation_id, token in enumerate(tokens[:10_000], start=1))
+
+    # 워커마다 다른 ID 구간 (실제로는 DB가 예약 ID를 겹치지 않게 배정)
+    step = count // WORKERS
+    ranges = [(count + 1 + i * step, count + 1 + (i + 1) * step) for i in range(WORKERS)]
+    with ProcessPoolExecutor(WORKERS) as pool:
+        results = list(pool.map(allocate_range, ranges))
+    worker_tokens = [token for chunk, _ in results for token in chunk]
+    workers_seconds = max(seconds for _, seconds in results)
+    assert len(set(worker_tokens) | set(tokens)) == count + len(worker_tokens)
+
+    print(f"📊 QR 토큰 {count:,}개 발급")
+    print(f"- 기존 (난수 + ORM 조회, {legacy_count:,}개): {legacy_count / legacy_seconds:,.0f}개/s, "
+          f"SQL {legacy_queries:,}회")
+    print(f"- 키 기반 순열 (1개 코어): {count / single_seconds:,.0f}개/s, SQL 0회")
+    print(f"- 키 기반 순열 ({WORKERS}개 워커): {len(worker_tokens) / workers_seconds:,.0f}개/s, 워커 간 중복 0")
+    print(f"- 예시: {tokens[:3]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 """
 티켓츠 QR 발권 시스템 - 설정 파일
 """
+import os
 
 # 앱 기본 URL (Streamlit Cloud 배포 URL)
 # 실제 배포 후 업데이트 필요
@@ -9,6 +10,55 @@ APP_URL = "https://qr-ticketing-tcats-gogo.streamlit.app"
 # QR 코드 유효 시간 (시간 단위)
 QR_VALID_HOURS = 4
 
+# 예매 관리 데이터베이스 (SQLite)
+DB_PATH = "ticketz.db"
+
+# 동시에 열어 두는 데이터베이스 연결 수 (Streamlit 세션들이 나눠 사용)
+DB_POOL_SIZE = 8
+
+# 다른 연결이 쓰는 중일 때 기다리는 시간 (초)
+DB_BUSY_TIMEOUT = 30
+
+# 예약 리스트 한 페이지에 보여주는 행 수
+RESERVATION_PAGE_SIZE = 50
+
+# 예약 리스트 조회 결과 캐시 항목 수 (함수별, 데이터 버전이 바뀌면 새로 조회)
+QUERY_CACHE_MAX_ENTRIES = 256
+
+# 예약 리스트 내보내기(Excel/CSV) 파일 캐시 (같은 회차/필터/데이터 버전이면 다시 만들지 않음)
+EXPORT_CACHE_DIR = os.path.join("data", "export_cache")
+EXPORT_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# QR API 예약 일괄 등록 한 번에 받는 최대 건수
+BULK_MAX_ITEMS = 10000
+
+# QR 입장 처리 토큰 인덱스가 다른 프로세스(예매 파일 가져오기, 다른 API 워커)의 변경을 확인하는 주기 (초)
+CHECKIN_INDEX_REFRESH_SECONDS = 5
+
+# QR 입장 기록 쓰기 대기열 (스캔을 모아 한 트랜잭션으로 커밋)
+CHECKIN_WRITE_BATCH_SIZE = 500         # 한 번에 커밋하는 최대 스캔 수
+CHECKIN_WRITE_FLUSH_SECONDS = 0.1      # 첫 스캔 후 더 모으며 기다리는 최대 시간 (초)
+CHECKIN_WRITE_QUEUE_SIZE = 10000       # 아직 쓰지 않은 스캔 최대 수 (가득 차면 입장 요청이 기다림)
+CHECKIN_WRITE_QUEUE_TIMEOUT = 5        # 대기열에 자리가 날 때까지 기다리는 시간 (초, 넘으면 503)
+CHECKIN_WRITE_RETRIES = 3              # 커밋 실패 시 같은 묶음을 다시 시도하는 횟수
+
+# 오프라인 리더 스캔 일괄 업로드(POST /checkin/batch) 한 번에 받는 최대 건수
+CHECKIN_BATCH_MAX_ITEMS = 10000
+
+# 오프라인 입장 번들 스냅샷 캐시 (리더가 가진 버전과 비교해 변경분만 내려줄 때 사용)
+OFFLINE_BUNDLE_CACHE_DIR = os.path.join("data", "offline_bundle_cache")
+OFFLINE_BUNDLE_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# 예매 파일 통합 시 한 번에 처리/저장하는 행 수
+INGEST_CHUNK_SIZE = 5000
+
+# 여러 예매 파일을 동시에 파싱하는 프로세스 수 (1이면 순차 처리)
+INGEST_MAX_WORKERS = os.cpu_count() or 1
+
+# 예매 파일 파싱 결과 캐시 (같은 파일 재업로드 시 다시 파싱하지 않음)
+PARSE_CACHE_DIR = os.path.join("data", "parse_cache")
+PARSE_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
 # SMS 인증 설정
 SMS_CONFIG = {
     "code_length": 4,           # 인증번호 자릿수
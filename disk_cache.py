@@ -0,0 +1,119 @@
+"""
+티켓츠 예매 관리 - 디스크 캐시 공통 기반
+
+캐시 항목을 디렉터리 안의 파일 하나씩으로 저장하고, 전체 용량이 한도를 넘으면 가장
+오래 사용하지 않은 항목부터 삭제한다(LRU, 파일 수정 시각 기준). 파싱 결과, 내보내기
+파일, 오프라인 번들 스냅샷 캐시가 이 클래스를 상속해 항목 형식만 따로 정한다.
+"""
+import os
+import pickle
+import tempfile
+import zlib
+
+
+class DiskCache:
+    """디스크 기반 캐시 (용량 제한 LRU)"""
+
+    suffix = '.cache'
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}{self.suffix}")
+
+    def get(self, key):
+        """캐시 항목 조회 (없거나 손상된 경우 None)"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.loads(zlib.decompress(f.read()))
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # 손상된 항목은 삭제하고 다시 만든다
+            self._remove(path)
+            return None
+
+        self._touch(path)
+        return entry
+
+    def put(self, key, entry):
+        """캐시 항목 저장 후 용량 한도를 넘으면 오래된 항목 삭제"""
+        data = zlib.compress(pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL))
+        if len(data) > self.max_bytes:
+            return
+
+        tmp_path = self._new_tmp()
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+        except Exception:
+            self._remove(tmp_path)
+            raise
+        self._publish(tmp_path, key)
+
+    def contains(self, key):
+        """캐시 항목이 있는지 (확인한 뒤 LRU로 삭제될 수 있으므로 읽은 결과도 확인)"""
+        return os.path.exists(self._path(key))
+
+    def _touch(self, path):
+        """최근 사용 시각 갱신 (LRU 기준, 항목이 없으면 False)"""
+        try:
+            os.utime(path)
+        except OSError:
+            return False
+        return True
+
+    def _new_tmp(self):
+        """캐시 디렉터리 안의 빈 임시 파일 경로 (다 쓴 뒤 _publish로 항목이 된다)"""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(fd)
+        return tmp_path
+
+    def _publish(self, tmp_path, key, keep=False):
+        """다 쓴 임시 파일을 key 항목으로 교체하고 용량 정리 후 항목 경로 반환
+
+        다른 프로세스가 중간 상태의 파일을 읽지 않도록 항목은 항상 임시 파일에 쓴 뒤 한 번에
+        교체한다. keep이면 방금 교체한 항목은 이번 정리에서 삭제하지 않는다. 교체에 실패하면
+        임시 파일을 지우고 오류를 전달한다.
+        """
+        path = self._path(key)
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            self._remove(tmp_path)
+            raise
+        self._evict(keep=path if keep else None)
+        return path
+
+    def _evict(self, keep=None):
+        """용량 한도를 넘으면 오래된 항목부터 삭제 (keep 경로는 용량에만 포함하고 삭제하지 않음)"""
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.suffix):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            total += stat.st_size
+            if path != keep:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
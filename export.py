@@ -0,0 +1,110 @@
+"""
+티켓츠 예매 관리 - 예약 리스트 내보내기 (Excel/CSV)
+
+다운로드 파일은 요청할 때만 만든다. 예약 행은 DB 커서에서 한 행씩 읽어 바로 파일에
+쓰므로(openpyxl write-only 모드, csv 모듈) 회차 규모와 관계없이 메모리 사용량이 일정하다.
+만든 파일은 (회차, 필터, 데이터 버전)별로 디스크에 캐시해 같은 리스트를 다시 받으면
+바로 내려준다. 예약을 저장하거나 상태를 바꾸면 데이터 버전이 바뀌므로 이전 파일은
+쓰이지 않고 LRU로 정리된다.
+"""
+import csv
+import hashlib
+
+from openpyxl import Workbook
+
+from config import EXPORT_CACHE_DIR, EXPORT_CACHE_MAX_BYTES
+from disk_cache import DiskCache
+from storage import fetch_data_version, iter_reservations, read_transaction
+
+# 파일 형식을 바꾸면 올려서 이전 캐시를 무효화
+EXPORT_VERSION = 1
+
+EXPORT_COLUMNS = ['예매처', '예매번호', '예매자명', '연락처', '좌석정보', '매수', '배정상태']
+
+# 형식 -> (확장자, MIME 타입)
+EXPORT_FORMATS = {
+    'xlsx': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'csv': ('csv', 'text/csv'),
+}
+
+
+def write_xlsx(rows, path):
+    """예약 행을 write-only 워크북으로 저장 (행을 메모리에 모으지 않음)"""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('예약리스트')
+    sheet.append(EXPORT_COLUMNS)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+
+def write_csv(rows, path):
+    """예약 행을 CSV로 저장 (Excel에서 한글이 깨지지 않도록 UTF-8 BOM 포함)"""
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_COLUMNS)
+        writer.writerows(rows)
+
+
+_WRITERS = {'xlsx': write_xlsx, 'csv': write_csv}
+
+
+class ExportCache(DiskCache):
+    """디스크 기반 내보내기 파일 캐시 (용량 제한 LRU)"""
+
+    suffix = '.export'
+
+    def __init__(self, directory=EXPORT_CACHE_DIR, max_bytes=EXPORT_CACHE_MAX_BYTES):
+        super().__init__(directory, max_bytes)
+
+    def get_path(self, key):
+        """캐시된 파일 경로 (없으면 None)"""
+        path = self._path(key)
+        return path if self._touch(path) else None
+
+    def build(self, key, write):
+        """write(path)로 파일을 만들어 캐시에 넣고 경로 반환
+
+        용량 정리에서 방금 만든 파일은 빼므로, 파일 하나가 한도보다 커도 반환한 경로는 남아
+        있다 (다음 정리 때 삭제). 다른 세션의 정리로 지워질 수는 있으므로 호출한 쪽은 파일이
+        없으면 다시 만든다.
+        """
+        tmp_path = self._new_tmp()
+        try:
+            write(tmp_path)
+        except Exception:
+            self._remove(tmp_path)
+            raise
+        return self._publish(tmp_path, key, keep=True)
+
+
+def export_key(performance_id, data_version, file_format, platforms=None, statuses=None, search_text=''):
+    """(회차, 데이터 버전, 형식, 필터)별 캐시 키"""
+    parts = (
+        EXPORT_VERSION, performance_id, data_version, file_format,
+        sorted(platforms or ()), sorted(statuses or ()), search_text.strip(),
+    )
+    return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()
+
+
+_default_cache = ExportCache()
+
+
+def export_reservations(engine, performance_id, file_format='xlsx', platforms=None,
+                        statuses=None, search_text='', cache=None):
+    """회차 예약 리스트를 내보낸 파일 경로 반환 (캐시에 있으면 다시 만들지 않음)
+
+    데이터 버전 조회와 예약 행 읽기를 한 읽기 트랜잭션에서 하므로, 그사이 다른 세션이
+    예약을 저장해도 새 데이터가 이전 버전 키로 캐시되지 않는다.
+    """
+    cache = cache or _default_cache
+    with read_transaction(engine) as conn:
+        data_version = fetch_data_version(conn, performance_id)
+        key = export_key(performance_id, data_version, file_format, platforms, statuses, search_text)
+        path = cache.get_path(key)
+        if path is not None:
+            return path
+
+        write = _WRITERS[file_format]
+        rows = iter_reservations(conn, performance_id, search_text, platforms, statuses)
+        return cache.build(key, lambda tmp_path: write(rows, tmp_path))
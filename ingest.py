@@ -0,0 +1,445 @@
+"""
+티켓츠 예매 관리 - 예매처 Excel 파싱
+"""
+import multiprocessing
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from itertools import chain, islice
+
+import pandas as pd
+from openpyxl import load_workbook
+
+try:
+    import xlrd
+except ImportError:  # .xls 파일을 읽을 때만 필요
+    xlrd = None
+
+from config import INGEST_CHUNK_SIZE, INGEST_MAX_WORKERS
+from parse_cache import ParseCache, file_digest, pack_chunk, unpack_chunks
+from platforms import SNIFF_ROWS, detect_platform, get_profile, sniff_layout
+
+# 파싱 결과가 달라지는 변경을 하면 올려서 기존 캐시를 무효화
+PARSER_VERSION = 6
+
+# 통합명부 컬럼 순서
+OUTPUT_COLUMNS = ['예매처', '예매번호', '예매자명', '연락처', '좌석정보', '매수', '배정상태']
+
+# Excel 파일 시그니처 (xlsx는 zip, xls는 OLE2 복합 문서)
+XLSX_SIGNATURE = b'PK\x03\x04'
+XLS_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+# 공연 정보를 찾는 상단 영역 크기
+HEADER_SCAN_ROWS = 25
+HEADER_SCAN_COLUMNS = 10
+
+PERFORMANCE_NAME_KEYWORDS = ('공연명', '상품명', '제목')
+COLON_PATTERN = re.compile(r'[:：]')
+PARENTHESES_PATTERN = re.compile(r'\([^)]*\)')
+DATE_PATTERN = re.compile(r'(\d{4})[.-](\d{2})[.-](\d{2})')
+TIME_PATTERN = re.compile(r'(\d{1,2}):(\d{2})')
+
+
+def scan_performance_info(rows):
+    """상단 행들에서 공연명/날짜/시간 추출 (추출 실패 시 None)"""
+    performance_name = ""
+    performance_date = ""
+    performance_time = ""
+
+    for row in rows:
+        for cell in row[:HEADER_SCAN_COLUMNS]:
+            if cell is None:
+                continue
+            cell_value = str(cell)
+            if not cell_value or cell_value == 'nan':
+                continue
+
+            # 공연명/상품명 찾기 (콜론 뒤의 내용에서 괄호 안 추가 정보 제거)
+            if not performance_name and any(keyword in cell_value for keyword in PERFORMANCE_NAME_KEYWORDS):
+                parts = COLON_PATTERN.split(cell_value, 1)
+                if len(parts) > 1:
+                    performance_name = PARENTHESES_PATTERN.sub('', parts[1].strip()).strip()
+
+            # 날짜 찾기 (YYYY.MM.DD 또는 YYYY-MM-DD 형식)
+            if not performance_date:
+                date_match = DATE_PATTERN.search(cell_value)
+                if date_match:
+                    performance_date = f"{date_match.group(1)}.{date_match.group(2)}.{date_match.group(3)}"
+
+            # 시간 찾기 (HH:MM 형식, "조회시간" 같은 건 제외)
+            if not performance_time and '조회' not in cell_value:
+                time_match = TIME_PATTERN.search(cell_value)
+                if time_match:
+                    performance_time = f"{time_match.group(1).zfill(2)}:{time_match.group(2)}"
+
+        if performance_name and performance_date and performance_time:
+            break
+
+    # 정보가 추출되었는지 확인
+    if performance_name or performance_date:
+        return {
+            'name': performance_name if performance_name else '(공연명 없음)',
+            'date': performance_date if performance_date else '(날짜 없음)',
+            'time': performance_time,
+        }
+
+    return None
+
+
+def _cell_text(value):
+    """셀 값을 문자열로 변환 (정수인 float는 '12345.0'이 아니라 '12345')"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _text_column(df, column):
+    """원본 컬럼을 문자열로 변환 (컬럼이 없거나 NaN이면 빈 문자열)"""
+    if column not in df.columns:
+        return pd.Series('', index=df.index, dtype=object)
+    values = df[column].astype(object)
+    return values.where(values.notna(), '').map(_cell_text)
+
+
+def normalize_reservations(df, platform):
+    """원본 DataFrame을 통합명부 형식으로 변환 (행 단위 루프 없이 컬럼 연산)"""
+    mapping = get_profile(platform)['columns']
+    result = pd.DataFrame(index=df.index)
+    result['예매처'] = platform
+
+    for target in ('예매번호', '예매자명', '연락처', '좌석정보'):
+        result[target] = _text_column(df, mapping[target])
+
+    quantity_column = mapping['매수']
+    if quantity_column in df.columns:
+        raw_quantity = df[quantity_column]
+        quantity = pd.to_numeric(raw_quantity, errors='coerce')
+        # 숫자로 변환할 수 없는 매수 값이 있는 행은 제외 (기존 동작과 동일)
+        valid = raw_quantity.isna() | quantity.notna()
+        result = result[valid]
+        result['매수'] = quantity[valid].fillna(0).astype(int)
+    else:
+        result['매수'] = 0
+
+    result['배정상태'] = '비지정'
+    result.loc[result['좌석정보'] != '', '배정상태'] = '지정'
+
+    return result[OUTPUT_COLUMNS].reset_index(drop=True)
+
+
+def frame_to_records(df):
+    """통합명부 DataFrame을 dict 리스트로 변환 (DataFrame.to_dict보다 빠름)"""
+    columns = [df[column].tolist() for column in OUTPUT_COLUMNS]
+    return [dict(zip(OUTPUT_COLUMNS, values)) for values in zip(*columns)]
+
+
+def detect_engine(file_bytes):
+    """파일 앞부분 시그니처로 Excel 형식 판별 ('openpyxl' / 'xlrd', 알 수 없으면 None)"""
+    if file_bytes.startswith(XLSX_SIGNATURE):
+        return 'openpyxl'
+    if file_bytes.startswith(XLS_SIGNATURE):
+        return 'xlrd'
+    return None
+
+
+def _read_signature(source):
+    """파일 내용(bytes)이나 파일 경로에서 형식 판별에 쓰는 앞부분"""
+    if isinstance(source, bytes):
+        return source[:len(XLS_SIGNATURE)]
+    with open(source, 'rb') as f:
+        return f.read(len(XLS_SIGNATURE))
+
+
+def _xls_value(cell, datemode):
+    """xlrd 셀 값을 openpyxl과 같은 형태로 변환 (빈 칸 None, 정수 int, 날짜 datetime)"""
+    if cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR):
+        return None
+    if cell.ctype == xlrd.XL_CELL_DATE:
+        return xlrd.xldate_as_datetime(cell.value, datemode)
+    if cell.ctype == xlrd.XL_CELL_BOOLEAN:
+        return bool(cell.value)
+    if cell.ctype == xlrd.XL_CELL_NUMBER and cell.value.is_integer():
+        return int(cell.value)
+    return cell.value
+
+
+def _iter_sheet_rows(source):
+    """첫 번째 시트의 행을 값 tuple로 순차 반환 (source는 파일 내용이나 경로, 한 번만 열고 다 읽으면 닫음)"""
+    engine = detect_engine(_read_signature(source))
+
+    if engine == 'openpyxl':
+        workbook = load_workbook(
+            BytesIO(source) if isinstance(source, bytes) else source, read_only=True, data_only=True
+        )
+        try:
+            # 저장할 때 선택된 시트(active)가 아니라 항상 첫 번째 시트 (pd.read_excel과 동일)
+            yield from workbook.worksheets[0].iter_rows(min_row=1, values_only=True)
+        finally:
+            workbook.close()
+
+    elif engine == 'xlrd':
+        if xlrd is None:
+            raise ImportError("xls 파일을 읽으려면 xlrd 패키지가 필요합니다 (pip install xlrd)")
+        if isinstance(source, bytes):
+            book = xlrd.open_workbook(file_contents=source, on_demand=True)
+        else:
+            book = xlrd.open_workbook(source, on_demand=True)
+        try:
+            sheet = book.sheet_by_index(0)
+            for idx in range(sheet.nrows):
+                yield tuple(_xls_value(cell, book.datemode) for cell in sheet.row(idx))
+        finally:
+            book.release_resources()
+
+    else:
+        raise ValueError("Excel 파일 형식이 아닙니다 (xlsx/xls만 지원)")
+
+
+def _header_names(values):
+    """헤더 행 값을 컬럼명으로 변환 (앞뒤 공백 제거, 빈 칸/중복 컬럼명은 pd.read_excel과 같은 규칙)"""
+    names = []
+    seen = {}
+    for idx, value in enumerate(values):
+        name = str(value).strip() if value is not None else f"Unnamed: {idx}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _records_from_rows(rows, header, platform):
+    # dtype을 chunk마다 추론하면 빈 칸이 섞인 chunk만 숫자 컬럼이 float가 되어
+    # 같은 예매번호가 '12345'/'12345.0'으로 달라지므로 셀 값을 그대로 둔다
+    df = pd.DataFrame(rows, columns=header, dtype=object)
+    return frame_to_records(normalize_reservations(df, platform))
+
+
+def _iter_chunks(header, rows, platform, chunk_size):
+    """헤더 행 이후의 데이터 행을 chunk_size 행씩 통합명부 dict 리스트로 변환"""
+    header = _header_names(header)
+    width = len(header)
+
+    chunk = []
+    # 중간의 빈 행은 유지하고 마지막의 빈 행만 버림 (pd.read_excel과 동일)
+    blank_rows = 0
+    for row in rows:
+        if all(value is None for value in row):
+            blank_rows += 1
+            continue
+        chunk.extend([(None,) * width] * blank_rows)
+        blank_rows = 0
+        chunk.append(tuple(row[:width]) + (None,) * (width - len(row)))
+
+        if len(chunk) >= chunk_size:
+            yield _records_from_rows(chunk, header, platform)
+            chunk = []
+
+    if chunk:
+        yield _records_from_rows(chunk, header, platform)
+
+
+def parse_workbook(source, file_name='', chunk_size=INGEST_CHUNK_SIZE, platform_hint=None):
+    """파일을 한 번만 열어 (예매처, 공연 정보, 예약 데이터 chunk iterator) 반환
+
+    source는 파일 내용(bytes)이나 파일 경로다. 상단 SNIFF_ROWS 행만 먼저 읽어 공연 정보 추출과
+    예매처/헤더 행 판별을 하고, 이미 열린 시트의 같은 행 iterator를 이어서 데이터 행 파싱에
+    사용한다. 예매처를 판별하지 못하면 나머지 행은 읽지 않고 예매처 None과 빈 iterator를 반환한다.
+    """
+    rows = _iter_sheet_rows(source)
+    head = list(islice(rows, max(SNIFF_ROWS, HEADER_SCAN_ROWS)))
+    performance_info = scan_performance_info(head[:HEADER_SCAN_ROWS])
+
+    platform, header_idx = sniff_layout(head, file_name, platform_hint)
+    if platform is None:
+        rows.close()
+        return None, performance_info, iter(())
+
+    data_rows = chain(head[header_idx + 1:], rows)
+    return platform, performance_info, _iter_chunks(head[header_idx], data_rows, platform, chunk_size)
+
+
+_default_cache = ParseCache()
+
+
+def _cache_key(digest, platform_hint):
+    """파일 내용 해시 + 파일명으로 감지한 예매처 + 파서 버전
+
+    여러 예매처 형식에 맞는 파일은 sniff_layout이 파일명 키워드로 예매처를 고르므로, 같은
+    내용이라도 파일명이 가리키는 예매처가 다르면 다른 항목으로 캐시한다.
+    """
+    return f"{digest}-{platform_hint or ''}-v{PARSER_VERSION}"
+
+
+def _parse_cached(cache, key, source, platform_hint, chunk_size):
+    """파일 하나를 파싱해 (예매처, chunk iterator, 공연 정보) 반환 (예매처를 모르면 None)
+
+    chunk는 iterator를 읽는 만큼 파싱하고 바로 캐시 항목에 이어 쓴다. 끝까지 읽으면 캐시에
+    저장되고, 파싱 오류는 iterator를 읽는 쪽으로 전달된다.
+    """
+    platform, performance_info, chunks = parse_workbook(source, chunk_size=chunk_size, platform_hint=platform_hint)
+    if platform is None:
+        return None
+    header = {'platform': platform, 'performance_info': performance_info}
+    chunks = cache.store_stream(key, header, chunks, lambda chunk: pack_chunk(chunk, OUTPUT_COLUMNS))
+    return platform, chunks, performance_info
+
+
+def _load_cached(cache, key, chunk_size):
+    """캐시된 파싱 결과를 (예매처, chunk iterator, 공연 정보)로 반환 (없으면 None)
+
+    예약 데이터는 chunk iterator를 읽는 만큼만 압축을 풀어 복원한다.
+    """
+    entry = cache.open_stream(key)
+    if entry is None:
+        return None
+    header, packed_chunks = entry
+    chunks = (
+        chunk
+        for packed in packed_chunks
+        for chunk in unpack_chunks(packed, OUTPUT_COLUMNS, chunk_size)
+    )
+    return header['platform'], chunks, header['performance_info']
+
+
+def parse_file_job(source, key, platform_hint=None, chunk_size=INGEST_CHUNK_SIZE, cache=None):
+    """프로세스 풀 작업 단위: 파일 하나를 파싱해 캐시 항목 key에 기록하고 오류 메시지 반환 (성공하면 None)
+
+    source는 파일 경로(작업 프로세스)나 파일 내용이다. 작업 프로세스에는 업로드 내용 대신
+    임시 파일 경로, 캐시 키(내용 해시), 파일명으로 감지한 예매처만 넘기므로 파일을 프로세스
+    사이로 복사하지 않는다. 예약 데이터는 chunk마다 캐시 항목에 이어 쓰고 버리며, 결과는
+    호출한 쪽이 캐시에서 읽는다.
+    """
+    cache = cache or _default_cache
+    try:
+        parsed = _parse_cached(cache, key, source, platform_hint, chunk_size)
+        if parsed is None:
+            return "예매처 형식을 인식할 수 없는 파일입니다"
+        for _ in parsed[1]:
+            pass
+        return None
+    except Exception as e:
+        return str(e) or type(e).__name__
+
+
+def load_performance_info(uploaded_file, cache=None, chunk_size=INGEST_CHUNK_SIZE):
+    """공연 정보 추출 (캐시 우선, 캐시에 없으면 파일 전체를 파싱해 함께 캐시)
+
+    파일을 열 수 없으면 오류를 호출한 쪽으로 전달한다.
+    """
+    cache = cache or _default_cache
+    file_bytes = uploaded_file.getvalue()
+    key = _cache_key(file_digest(file_bytes), detect_platform(uploaded_file.name))
+
+    cached = _load_cached(cache, key, chunk_size)
+    if cached is not None:
+        platform, chunks, performance_info = cached
+        chunks.close()
+    else:
+        platform, performance_info, chunks = parse_workbook(file_bytes, uploaded_file.name, chunk_size)
+        if platform is None:
+            platform = '알 수 없음'
+        else:
+            header = {'platform': platform, 'performance_info': performance_info}
+            try:
+                for _ in cache.store_stream(key, header, chunks, lambda chunk: pack_chunk(chunk, OUTPUT_COLUMNS)):
+                    pass
+            except Exception:
+                # 예약 데이터 오류는 통합/저장 단계에서 파일별로 보고
+                pass
+
+    if performance_info is None:
+        return None
+    return {**performance_info, 'source': platform}
+
+
+def _open_file(cache, key, file_name, file_bytes, chunk_size):
+    """캐시에서 읽거나(없으면 이 프로세스에서 파싱) (파일명, 예매처, chunk iterator, 오류 메시지) 반환"""
+    try:
+        parsed = _load_cached(cache, key, chunk_size) or _parse_cached(
+            cache, key, file_bytes, detect_platform(file_name), chunk_size
+        )
+    except Exception as e:
+        return file_name, '알 수 없음', iter(()), str(e) or type(e).__name__
+    if parsed is None:
+        return file_name, '알 수 없음', iter(()), "예매처 형식을 인식할 수 없는 파일입니다"
+    platform, chunks, _ = parsed
+    return file_name, platform, chunks, None
+
+
+def parse_files_parallel(uploaded_files, max_workers=INGEST_MAX_WORKERS, chunk_size=INGEST_CHUNK_SIZE, cache=None):
+    """여러 파일을 프로세스 풀에서 동시에 파싱해 캐시에 기록한 뒤 결과 iterator 반환
+
+    모든 파일의 파싱이 끝나야 반환하므로, 결과 chunk를 DB 쓰기 트랜잭션(save_reservations)
+    안에서 읽어도 쓰기 잠금을 쥔 채 파싱을 기다리지 않는다. 잠금을 쥔 동안에는 캐시 항목의
+    압축만 푼다 (캐시에 기록하지 못한 파일만 읽을 때 다시 파싱한다).
+    결과는 완료 순서와 관계없이 업로드 순서대로 (파일명, 예매처, chunk iterator, 오류 메시지)다.
+    작업 프로세스는 파싱 결과를 캐시에 chunk 단위로 기록하고, 결과 iterator는 파일마다 차례가
+    되면 캐시에서 chunk를 하나씩 읽어 넘겨주므로 파일 수나 크기와 관계없이 메모리 사용량이
+    일정하다. 동시에 파싱할 파일이 하나뿐이면 이 프로세스에서 파싱한다. 파싱 오류는 해당
+    파일의 오류 메시지로 전달된다. 이미 파싱한 적 있는 파일은 다시 파싱하지 않는다.
+    chunk iterator는 다음 파일을 받기 전에 다 읽어야 한다.
+    """
+    cache = cache or _default_cache
+    jobs = []
+    for uploaded_file in uploaded_files:
+        file_bytes = uploaded_file.getvalue()
+        key = _cache_key(file_digest(file_bytes), detect_platform(uploaded_file.name))
+        jobs.append((uploaded_file.name, file_bytes, key))
+
+    # 같은 내용의 파일은 한 번만 파싱
+    misses = list({key: (file_name, file_bytes) for file_name, file_bytes, key in jobs
+                   if not cache.contains(key)}.items())
+    errors = {}
+    if max_workers <= 1 or len(misses) <= 1:
+        for key, (file_name, file_bytes) in misses:
+            errors[key] = parse_file_job(file_bytes, key, detect_platform(file_name), chunk_size, cache)
+    else:
+        with tempfile.TemporaryDirectory() as upload_dir:
+            errors.update(_parse_in_pool(upload_dir, misses, max_workers, chunk_size, cache))
+
+    return _iter_parsed_files(cache, jobs, errors, chunk_size)
+
+
+def _parse_in_pool(upload_dir, misses, max_workers, chunk_size, cache):
+    """캐시에 없는 파일 [(캐시 키, (파일명, 내용))]을 upload_dir의 임시 파일로 쓰고 작업 프로세스에서
+    파싱해 {캐시 키: 오류 메시지} 반환"""
+    paths = {}
+    for index, (key, (_, file_bytes)) in enumerate(misses):
+        # openpyxl은 경로의 확장자로 형식을 확인한다
+        suffix = '.xls' if detect_engine(file_bytes) == 'xlrd' else '.xlsx'
+        paths[key] = os.path.join(upload_dir, f"{index}{suffix}")
+        with open(paths[key], 'wb') as f:
+            f.write(file_bytes)
+
+    errors = {}
+    # Streamlit 서버는 여러 스레드로 돌기 때문에 fork하면 다른 스레드가 쥔 잠금이 자식에 복사되어
+    # 멈출 수 있다. spawn으로 새 인터프리터를 띄운다.
+    with ProcessPoolExecutor(
+        max_workers=min(max_workers, len(misses)), mp_context=multiprocessing.get_context('spawn'),
+    ) as executor:
+        futures = {
+            key: executor.submit(parse_file_job, paths[key], key, detect_platform(file_name), chunk_size, cache)
+            for key, (file_name, _) in misses
+        }
+        for key, future in futures.items():
+            try:
+                errors[key] = future.result()
+            except Exception as e:
+                # 작업 프로세스가 비정상 종료된 경우 등
+                errors[key] = str(e) or type(e).__name__
+    return errors
+
+
+def _iter_parsed_files(cache, jobs, errors, chunk_size):
+    for file_name, file_bytes, key in jobs:
+        error = errors.get(key)
+        if error is not None:
+            yield file_name, '알 수 없음', iter(()), error
+            continue
+        # 캐시 기록에 실패했으면(용량 한도 초과 등) 이 프로세스에서 다시 파싱
+        yield _open_file(cache, key, file_name, file_bytes, chunk_size)
@@ -0,0 +1,29 @@
+CREATE TABLE IF NOT EXISTS performances (
+  id SERIAL PRIMARY KEY,
+  performance_name VARCHAR(256) NOT NULL,
+  performance_date VARCHAR(64) NOT NULL,
+  performance_time VARCHAR(64) NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  data_version INTEGER NOT NULL DEFAULT 0,
+  UNIQUE (performance_name, performance_date, performance_time)
+);
+
+CREATE TABLE IF NOT EXISTS performance_summary (
+  performance_id INTEGER NOT NULL REFERENCES performances(id),
+  platform VARCHAR(50) NOT NULL,
+  status reservation_status NOT NULL,
+  reservations INTEGER NOT NULL DEFAULT 0,
+  seats INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (performance_id, platform, status)
+);
+
+CREATE INDEX IF NOT EXISTS ix_reservations_performance_platform_sort_name
+  ON reservations(performance_id, platform, (coalesce(name, '')));
+
+INSERT INTO performance_summary (performance_id, platform, status, reservations, seats)
+SELECT performance_id, platform, status, COUNT(*), COALESCE(SUM(quantity), 0)
+FROM reservations
+WHERE performance_id IN (SELECT id FROM performances)
+GROUP BY performance_id, platform, status
+ON CONFLICT DO NOTHING;
@@ -0,0 +1,13 @@
+ALTER TABLE performance_summary ADD COLUMN IF NOT EXISTS assigned INTEGER NOT NULL DEFAULT 0;
+
+UPDATE performance_summary AS summary
+SET assigned = counts.assigned
+FROM (
+  SELECT performance_id, platform, status,
+         COUNT(*) FILTER (WHERE trim(coalesce(seat_info, '')) <> '') AS assigned
+  FROM reservations
+  GROUP BY performance_id, platform, status
+) AS counts
+WHERE summary.performance_id = counts.performance_id
+  AND summary.platform = counts.platform
+  AND summary.status = counts.status;
@@ -0,0 +1,3 @@
+DROP INDEX IF EXISTS ix_reservations_id;
+DROP INDEX IF EXISTS ix_reservations_performance_id;
+DROP INDEX IF EXISTS ix_reservations_token;
@@ -0,0 +1,5 @@
+CREATE TABLE IF NOT EXISTS performance_seat_maps (
+  performance_id INTEGER PRIMARY KEY REFERENCES performances(id),
+  bitmap BYTEA NOT NULL,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
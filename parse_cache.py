@@ -0,0 +1,142 @@
+"""
+티켓츠 예매 관리 - 예매 파일 파싱 결과 캐시
+
+같은 파일을 다시 업로드하면 파일 해시만 계산하고 저장된 파싱 결과를 사용한다.
+캐시 항목은 (파일 내용 SHA-256, 파일명으로 감지한 예매처, 파서 버전)으로 구분하며,
+예약 데이터는 chunk마다 컬럼별 리스트로 묶어 압축 스트림에 이어 쓴다. 파싱하면서 바로 기록하고 읽을 때도
+chunk 하나씩 풀기 때문에 파일 전체를 메모리에 올리지 않는다. 전체 용량이 한도를
+넘으면 가장 오래 사용하지 않은 항목부터 삭제한다(LRU, 파일 수정 시각 기준).
+"""
+import gzip
+import hashlib
+import os
+import pickle
+
+from config import PARSE_CACHE_DIR, PARSE_CACHE_MAX_BYTES
+from disk_cache import DiskCache
+
+CACHE_SUFFIX = '.cache'
+
+
+def file_digest(file_bytes):
+    """파일 내용의 SHA-256 해시"""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+def pack_chunk(chunk, columns):
+    """dict 리스트 chunk를 컬럼별 리스트로 변환 (저장 용량 절감)"""
+    return {column: [row[column] for row in chunk] for column in columns}
+
+
+def unpack_chunks(packed, columns, chunk_size):
+    """컬럼별 리스트를 chunk_size 행씩 dict 리스트로 복원"""
+    rows = [dict(zip(columns, values)) for values in zip(*(packed[column] for column in columns))]
+    return [rows[start:start + chunk_size] for start in range(0, len(rows), chunk_size)]
+
+
+class ParseCache(DiskCache):
+    """디스크 기반 파싱 결과 캐시 (용량 제한 LRU)"""
+
+    suffix = CACHE_SUFFIX
+
+    def __init__(self, directory=PARSE_CACHE_DIR, max_bytes=PARSE_CACHE_MAX_BYTES):
+        super().__init__(directory, max_bytes)
+
+    def store_stream(self, key, header, items, pack=None):
+        """items를 그대로 넘겨주면서 header와 pack(item)들을 캐시 항목 하나로 이어 쓰는 generator
+
+        items를 끝까지 넘겨주면 항목을 저장하고, 도중에 오류가 나거나 중단되면 쓰던 내용을
+        버린다. 캐시 쓰기가 실패하면 기록만 멈추고 items는 계속 넘겨준다.
+        """
+        writer = self._open_writer(header)
+        completed = False
+        try:
+            for item in items:
+                if writer is not None:
+                    try:
+                        pickle.dump(pack(item) if pack else item, writer[1], protocol=pickle.HIGHEST_PROTOCOL)
+                    except OSError:
+                        self._discard(writer)
+                        writer = None
+                yield item
+            completed = True
+        finally:
+            if writer is not None:
+                if completed:
+                    self._commit(key, writer)
+                else:
+                    self._discard(writer)
+
+    def open_stream(self, key):
+        """store_stream으로 저장한 항목을 (header, 항목 iterator)로 반환 (없거나 손상된 경우 None)
+
+        header만 먼저 읽고 나머지 항목은 iterator를 읽는 만큼 압축을 푼다. 중간에 손상된
+        항목을 만나면 캐시 항목을 삭제하고 오류를 전달한다.
+        """
+        path = self._path(key)
+        try:
+            f = gzip.open(path, 'rb')
+        except OSError:
+            return None
+        try:
+            header = pickle.load(f)
+        except Exception:
+            f.close()
+            self._remove(path)
+            return None
+
+        self._touch(path)
+        return header, self._iter_stream(path, f)
+
+    def _iter_stream(self, path, f):
+        with f:
+            try:
+                while True:
+                    item = pickle.load(f)
+                    if item is None:  # 끝 표시 (없으면 잘린 항목)
+                        return
+                    yield item
+            except Exception:
+                self._remove(path)
+                raise
+
+    def _open_writer(self, header):
+        try:
+            tmp_path = self._new_tmp()
+        except OSError:
+            return None
+        try:
+            f = gzip.open(tmp_path, 'wb', compresslevel=6)
+        except OSError:
+            self._remove(tmp_path)
+            return None
+        try:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            self._discard((tmp_path, f))
+            return None
+        return tmp_path, f
+
+    def _commit(self, key, writer):
+        tmp_path, f = writer
+        try:
+            pickle.dump(None, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.close()
+            if os.path.getsize(tmp_path) > self.max_bytes:
+                self._remove(tmp_path)
+                return
+        except OSError:
+            self._discard(writer)
+            return
+        try:
+            self._publish(tmp_path, key)
+        except OSError:
+            pass
+
+    def _discard(self, writer):
+        tmp_path, f = writer
+        try:
+            f.close()
+        except OSError:
+            pass
+        self._remove(tmp_path)
@@ -0,0 +1,91 @@
+"""
+티켓츠 예매 관리 - 예매처별 Excel 형식 정의
+
+새 예매처는 PLATFORM_PROFILES에 항목을 추가하면 되고 파싱 로직은 수정할 필요가 없다.
+예매처와 헤더 행 위치는 파일 상단 SNIFF_ROWS 행에서 signature_columns가 모두 있는
+행을 찾아 자동으로 판별한다. 파일명 키워드는 여러 예매처가 동시에 맞을 때만 참고한다.
+"""
+
+# 예매처/헤더 행 판별 시 확인하는 상단 행 수
+SNIFF_ROWS = 40
+
+PLATFORM_PROFILES = [
+    {
+        'name': '인터파크',
+        'file_keywords': ['인터파크', 'interpark'],
+        # 헤더 행에 모두 있어야 하는 컬럼
+        'signature_columns': ['예매번호', '예매자명', '휴대폰번호'],
+        # 통합명부 컬럼 -> 원본 컬럼
+        'columns': {
+            '예매번호': '예매번호',
+            '예매자명': '예매자명',
+            '연락처': '휴대폰번호',
+            '좌석정보': '좌석정보',
+            '매수': '매수',
+        },
+    },
+    {
+        'name': '티켓링크',
+        'file_keywords': ['티켓링크', 'ticketlink'],
+        'signature_columns': ['예매번호(연동사 예매번호)', '성명', '연락처(SMS)'],
+        'columns': {
+            '예매번호': '예매번호(연동사 예매번호)',
+            '예매자명': '성명',
+            '연락처': '연락처(SMS)',
+            '좌석정보': '좌석번호',
+            '매수': '매수',
+        },
+    },
+    {
+        'name': '예스24',
+        'file_keywords': ['예스24', 'yes24'],
+        'signature_columns': ['주문번호', '예매자명', '휴대폰번호'],
+        'columns': {
+            '예매번호': '주문번호',
+            '예매자명': '예매자명',
+            '연락처': '휴대폰번호',
+            '좌석정보': '좌석',
+            '매수': '매수',
+        },
+    },
+]
+
+_PROFILES_BY_NAME = {profile['name']: profile for profile in PLATFORM_PROFILES}
+
+
+def get_profile(name):
+    """예매처 이름으로 형식 정의 조회"""
+    return _PROFILES_BY_NAME[name]
+
+
+def detect_platform(file_name):
+    """파일명 키워드로 예매처 감지 (감지 실패 시 None)"""
+    lowered = file_name.lower()
+    for profile in PLATFORM_PROFILES:
+        if any(keyword in lowered for keyword in profile['file_keywords']):
+            return profile['name']
+    return None
+
+
+def sniff_layout(rows, file_name='', platform_hint=None):
+    """상단 행들에서 (예매처 이름, 헤더 행 위치)를 판별 (판별 실패 시 (None, None))
+
+    signature_columns가 모두 있는 첫 행을 헤더로 본다. 여러 예매처가 맞으면 파일명
+    키워드가 맞는 예매처(platform_hint가 있으면 그 예매처), 그다음 PLATFORM_PROFILES 순서를 따른다.
+    """
+    file_platform = platform_hint or (detect_platform(file_name) if file_name else None)
+    candidates = []
+
+    for row_idx, row in enumerate(rows[:SNIFF_ROWS]):
+        cells = {str(value).strip() for value in row if value is not None}
+        if not cells:
+            continue
+        for order, profile in enumerate(PLATFORM_PROFILES):
+            if all(column in cells for column in profile['signature_columns']):
+                candidates.append((profile['name'] != file_platform, row_idx, order, profile['name']))
+
+    if not candidates:
+        return None, None
+
+    _, row_idx, _, name = min(candidates)
+    return name, row_idx
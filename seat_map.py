@@ -0,0 +1,257 @@
+"""
+티켓츠 좌석 배치 - 비트맵 좌석 지도
+
+config.SEAT_LAYOUT의 공연별 구역/열/열당 좌석 수를 좌석 번호(구역, 열 순서로 0부터)로 컴파일하고,
+회차의 좌석 상태는 좌석마다 비트 두 개(선점, 판매)로 관리한다. 좌석 코드('A-12')는 열의 시작
+번호에 좌석 번호를 더하면 바로 비트 위치가 되므로 선점/해제/판매/조회가 모두 O(1)이다.
+회차의 좌석 지도는 바이트로 직렬화해 performance_seat_maps 테이블에 저장하고, 저장된 것이 없거나
+좌석 배치가 바뀌어 읽을 수 없으면 seat_status 테이블의 [(좌석 코드, 상태)] 목록으로 한 번에 다시 만든다.
+"""
+import hashlib
+import json
+import struct
+from bisect import bisect_right
+from functools import lru_cache
+
+from config import SEAT_LAYOUT
+from storage import fetch_seat_map_data, fetch_seat_statuses, read_transaction, save_seat_map_data, write_transaction
+
+SEAT_AVAILABLE = 'available'
+SEAT_HELD = 'held'
+SEAT_OCCUPIED = 'occupied'
+
+# seat_status 테이블/JSON의 상태 -> 좌석 지도 상태 (그 밖의 값은 빈 좌석)
+STATUS_ALIASES = {
+    'held': SEAT_HELD,
+    'selected': SEAT_HELD,
+    'occupied': SEAT_OCCUPIED,
+}
+
+# 직렬화 형식: 'SEAT' | 형식 버전 u8 | 배치 지문 8바이트 | 좌석 수 u32 | 선점 비트 | 판매 비트
+_MAGIC = b'SEAT'
+_FORMAT = 1
+_HEADER = struct.Struct('>4sB8sI')
+
+
+def _split_code(seat_code):
+    """좌석 코드 -> (열 이름, 좌석 번호) ('A-12', 'A-05', 'a12' 모두 ('A', 12))"""
+    code = seat_code.strip().upper()
+    if '-' in code:
+        row, number = code.rsplit('-', 1)
+    else:
+        row = code.rstrip('0123456789')
+        number = code[len(row):]
+    try:
+        return row.strip(), int(number)
+    except ValueError:
+        raise KeyError(seat_code) from None
+
+
+class SeatLayout:
+    """공연 하나의 좌석 배치 (좌석 코드 <-> 좌석 번호)"""
+
+    def __init__(self, sections):
+        self.sections = sections
+        self._rows = {}  # 열 이름 -> (시작 번호, 좌석 수)
+        self._row_starts = []
+        self._row_names = []
+        size = 0
+        for section in sections:
+            for row in section['rows']:
+                key = row.strip().upper()
+                if key in self._rows:
+                    raise ValueError(f"열 이름이 중복됩니다: {row}")
+                self._rows[key] = (size, section['seats_per_row'])
+                self._row_starts.append(size)
+                self._row_names.append(row)
+                size += section['seats_per_row']
+        self.size = size
+        # 배치가 바뀌면 예전에 저장한 비트맵을 읽지 않도록 직렬화에 함께 저장
+        shape = [[section['rows'], section['seats_per_row']] for section in sections]
+        self.fingerprint = hashlib.blake2b(json.dumps(shape).encode(), digest_size=8).digest()
+
+    def index(self, seat_code):
+        """좌석 코드 -> 좌석 번호 (배치에 없는 좌석이면 KeyError)"""
+        row, number = _split_code(seat_code)
+        start, count = self._rows[row]
+        if not 1 <= number <= count:
+            raise KeyError(seat_code)
+        return start + number - 1
+
+    def code(self, index):
+        """좌석 번호 -> 좌석 코드 ('A-05' 형식)"""
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        position = bisect_right(self._row_starts, index) - 1
+        return f"{self._row_names[position]}-{index - self._row_starts[position] + 1:02d}"
+
+    @classmethod
+    def from_config(cls, performance_key):
+        """config.SEAT_LAYOUT에 있는 공연의 좌석 배치 (공연 이름으로 찾고, 없으면 None)"""
+        return _config_layout(performance_key)
+
+
+@lru_cache(maxsize=None)
+def _config_layout(performance_key):
+    layout = SEAT_LAYOUT.get(performance_key)
+    return SeatLayout(layout['sections']) if layout else None
+
+
+def _popcount(bits):
+    return int.from_bytes(bits, 'big').bit_count()
+
+
+class SeatMap:
+    """회차 하나의 좌석 상태 (선점 비트맵, 판매 비트맵)
+
+    좌석은 좌석 코드나 좌석 번호로 지정한다. 판매된 좌석은 선점 비트를 함께 켜지 않는다.
+    """
+
+    def __init__(self, layout, held=None, occupied=None):
+        self.layout = layout
+        size = (layout.size + 7) // 8
+        self._held = bytearray(size) if held is None else bytearray(held)
+        self._occupied = bytearray(size) if occupied is None else bytearray(occupied)
+        self.held_count = _popcount(self._held)
+        self.occupied_count = _popcount(self._occupied)
+
+    @property
+    def available_count(self):
+        return self.layout.size - self.held_count - self.occupied_count
+
+    def _bit(self, seat):
+        index = seat if isinstance(seat, int) else self.layout.index(seat)
+        if not 0 <= index < self.layout.size:
+            raise IndexError(seat)
+        return index >> 3, 1 << (index & 7)
+
+    def status(self, seat):
+        byte, mask = self._bit(seat)
+        if self._occupied[byte] & mask:
+            return SEAT_OCCUPIED
+        if self._held[byte] & mask:
+            return SEAT_HELD
+        return SEAT_AVAILABLE
+
+    def is_available(self, seat):
+        byte, mask = self._bit(seat)
+        return not (self._held[byte] | self._occupied[byte]) & mask
+
+    def hold(self, seat):
+        """빈 좌석을 선점 (빈 좌석이 아니면 False)"""
+        byte, mask = self._bit(seat)
+        if (self._held[byte] | self._occupied[byte]) & mask:
+            return False
+        self._held[byte] |= mask
+        self.held_count += 1
+        return True
+
+    def occupy(self, seat):
+        """빈 좌석이나 선점한 좌석을 판매 처리 (이미 판매된 좌석이면 False)"""
+        byte, mask = self._bit(seat)
+        if self._occupied[byte] & mask:
+            return False
+        if self._held[byte] & mask:
+            self._held[byte] &= ~mask
+            self.held_count -= 1
+        self._occupied[byte] |= mask
+        self.occupied_count += 1
+        return True
+
+    def release(self, seat):
+        """선점/판매를 풀어 빈 좌석으로 (이미 빈 좌석이면 False)"""
+        byte, mask = self._bit(seat)
+        if self._occupied[byte] & mask:
+            self._occupied[byte] &= ~mask
+            self.occupied_count -= 1
+            return True
+        if self._held[byte] & mask:
+            self._held[byte] &= ~mask
+            self.held_count -= 1
+            return True
+        return False
+
+    def seats(self, status):
+        """상태가 status인 좌석 코드 리스트 (좌석 번호 순)"""
+        if status == SEAT_AVAILABLE:
+            taken = bytes(held | occupied for held, occupied in zip(self._held, self._occupied))
+            return [self.layout.code(index) for index in range(self.layout.size)
+                    if not taken[index >> 3] & (1 << (index & 7))]
+
+        bits = self._held if status == SEAT_HELD else self._occupied
+        codes = []
+        for byte, value in enumerate(bits):
+            while value:
+                low = value & -value
+                codes.append(self.layout.code((byte << 3) + low.bit_length() - 1))
+                value ^= low
+        return codes
+
+    def to_bytes(self):
+        header = _HEADER.pack(_MAGIC, _FORMAT, self.layout.fingerprint, self.layout.size)
+        return header + bytes(self._held) + bytes(self._occupied)
+
+    @classmethod
+    def from_bytes(cls, layout, data):
+        """to_bytes로 저장한 좌석 지도 복원 (다른 배치로 만든 데이터면 ValueError)"""
+        if len(data) < _HEADER.size:
+            raise ValueError('좌석 지도 데이터가 잘렸습니다')
+        magic, data_format, fingerprint, size = _HEADER.unpack_from(data)
+        if magic != _MAGIC or data_format != _FORMAT:
+            raise ValueError('좌석 지도 데이터 형식이 아닙니다')
+        if fingerprint != layout.fingerprint or size != layout.size:
+            raise ValueError('다른 좌석 배치로 만든 좌석 지도입니다')
+        length = (size + 7) // 8
+        body = data[_HEADER.size:]
+        if len(body) != length * 2:
+            raise ValueError('좌석 지도 데이터가 잘렸습니다')
+        return cls(layout, body[:length], body[length:])
+
+    @classmethod
+    def from_statuses(cls, layout, statuses):
+        """[(좌석 코드, 상태)]로 좌석 지도 생성 (배치에 없는 좌석 코드는 건너뜀, 판매가 선점보다 우선)"""
+        size = (layout.size + 7) // 8
+        bits = {SEAT_HELD: bytearray(size), SEAT_OCCUPIED: bytearray(size)}
+        for seat_code, status in statuses:
+            target = bits.get(STATUS_ALIASES.get(status))
+            if target is None:
+                continue
+            try:
+                index = layout.index(seat_code)
+            except KeyError:
+                continue
+            target[index >> 3] |= 1 << (index & 7)
+
+        held = bytes(h & ~o & 0xFF for h, o in zip(bits[SEAT_HELD], bits[SEAT_OCCUPIED]))
+        return cls(layout, held, bits[SEAT_OCCUPIED])
+
+
+def load_seat_map(engine, performance_id):
+    """회차의 좌석 지도 (회차가 없거나 SEAT_LAYOUT에 배치가 없는 공연이면 None)
+
+    저장된 좌석 지도가 없거나 좌석 배치가 바뀌어 읽을 수 없으면 seat_status로 다시 만들어 저장한다.
+    """
+    with read_transaction(engine) as conn:
+        found = fetch_seat_map_data(conn, performance_id)
+    if found is None:
+        return None
+    performance_name, data = found
+    layout = SeatLayout.from_config(performance_name)
+    if layout is None:
+        return None
+    if data is not None:
+        try:
+            return SeatMap.from_bytes(layout, data)
+        except ValueError:
+            pass
+
+    with write_transaction(engine) as conn:
+        seat_map = SeatMap.from_statuses(layout, fetch_seat_statuses(conn, performance_id))
+        save_seat_map_data(conn, performance_id, seat_map.to_bytes())
+    return seat_map
+
+
+def save_seat_map(engine, performance_id, seat_map):
+    """선점/판매를 바꾼 회차 좌석 지도 저장"""
+    with write_transaction(engine) as conn:
+        save_seat_map_data(conn, performance_id, seat_map.to_bytes())
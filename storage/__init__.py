@@ -0,0 +1,43 @@
+"""
+티켓츠 예매 관리 - 예약 데이터 저장소
+
+Streamlit 예매 관리 화면과 QR API(app/)가 같은 SQLAlchemy 모델(app/models.py)과 연결 풀
+엔진(app/db.py)을 쓴다. DATABASE_URL이 없으면 로컬 SQLite 파일(DB_PATH)이 Postgres를
+대신하며, 예매 파일로 가져온 예약은 따로 복사하지 않아도 바로 QR 발권 대상이 된다.
+
+모듈 구성:
+- core: 예약 상태 상수, 읽기/쓰기 트랜잭션, 회차 데이터 버전
+- schema: 테이블 생성과 이전 SQLite 스키마 변환
+- sync: 예매 파일 가져오기, API 일괄 등록, QR 일괄 발권, 상태 변경
+- summary: 쓰기 시점에 갱신하는 회차 요약
+- search: 예약 목록 검색/페이지/건수
+- checkin: 입장 판정(조건부 UPDATE), 입장 이벤트 기록, 오프라인 스캔 병합
+- seats: 좌석 상태 조회, 회차 좌석 지도(비트맵) 저장
+"""
+from storage.checkin import (
+    claim_checkin, fetch_issued_tokens, fetch_offline_snapshot, fetch_token, merge_offline_checkins,
+    record_checkin_events,
+)
+from storage.core import (
+    CANCELLED_STATUS, IMPORT_MANAGED_STATUSES, IMPORT_STATUSES, QR_ISSUABLE_STATUSES, STATUS_LABELS,
+    fetch_catalog_version, fetch_data_version, fetch_data_versions, read_transaction, status_label,
+    write_transaction,
+)
+from storage.schema import create_schema
+from storage.search import (
+    count_reservations, fetch_performance_names, fetch_reservation_page, fetch_reservations, iter_reservations,
+)
+from storage.seats import fetch_seat_map_data, fetch_seat_statuses, save_seat_map_data
+from storage.summary import fetch_performance_sessions, fetch_summary, track_reservation_change
+from storage.sync import insert_reservations, issue_performance_tokens, save_reservations, set_reservation_status
+
+__all__ = [
+    'CANCELLED_STATUS', 'IMPORT_MANAGED_STATUSES', 'IMPORT_STATUSES', 'QR_ISSUABLE_STATUSES', 'STATUS_LABELS',
+    'claim_checkin', 'count_reservations', 'create_schema', 'fetch_catalog_version', 'fetch_data_version',
+    'fetch_data_versions', 'fetch_issued_tokens', 'fetch_offline_snapshot', 'fetch_performance_names',
+    'fetch_performance_sessions', 'fetch_reservation_page', 'fetch_reservations', 'fetch_seat_map_data',
+    'fetch_seat_statuses', 'fetch_summary', 'fetch_token', 'insert_reservations', 'issue_performance_tokens',
+    'iter_reservations', 'merge_offline_checkins', 'read_transaction', 'record_checkin_events',
+    'save_reservations', 'save_seat_map_data', 'set_reservation_status', 'status_label',
+    'track_reservation_change', 'write_transaction',
+]
@@ -0,0 +1,236 @@
+"""
+입장 처리 저장 - 입장 판정, 입장 이벤트 기록, 오프라인 스캔 병합, 토큰/오프라인 번들 조회
+"""
+from datetime import datetime
+
+from sqlalchemy import bindparam, insert, select, update
+
+from app.models import Performance, Reservation, ReservationEvent, ReservationStatus
+from storage.core import _as_utc, _utcnow, write_transaction
+from storage.summary import _adjust_summary, _bump_data_version, _has_seat, _move_summary
+
+
+def _check_in(conn, rows, payloads):
+    """발권 상태로 읽은 예약 rows(id, 회차, 예매처, 매수, 좌석정보)를 입장으로 바꾸고 checked_in 이벤트 기록
+
+    payloads는 {예약 ID: 이벤트 payload}이며 이벤트는 이 순서대로 쌓인다. 호출한 쪽의 쓰기
+    트랜잭션 안에서 rows를 읽은 뒤 실행한다.
+    """
+    conn.execute(
+        update(Reservation)
+        .where(Reservation.id.in_(payloads))
+        .values(status=ReservationStatus.checked_in, updated_at=_utcnow())
+    )
+    conn.execute(insert(ReservationEvent), [
+        {
+            'reservation_id': reservation_id, 'event_type': 'checked_in',
+            'previous_status': ReservationStatus.issued, 'new_status': ReservationStatus.checked_in,
+            'payload': payload,
+        }
+        for reservation_id, payload in payloads.items()
+    ])
+
+    deltas = {}
+    for row in rows:
+        count, seats, assigned = deltas.get((row.performance_id, row.platform), (0, 0, 0))
+        deltas[(row.performance_id, row.platform)] = (
+            count + 1, seats + (row.quantity or 0), assigned + _has_seat(row.seat_info)
+        )
+    for (performance_id, platform), (count, seats, assigned) in deltas.items():
+        _adjust_summary(conn, performance_id, platform, ReservationStatus.issued, -count, -seats, -assigned)
+        _adjust_summary(conn, performance_id, platform, ReservationStatus.checked_in, count, seats, assigned)
+    for performance_id in {performance_id for performance_id, _ in deltas}:
+        _bump_data_version(conn, performance_id)
+
+
+# claim_checkin의 조건부 UPDATE (스캔마다 실행하므로 bindparam으로 컴파일 결과를 재사용)
+_CLAIM_CHECKIN = (
+    update(Reservation)
+    .where(Reservation.id == bindparam('b_id'), Reservation.status == ReservationStatus.issued)
+    .values(status=ReservationStatus.checked_in, updated_at=bindparam('b_now'))
+    .returning(Reservation.performance_id, Reservation.platform, Reservation.quantity, Reservation.seat_info)
+)
+
+
+def claim_checkin(engine, reservation_id):
+    """발권 상태인 예약 하나를 입장으로 바꾸고 (예약 ID, 회차 ID) 반환 (발권 상태가 아니면 None)
+
+    입장 판정은 "발권 상태일 때만 바꾸는" 조건부 UPDATE 한 번이라, 여러 API 프로세스가 같은 표를
+    동시에 스캔해도 한 곳만 성공한다. 상태, 회차 요약, 데이터 버전은 이 트랜잭션에서 바로 바꾸고,
+    checked_in 이벤트는 QR API의 쓰기 스레드가 record_checkin_events로 모아서 쓴다.
+    """
+    with write_transaction(engine) as conn:
+        row = conn.execute(_CLAIM_CHECKIN, {'b_id': reservation_id, 'b_now': _utcnow()}).first()
+        if row is None:
+            return None
+        _move_summary(conn, row.performance_id, row.platform, row.quantity, row.seat_info,
+                      ReservationStatus.issued, ReservationStatus.checked_in)
+        _bump_data_version(conn, row.performance_id)
+    return reservation_id, row.performance_id
+
+
+def record_checkin_events(engine, scans):
+    """claim_checkin으로 입장 처리한 스캔 [(예약 ID, 스캔 시각)]의 checked_in 이벤트를 executemany 한 번으로 기록"""
+    if not scans:
+        return
+
+    with write_transaction(engine) as conn:
+        conn.execute(insert(ReservationEvent), [
+            {
+                'reservation_id': reservation_id, 'event_type': 'checked_in',
+                'previous_status': ReservationStatus.issued, 'new_status': ReservationStatus.checked_in,
+                'payload': {'scanned_at': scanned_at.isoformat()},
+            }
+            for reservation_id, scanned_at in scans
+        ])
+
+
+def _first_checkins(conn, reservation_ids):
+    """예약별 첫 입장 기록 {예약 ID: (스캔 시각, 리더 ID)} (이벤트의 scanned_at, 없으면 이벤트 시각)"""
+    if not reservation_ids:
+        return {}
+
+    first = {}
+    rows = conn.execute(
+        select(ReservationEvent.reservation_id, ReservationEvent.payload, ReservationEvent.created_at)
+        .where(ReservationEvent.reservation_id.in_(reservation_ids),
+               ReservationEvent.new_status == ReservationStatus.checked_in)
+    )
+    for reservation_id, payload, created_at in rows:
+        payload = payload or {}
+        if payload.get('scanned_at'):
+            scanned_at = _as_utc(datetime.fromisoformat(payload['scanned_at']))
+        else:
+            scanned_at = _as_utc(created_at)
+        if reservation_id not in first or scanned_at < first[reservation_id][0]:
+            first[reservation_id] = (scanned_at, payload.get('reader_id'))
+    return first
+
+
+def merge_offline_checkins(engine, scans):
+    """리더 기기가 오프라인으로 모은 스캔 [(토큰, 리더 ID, 스캔 시각)]을 병합하고 스캔별 결과 반환
+
+    같은 표의 스캔이 여럿이면 스캔 시각이 가장 이른 것(같으면 먼저 온 것)이 이긴다. 이미 입장한
+    예약에 기록된 첫 스캔보다 이른 스캔이 오면, 상태는 그대로 두고 그 스캔을 checked_in 이벤트로
+    덧붙여 첫 입장 기록을 바로잡는다. 조회/상태 변경/이벤트는 한 트랜잭션 안에서 모두 IN 조건
+    SELECT, UPDATE 한 번, executemany로 처리한다.
+
+    반환값은 스캔 순서대로 {'verdict', 'reservation_id', 'performance_id', 'status',
+    'first_scanned_at', 'first_reader_id'} 딕셔너리이며 verdict는 checked_in(이 스캔이 첫 입장), already_checked_in
+    (더 이른 스캔이 있음), not_issued(발권 상태가 아님), unknown_token 중 하나다
+    (app/checkin.py의 CheckinOutcome 값).
+    """
+    scans = [(token, reader_id, _as_utc(scanned_at)) for token, reader_id, scanned_at in scans]
+    first = {}
+    for index, (token, _, scanned_at) in enumerate(scans):
+        if token not in first or scanned_at < scans[first[token]][2]:
+            first[token] = index
+
+    with write_transaction(engine) as conn:
+        rows = {
+            row.token: row
+            for row in conn.execute(
+                select(Reservation.id, Reservation.token, Reservation.status,
+                       Reservation.performance_id, Reservation.platform, Reservation.quantity,
+                       Reservation.seat_info)
+                .where(Reservation.token.in_(first))
+            )
+        } if first else {}
+        recorded = _first_checkins(
+            conn, [row.id for row in rows.values() if row.status == ReservationStatus.checked_in]
+        )
+
+        winners = {}  # 토큰 -> (첫 스캔 시각, 리더 ID)
+        won = set()  # 이번 스캔이 첫 입장 기록이 된 토큰
+        admit_rows, admitted, earlier = [], {}, {}
+        for token, index in first.items():
+            row = rows.get(token)
+            if row is None or row.status not in (ReservationStatus.issued, ReservationStatus.checked_in):
+                continue
+            _, reader_id, scanned_at = scans[index]
+            payload = {'scanned_at': scanned_at.isoformat(), 'reader_id': reader_id, 'offline': True}
+            recorded_at, recorded_reader = recorded.get(row.id, (None, None))
+            if row.status == ReservationStatus.checked_in and recorded_at is not None and recorded_at <= scanned_at:
+                winners[token] = (recorded_at, recorded_reader)
+                continue
+
+            winners[token] = (scanned_at, reader_id)
+            won.add(token)
+            if row.status == ReservationStatus.issued:
+                admit_rows.append(row)
+                admitted[row.id] = payload
+            else:
+                earlier[row.id] = payload
+
+        if admitted:
+            _check_in(conn, admit_rows, admitted)
+        if earlier:
+            conn.execute(insert(ReservationEvent), [
+                {
+                    'reservation_id': reservation_id, 'event_type': 'checked_in',
+                    'previous_status': ReservationStatus.checked_in, 'new_status': ReservationStatus.checked_in,
+                    'payload': payload,
+                }
+                for reservation_id, payload in earlier.items()
+            ])
+
+    results = []
+    for index, (token, _, _) in enumerate(scans):
+        row = rows.get(token)
+        if row is None:
+            results.append({'verdict': 'unknown_token'})
+            continue
+        if token not in winners:
+            results.append({
+                'verdict': 'not_issued', 'reservation_id': row.id,
+                'performance_id': row.performance_id, 'status': row.status,
+            })
+            continue
+
+        first_scanned_at, first_reader_id = winners[token]
+        results.append({
+            'verdict': 'checked_in' if token in won and index == first[token] else 'already_checked_in',
+            'reservation_id': row.id,
+            'performance_id': row.performance_id,
+            'status': ReservationStatus.checked_in,
+            'first_scanned_at': first_scanned_at,
+            'first_reader_id': first_reader_id,
+        })
+    return results
+
+
+def fetch_issued_tokens(conn, performance_id=None):
+    """토큰이 있는 예약의 (토큰, 예약 ID, 회차 ID, 상태) 리스트 (performance_id가 없으면 모든 회차)"""
+    query = select(Reservation.token, Reservation.id, Reservation.performance_id, Reservation.status).where(
+        Reservation.token.is_not(None)
+    )
+    if performance_id is not None:
+        query = query.where(Reservation.performance_id == performance_id)
+    return [tuple(row) for row in conn.execute(query)]
+
+
+def fetch_token(conn, token):
+    """토큰의 (토큰, 예약 ID, 회차 ID, 상태) (없는 토큰이면 None)"""
+    row = conn.execute(
+        select(Reservation.token, Reservation.id, Reservation.performance_id, Reservation.status)
+        .where(Reservation.token == token)
+    ).first()
+    return tuple(row) if row is not None else None
+
+
+def fetch_offline_snapshot(conn, performance_id):
+    """오프라인 입장 번들용 회차 스냅샷: (데이터 버전, [(토큰, 예약 ID, 상태, 좌석 정보)])
+
+    데이터 버전과 예약 행을 한 SELECT(외부 조인)로 읽어 같은 버전이면 항상 같은 내용이
+    된다. 회차가 없으면 None.
+    """
+    rows = conn.execute(
+        select(Performance.data_version, Reservation.token, Reservation.id,
+               Reservation.status, Reservation.seat_info)
+        .select_from(Performance)
+        .outerjoin(Reservation, (Reservation.performance_id == Performance.id) & Reservation.token.is_not(None))
+        .where(Performance.id == performance_id)
+    ).all()
+    if not rows:
+        return None
+    return rows[0][0], [tuple(row[1:]) for row in rows if row[1] is not None]
@@ -0,0 +1,127 @@
+"""
+예약 저장소 공용 요소 - 예약 상태 상수, 트랜잭션, 회차 데이터 버전
+"""
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select
+
+from app.db import get_engine
+from app.models import Performance, ReservationStatus
+
+
+# 예매 파일에서 사라진 예약의 상태
+CANCELLED_STATUS = ReservationStatus.cancelled
+
+
+# 예매 파일의 배정상태 -> 예약 상태
+IMPORT_STATUSES = {
+    '지정': ReservationStatus.reserved_assigned,
+    '비지정': ReservationStatus.reserved_unassigned,
+}
+
+
+# 화면/내보내기에 표시하는 예약 상태 이름
+STATUS_LABELS = {
+    ReservationStatus.pending: '대기',
+    ReservationStatus.reserved_assigned: '지정',
+    ReservationStatus.reserved_unassigned: '비지정',
+    ReservationStatus.issued: '발권',
+    ReservationStatus.checked_in: '입장',
+    ReservationStatus.cancelled: '취소',
+    ReservationStatus.expired: '만료',
+}
+
+
+# 예매 파일을 다시 가져올 때 바꿀 수 있는 상태 (발권/입장/만료는 QR API에서 관리하므로 유지)
+IMPORT_MANAGED_STATUSES = {
+    ReservationStatus.pending,
+    ReservationStatus.reserved_assigned,
+    ReservationStatus.reserved_unassigned,
+    ReservationStatus.cancelled,
+}
+
+
+# 회차 단위 QR 일괄 발권 대상 상태 (대기/취소/만료와 이미 발권/입장한 예약은 제외)
+QR_ISSUABLE_STATUSES = {
+    ReservationStatus.reserved_assigned,
+    ReservationStatus.reserved_unassigned,
+}
+
+
+def status_label(status):
+    """예약 상태의 표시 이름"""
+    return STATUS_LABELS[ReservationStatus(status)]
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value):
+    """DB에서 읽은 시각을 UTC aware datetime으로 (SQLite는 시간대 없이 UTC로 저장)"""
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+@contextmanager
+def write_transaction(engine=None):
+    """쓰기 트랜잭션 (성공하면 커밋, 오류가 나면 롤백)
+
+    SQLite에서는 BEGIN IMMEDIATE로 시작해 처음부터 쓰기 잠금을 잡는다. 트랜잭션 안에서 읽은
+    내용이 다른 연결의 쓰기와 섞이지 않고, 잠금을 나중에 올리다 SQLITE_BUSY로 실패하는 일도
+    없다. 다른 연결이 쓰는 중이면 busy timeout까지 기다린다.
+    """
+    engine = engine or get_engine()
+    with engine.connect() as conn:
+        conn.execution_options(sqlite_immediate=True)
+        with conn.begin():
+            yield conn
+
+
+@contextmanager
+def read_transaction(engine=None):
+    """읽기 트랜잭션 (안에서 실행한 조회가 모두 같은 시점의 데이터를 본다)
+
+    SQLite(WAL)는 트랜잭션의 첫 조회 시점 스냅샷을 끝날 때까지 유지한다. 다른 DB는 기본
+    격리 수준(READ COMMITTED)에서 조회마다 새 스냅샷을 보므로 REPEATABLE READ로 올린다.
+    """
+    engine = engine or get_engine()
+    with engine.connect() as conn:
+        if not _is_sqlite(conn):
+            conn.execution_options(isolation_level='REPEATABLE READ')
+        with conn.begin():
+            yield conn
+
+
+def _is_sqlite(conn):
+    # Connection과 ORM Session 모두 지원
+    dialect = conn.dialect if hasattr(conn, 'dialect') else conn.get_bind().dialect
+    return dialect.name == 'sqlite'
+
+
+def _driver_sql(conn, sql):
+    """'?' 자리표시자를 연결된 DB 드라이버의 paramstyle로 바꾼 SQL (exec_driver_sql용)"""
+    if conn.dialect.paramstyle in ('format', 'pyformat'):
+        return sql.replace('?', '%s')
+    return sql
+
+
+def fetch_data_version(conn, performance_id):
+    """회차 데이터 버전 (예약을 저장하거나 상태를 바꿀 때마다 1씩 증가, 조회 캐시 키로 사용)"""
+    return conn.execute(
+        select(Performance.data_version).where(Performance.id == performance_id)
+    ).scalar()
+
+
+def fetch_catalog_version(conn):
+    """공연/회차 목록 버전 (회차가 추가되거나 어느 회차든 데이터 버전이 바뀌면 달라짐)"""
+    return tuple(conn.execute(
+        select(func.coalesce(func.max(Performance.id), 0), func.coalesce(func.sum(Performance.data_version), 0))
+    ).one())
+
+
+def fetch_data_versions(conn):
+    """{회차 ID: 데이터 버전} (QR 토큰 인덱스가 바뀐 회차만 다시 읽는 데 사용)"""
+    return dict(conn.execute(select(Performance.id, Performance.data_version)).all())
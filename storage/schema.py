@@ -0,0 +1,118 @@
+"""
+예약 저장소 스키마 - 테이블 생성과 이전 Streamlit 전용 SQLite 스키마 변환
+"""
+from sqlalchemy import MetaData, inspect
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.models import Base, Performance, PerformanceSummary, Reservation
+from storage.core import _is_sqlite, write_transaction
+from storage.search import _create_search_index
+from storage.summary import _refresh_summary
+
+
+# 이전 스키마에 있던 예약 인덱스 (기본 키/발권 토큰 인덱스와 겹쳐 대량 저장만 느리게 함)
+_DROPPED_INDEXES = (
+    'ix_reservations_id',
+    'ix_reservations_performance_id',
+    'ix_reservations_token',
+)
+
+
+def create_schema(engine=None):
+    """테이블 생성 (이전 Streamlit 전용 SQLite 스키마는 공용 모델에 맞게 변환)"""
+    with write_transaction(engine) as conn:
+        if _is_sqlite(conn):
+            _migrate_legacy_sqlite(conn)
+
+        summary_exists = inspect(conn).has_table(PerformanceSummary.__tablename__)
+        if summary_exists and 'assigned' not in {
+            column['name'] for column in inspect(conn).get_columns(PerformanceSummary.__tablename__)
+        }:
+            # 지정석 건수(assigned)가 없는 이전 요약은 예약 데이터로 다시 집계
+            PerformanceSummary.__table__.drop(conn)
+            summary_exists = False
+        Base.metadata.create_all(conn)
+        if not summary_exists:
+            _refresh_summary(conn)
+
+        # 테이블이 이미 있으면 create_all이 새 인덱스를 만들지 않으므로 따로 확인
+        for index in Reservation.__table__.indexes:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+        for index_name in _DROPPED_INDEXES:
+            conn.exec_driver_sql(f'DROP INDEX IF EXISTS {index_name}')
+
+        if _is_sqlite(conn):
+            _create_search_index(conn)
+
+
+def _migrate_legacy_sqlite(conn):
+    """예매 관리 화면이 따로 쓰던 SQLite 스키마를 공용 모델에 맞게 변환
+
+    배정상태 텍스트('지정'/'비지정'/'취소')를 예약 상태 값으로 바꾸고, 예약 테이블은 모델 정의대로
+    다시 만든다 (ALTER TABLE로는 기존 created_at NOT NULL 컬럼에 기본값을 줄 수 없어, 가져오기처럼
+    created_at/updated_at을 DB 기본값에 맡기는 INSERT가 실패한다). 상태 값이 바뀌므로 회차 요약은
+    다시 만든다.
+    """
+    inspector = inspect(conn)
+    if inspector.has_table('performances'):
+        columns = {column['name'] for column in inspector.get_columns('performances')}
+        if 'data_version' not in columns:
+            conn.exec_driver_sql('ALTER TABLE performances ADD COLUMN data_version INTEGER NOT NULL DEFAULT 0')
+        if 'total_reservations' in columns:
+            # 회차 예약 건수는 회차 요약에서 계산하므로 더 갱신하지 않는 이전 컬럼은 지운다
+            conn.exec_driver_sql('ALTER TABLE performances DROP COLUMN total_reservations')
+        # isoformat('T' 구분) 문자열을 SQLAlchemy가 읽는 형식으로
+        conn.exec_driver_sql('''
+            UPDATE performances
+            SET created_at = replace(created_at, 'T', ' '), updated_at = replace(updated_at, 'T', ' ')
+            WHERE created_at LIKE '%T%' OR updated_at LIKE '%T%'
+        ''')
+
+    if not inspector.has_table('reservations'):
+        return
+    columns = {column['name']: column for column in inspector.get_columns('reservations')}
+    if 'token' not in columns:
+        conn.exec_driver_sql('''
+            UPDATE reservations
+            SET status = CASE status
+                WHEN '지정' THEN 'reserved_assigned'
+                WHEN '취소' THEN 'cancelled'
+                ELSE 'reserved_unassigned'
+            END
+        ''')
+        conn.exec_driver_sql('DROP TABLE IF EXISTS performance_summary')
+    # 이전 버전의 변환(ALTER TABLE로 컬럼만 추가)을 거친 DB도 created_at 기본값이 없으므로 다시 만든다
+    if columns['created_at']['default'] is None:
+        _rebuild_reservations(conn, columns)
+
+
+def _rebuild_reservations(conn, columns):
+    """예약 테이블을 모델 정의(NOT NULL/기본값/인덱스)대로 다시 만들고 기존 행을 ID 그대로 복사
+
+    새 테이블에 복사하고 이전 테이블을 지운 뒤 이름을 바꾸는 SQLite 표준 절차라, 예약을
+    참조하는 이벤트/좌석 테이블의 외래 키는 그대로 reservations를 가리킨다. 검색 인덱스는
+    이전 테이블의 트리거와 함께 지우고 _create_search_index가 다시 만든다.
+    """
+    metadata = MetaData()
+    Performance.__table__.to_metadata(metadata)  # 외래 키 대상
+    table = Reservation.__table__.to_metadata(metadata, name='reservations_new')
+    conn.execute(CreateTable(table))
+
+    created_at = "replace(created_at, 'T', ' ')"
+    updated_at = f"coalesce(replace(updated_at, 'T', ' '), {created_at})" if 'updated_at' in columns else created_at
+    token = 'token' if 'token' in columns else 'NULL'
+    conn.exec_driver_sql(f'''
+        INSERT INTO reservations_new (
+            id, performance_id, platform, reservation_number, name, phone, seat_info,
+            quantity, status, token, created_at, updated_at
+        )
+        SELECT id, performance_id, platform, reservation_number, name, phone, seat_info,
+               coalesce(quantity, 0), coalesce(status, 'reserved_unassigned'), {token},
+               coalesce({created_at}, CURRENT_TIMESTAMP), coalesce({updated_at}, CURRENT_TIMESTAMP)
+        FROM reservations
+    ''')
+    conn.exec_driver_sql('DROP TABLE IF EXISTS reservations_fts')
+    conn.exec_driver_sql('DROP TABLE reservations')
+    conn.exec_driver_sql('ALTER TABLE reservations_new RENAME TO reservations')
+    for index in Reservation.__table__.indexes:
+        conn.execute(CreateIndex(index, if_not_exists=True))
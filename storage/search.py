@@ -0,0 +1,191 @@
+"""
+예약 목록 조회 - 검색(FTS5 trigram/LIKE), 키셋 페이지, 건수
+"""
+from sqlalchemy import func, literal_column, or_, select, text, tuple_
+from sqlalchemy.exc import OperationalError
+
+from app.models import Performance, PerformanceSummary, Reservation
+from config import RESERVATION_PAGE_SIZE
+from storage.core import _is_sqlite, status_label
+
+
+# 예약 목록 정렬용 예매자명 (예매자명이 없으면 ''로, 인덱스 식과 같아야 인덱스를 탄다)
+_SORT_NAME = func.coalesce(Reservation.name, literal_column("''"))
+
+# 예약 목록 조회 컬럼 (배정상태는 STATUS_LABELS로 표시)
+_LIST_COLUMNS = (
+    Reservation.platform, Reservation.reservation_number, Reservation.name, Reservation.phone,
+    Reservation.seat_info, Reservation.quantity, Reservation.status,
+)
+
+
+def _create_search_index(conn):
+    """예매자명/연락처/예매번호 부분 문자열 검색용 FTS5 trigram 인덱스 생성 (SQLite 전용)
+
+    SQLite에 FTS5 trigram이 없으면 만들지 않고, 검색은 LIKE로 처리한다.
+    인덱스를 처음 만들 때는 기존 예약 데이터로 채운다. 수정/삭제는 트리거로 반영하고,
+    새 예약은 행마다 트리거를 돌리면 대량 저장이 몇 배 느려지므로 INSERT한 쪽에서
+    _index_reservations로 한 번에 색인한다.
+    """
+    if _has_search_index(conn):
+        return
+
+    try:
+        conn.exec_driver_sql('''
+            CREATE VIRTUAL TABLE reservations_fts USING fts5(
+                name, phone, reservation_number,
+                content='reservations', content_rowid='id', tokenize='trigram'
+            )
+        ''')
+    except OperationalError:
+        return
+
+    conn.exec_driver_sql('''
+        CREATE TRIGGER IF NOT EXISTS reservations_fts_delete AFTER DELETE ON reservations BEGIN
+            INSERT INTO reservations_fts (reservations_fts, rowid, name, phone, reservation_number)
+            VALUES ('delete', old.id, old.name, old.phone, old.reservation_number);
+        END
+    ''')
+    conn.exec_driver_sql('''
+        CREATE TRIGGER IF NOT EXISTS reservations_fts_update AFTER UPDATE OF name, phone, reservation_number ON reservations BEGIN
+            INSERT INTO reservations_fts (reservations_fts, rowid, name, phone, reservation_number)
+            VALUES ('delete', old.id, old.name, old.phone, old.reservation_number);
+            INSERT INTO reservations_fts (rowid, name, phone, reservation_number)
+            VALUES (new.id, new.name, new.phone, new.reservation_number);
+        END
+    ''')
+    conn.exec_driver_sql("INSERT INTO reservations_fts (reservations_fts) VALUES ('rebuild')")
+
+
+def _has_search_index(conn):
+    if not _is_sqlite(conn):
+        return False
+    return conn.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'reservations_fts'"
+    )).first() is not None
+
+
+def _index_reservations(conn, rows):
+    """새로 추가한 예약 rows [(ID, 예매자명, 연락처, 예매번호)]를 검색 인덱스에 한 번에 색인
+
+    INSERT한 행을 다시 읽지 않고 저장한 값 그대로 executemany 한 번으로 색인한다. conn은
+    SQLAlchemy Connection이나 ORM Session 모두 된다.
+    """
+    if not rows or not _has_search_index(conn):
+        return
+    if not hasattr(conn, 'exec_driver_sql'):  # ORM Session
+        conn = conn.connection()
+    conn.exec_driver_sql(
+        'INSERT INTO reservations_fts (rowid, name, phone, reservation_number) VALUES (?, ?, ?, ?)',
+        [tuple(row) for row in rows],
+    )
+
+
+def fetch_performance_names(conn):
+    """모든 공연 이름"""
+    return list(conn.execute(
+        select(Performance.performance_name).distinct().order_by(Performance.performance_name)
+    ).scalars())
+
+
+def _reservation_filter(conn, performance_id, platforms=None, statuses=None, search_text=''):
+    """회차 예약 조회 조건 리스트 생성
+
+    platforms/statuses가 비어 있으면 해당 조건은 적용하지 않는다. SQLite에서 3글자 이상
+    검색어는 FTS5 trigram 인덱스로 찾고, 더 짧은 검색어(trigram으로 찾을 수 없음)나 FTS5가
+    없는 환경(Postgres 포함)에서는 해당 회차 안에서 LIKE로 찾는다.
+    """
+    conditions = [Reservation.performance_id == performance_id]
+
+    if platforms:
+        conditions.append(Reservation.platform.in_(list(platforms)))
+    if statuses:
+        conditions.append(Reservation.status.in_(list(statuses)))
+
+    search_text = search_text.strip()
+    if search_text and len(search_text) >= 3 and _has_search_index(conn):
+        matches = (
+            select(literal_column('rowid'))
+            .select_from(text('reservations_fts'))
+            .where(text('reservations_fts MATCH :fts_query').bindparams(
+                fts_query='"' + search_text.replace('"', '""') + '"'
+            ))
+        )
+        conditions.append(Reservation.id.in_(matches))
+    elif search_text:
+        pattern = '%' + search_text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        conditions.append(or_(
+            Reservation.name.like(pattern, escape='\\'),
+            Reservation.phone.like(pattern, escape='\\'),
+            Reservation.reservation_number.like(pattern, escape='\\'),
+        ))
+
+    return conditions
+
+
+def _list_row(row):
+    """조회 행의 배정상태를 표시 이름으로"""
+    return (*row[:-1], status_label(row[-1]))
+
+
+def iter_reservations(conn, performance_id, search_text='', platforms=None, statuses=None):
+    """회차의 예약 목록을 커서에서 한 행씩 반환 (조건은 _reservation_filter 참고)"""
+    result = conn.execution_options(yield_per=1000).execute(
+        select(*_LIST_COLUMNS)
+        .where(*_reservation_filter(conn, performance_id, platforms, statuses, search_text))
+        .order_by(Reservation.platform, _SORT_NAME, Reservation.id)
+    )
+    return (_list_row(row) for row in result)
+
+
+def fetch_reservations(conn, performance_id, search_text='', platforms=None, statuses=None):
+    """회차의 예약 목록 전체 조회 (조건은 _reservation_filter 참고)"""
+    return list(iter_reservations(conn, performance_id, search_text, platforms, statuses))
+
+
+def fetch_reservation_page(conn, performance_id, platforms=None, statuses=None, search_text='',
+                           after=None, limit=RESERVATION_PAGE_SIZE):
+    """회차 예약 목록의 한 페이지를 (예매처, 예매자명, ID) 순서로 조회
+
+    OFFSET 대신 이전 페이지 마지막 행의 (예매처, 예매자명, ID) 다음부터 읽는 키셋 방식이라
+    (예매처, 예매자명) 인덱스를 따라 limit 행만 읽는다. 회차 규모나 페이지 위치와 관계없이
+    비용이 같다. 예매자명이 없는 예약(API로 등록한 예약 등)은 ''로 정렬하고 비교한다 (NULL과
+    비교하면 조건이 NULL이 되어 그 행을 건너뛴다). 반환값: (행 리스트, 다음 페이지 커서 또는 None)
+    """
+    conditions = _reservation_filter(conn, performance_id, platforms, statuses, search_text)
+    if after is not None:
+        conditions.append(tuple_(Reservation.platform, _SORT_NAME, Reservation.id) > tuple_(*after))
+
+    rows = conn.execute(
+        select(Reservation.id, _SORT_NAME.label('sort_name'), *_LIST_COLUMNS)
+        .where(*conditions)
+        .order_by(Reservation.platform, _SORT_NAME, Reservation.id)
+        .limit(limit + 1)
+    ).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = (last.platform, last.sort_name, last.id)
+    return [_list_row(row[2:]) for row in rows], next_cursor
+
+
+def count_reservations(conn, performance_id, platforms=None, statuses=None, search_text=''):
+    """조건에 맞는 예약 건수 (검색어가 없으면 회차 요약 테이블에서 계산)"""
+    if not search_text.strip():
+        query = (
+            select(func.coalesce(func.sum(PerformanceSummary.reservations), 0))
+            .where(PerformanceSummary.performance_id == performance_id)
+        )
+        if platforms:
+            query = query.where(PerformanceSummary.platform.in_(list(platforms)))
+        if statuses:
+            query = query.where(PerformanceSummary.status.in_(list(statuses)))
+        return conn.execute(query).scalar()
+
+    return conn.execute(
+        select(func.count())
+        .select_from(Reservation)
+        .where(*_reservation_filter(conn, performance_id, platforms, statuses, search_text))
+    ).scalar()
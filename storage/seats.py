@@ -0,0 +1,38 @@
+"""
+좌석 상태 조회와 회차 좌석 지도(비트맵) 저장
+"""
+from sqlalchemy import insert, select, update
+
+from app.models import Performance, PerformanceSeatMap, Reservation, SeatStatus
+from storage.core import _utcnow
+
+
+def fetch_seat_statuses(conn, performance_id):
+    """회차의 좌석 상태 [(좌석 코드, 상태)] (예약에 묶인 seat_status 행 중 빈 좌석이 아닌 것)"""
+    return [tuple(row) for row in conn.execute(
+        select(SeatStatus.seat_code, SeatStatus.status)
+        .join(Reservation, Reservation.id == SeatStatus.reservation_id)
+        .where(Reservation.performance_id == performance_id, SeatStatus.status != 'available')
+    )]
+
+
+def fetch_seat_map_data(conn, performance_id):
+    """회차의 (공연 이름, 저장된 좌석 지도 바이트 또는 None) (회차가 없으면 None)"""
+    row = conn.execute(
+        select(Performance.performance_name, PerformanceSeatMap.bitmap)
+        .select_from(Performance)
+        .outerjoin(PerformanceSeatMap, PerformanceSeatMap.performance_id == Performance.id)
+        .where(Performance.id == performance_id)
+    ).first()
+    return tuple(row) if row is not None else None
+
+
+def save_seat_map_data(conn, performance_id, bitmap):
+    """회차의 좌석 지도 바이트(SeatMap.to_bytes) 저장 (있으면 덮어씀)"""
+    updated = conn.execute(
+        update(PerformanceSeatMap)
+        .where(PerformanceSeatMap.performance_id == performance_id)
+        .values(bitmap=bitmap, updated_at=_utcnow())
+    )
+    if updated.rowcount == 0:
+        conn.execute(insert(PerformanceSeatMap).values(performance_id=performance_id, bitmap=bitmap))
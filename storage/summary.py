@@ -0,0 +1,180 @@
+"""
+회차 요약 - 쓰기 시점에 갱신하는 (예매처, 상태)별 건수/좌석 수와 회차 데이터 버전
+"""
+from collections import Counter
+
+from sqlalchemy import bindparam, case, delete, func, insert, select, update
+
+from app.models import Performance, PerformanceSummary, Reservation, ReservationStatus
+from storage.core import CANCELLED_STATUS, _as_utc
+from storage.search import _index_reservations
+
+
+def _has_seat(seat_info):
+    """좌석정보가 있는 예약(지정석)이면 1, 아니면 0 (회차 요약의 assigned)"""
+    return 1 if seat_info and seat_info.strip() else 0
+
+
+# _has_seat의 SQL 식
+_HAS_SEAT = case((func.trim(func.coalesce(Reservation.seat_info, '')) != '', 1), else_=0)
+
+
+def _refresh_summary(conn, performance_id=None):
+    """회차 요약을 예약 데이터로 다시 계산 (performance_id가 없으면 모든 회차)"""
+    query = select(
+        Reservation.performance_id, Reservation.platform, Reservation.status,
+        func.count(), func.coalesce(func.sum(Reservation.quantity), 0), func.coalesce(func.sum(_HAS_SEAT), 0),
+    ).group_by(Reservation.performance_id, Reservation.platform, Reservation.status)
+    clear = delete(PerformanceSummary)
+    if performance_id is not None:
+        query = query.where(Reservation.performance_id == performance_id)
+        clear = clear.where(PerformanceSummary.performance_id == performance_id)
+
+    conn.execute(clear)
+    conn.execute(insert(PerformanceSummary).from_select(
+        ['performance_id', 'platform', 'status', 'reservations', 'seats', 'assigned'], query
+    ))
+
+
+# _adjust_summary/_bump_data_version 문장 (값은 bindparam으로 넘겨 SQLAlchemy가 컴파일 결과를 재사용한다.
+# 입장 스캔처럼 한 건씩 자주 호출하면 문장을 매번 만드는 비용이 DB 실행보다 크다)
+_SUMMARY_KEY = (
+    (PerformanceSummary.performance_id == bindparam('b_performance_id'))
+    & (PerformanceSummary.platform == bindparam('b_platform'))
+    & (PerformanceSummary.status == bindparam('b_status'))
+)
+
+_ADD_TO_SUMMARY = (
+    update(PerformanceSummary)
+    .where(_SUMMARY_KEY)
+    .values(reservations=PerformanceSummary.reservations + bindparam('b_reservations'),
+            seats=PerformanceSummary.seats + bindparam('b_seats'),
+            assigned=PerformanceSummary.assigned + bindparam('b_assigned'))
+)
+
+_DELETE_EMPTY_SUMMARY = delete(PerformanceSummary).where(_SUMMARY_KEY & (PerformanceSummary.reservations <= 0))
+
+_BUMP_DATA_VERSION = (
+    update(Performance)
+    .where(Performance.id == bindparam('b_performance_id'))
+    .values(data_version=Performance.data_version + 1)
+)
+
+
+def _adjust_summary(conn, performance_id, platform, status, reservations, seats, assigned):
+    """회차 요약의 (예매처, 상태) 행에 건수/좌석 수/지정석 건수를 더함 (음수면 빼고, 0건이 된 행은 삭제)"""
+    key = {'b_performance_id': performance_id, 'b_platform': platform, 'b_status': status}
+    updated = conn.execute(_ADD_TO_SUMMARY, {
+        **key, 'b_reservations': reservations, 'b_seats': seats, 'b_assigned': assigned,
+    })
+    if updated.rowcount == 0 and reservations > 0:
+        conn.execute(insert(PerformanceSummary), {
+            'performance_id': performance_id, 'platform': platform, 'status': status,
+            'reservations': reservations, 'seats': seats, 'assigned': assigned,
+        })
+    elif reservations < 0:
+        conn.execute(_DELETE_EMPTY_SUMMARY, key)
+
+
+def _move_summary(conn, performance_id, platform, quantity, seat_info, previous_status, new_status):
+    """예약 하나의 상태 변경을 회차 요약에 반영 (previous_status가 None이면 새 예약)"""
+    quantity = quantity or 0
+    assigned = _has_seat(seat_info)
+    if previous_status is not None:
+        _adjust_summary(conn, performance_id, platform, previous_status, -1, -quantity, -assigned)
+    _adjust_summary(conn, performance_id, platform, new_status, 1, quantity, assigned)
+
+
+def _bump_data_version(conn, performance_id):
+    conn.execute(_BUMP_DATA_VERSION, {'b_performance_id': performance_id})
+
+
+def track_reservation_change(conn, reservation_id, previous_status=None, token_changed=False):
+    """예약 하나를 추가하거나 상태를 바꾼 뒤 회차 요약/데이터 버전/검색 인덱스 갱신
+
+    QR API처럼 예약을 한 건씩 다루는 경로에서 같은 트랜잭션 안(flush 이후)에 호출한다.
+    conn은 SQLAlchemy Connection이나 Session 모두 된다. previous_status가 None이면
+    새 예약으로 본다. 상태가 그대로여도 token_changed면 데이터 버전을 올린다 (토큰 인덱스와
+    오프라인 번들 스냅샷은 같은 버전이면 내용도 같다고 본다).
+    """
+    row = conn.execute(
+        select(Reservation.performance_id, Reservation.platform, Reservation.quantity, Reservation.seat_info,
+               Reservation.status, Reservation.name, Reservation.phone, Reservation.reservation_number)
+        .where(Reservation.id == reservation_id)
+    ).first()
+    if row is None:
+        return
+
+    performance_id, platform, quantity, seat_info, status = row[:5]
+    if previous_status is None:
+        _index_reservations(conn, [(reservation_id, *row[5:])])
+    elif previous_status == status:
+        if token_changed:
+            _bump_data_version(conn, performance_id)
+        return
+
+    _move_summary(conn, performance_id, platform, quantity, seat_info, previous_status, status)
+    _bump_data_version(conn, performance_id)
+
+
+def _replace_summary(conn, performance_id, totals):
+    """회차 요약을 {(예매처, 상태): [건수, 좌석 수, 지정석 건수]}로 교체 (save_reservations가 저장한 행으로 계산)"""
+    conn.execute(delete(PerformanceSummary).where(PerformanceSummary.performance_id == performance_id))
+    if totals:
+        conn.execute(insert(PerformanceSummary), [
+            {'performance_id': performance_id, 'platform': platform, 'status': status,
+             'reservations': count, 'seats': seats, 'assigned': assigned}
+            for (platform, status), (count, seats, assigned) in totals.items()
+        ])
+
+
+def fetch_performance_sessions(conn, performance_name):
+    """공연의 회차 목록 [(ID, 날짜, 시간, 수정 시각(UTC), 예약 건수)]
+
+    예약 건수는 회차 요약에서 취소를 뺀 건수다. 예매 파일 가져오기뿐 아니라 QR API의 등록/상태
+    변경도 요약을 갱신하므로 어느 경로로 바뀌어도 맞는다.
+    """
+    active = (
+        select(func.coalesce(func.sum(PerformanceSummary.reservations), 0))
+        .where(PerformanceSummary.performance_id == Performance.id,
+               PerformanceSummary.status != CANCELLED_STATUS)
+        .scalar_subquery()
+    )
+    rows = conn.execute(
+        select(
+            Performance.id, Performance.performance_date, Performance.performance_time,
+            Performance.updated_at, active,
+        )
+        .where(Performance.performance_name == performance_name)
+        .order_by(Performance.performance_date, Performance.performance_time)
+    )
+    return [(row[0], row[1], row[2], _as_utc(row[3]), row[4]) for row in rows]
+
+
+def fetch_summary(conn, performance_id):
+    """회차 요약 조회 (예약 행은 읽지 않음)
+
+    반환값: {'reservations': 전체 건수, 'seats': 취소를 뺀 좌석 수,
+            'assigned'/'unassigned': 취소를 뺀 지정석(좌석정보 있음)/비지정석 건수 (발권/입장 후에도 유지),
+            'by_status': {예약 상태: 건수}, 'by_platform': {예매처: 건수}}
+    """
+    summary = {
+        'reservations': 0, 'seats': 0, 'assigned': 0, 'unassigned': 0,
+        'by_status': Counter(), 'by_platform': Counter(),
+    }
+    rows = conn.execute(
+        select(PerformanceSummary.platform, PerformanceSummary.status,
+               PerformanceSummary.reservations, PerformanceSummary.seats, PerformanceSummary.assigned)
+        .where(PerformanceSummary.performance_id == performance_id)
+        .order_by(PerformanceSummary.platform)
+    )
+
+    for platform, status, reservations, seats, assigned in rows:
+        summary['reservations'] += reservations
+        summary['by_status'][ReservationStatus(status)] += reservations
+        summary['by_platform'][platform] += reservations
+        if status != CANCELLED_STATUS:
+            summary['seats'] += seats
+            summary['assigned'] += assigned
+            summary['unassigned'] += reservations - assigned
+    return summary
@@ -0,0 +1,343 @@
+"""
+예약 쓰기 - 예매 파일 가져오기(회차 동기화), API 일괄 등록, QR 일괄 발권, 상태 변경
+"""
+import json
+from collections import Counter
+from itertools import chain
+
+from sqlalchemy import bindparam, insert, select, update
+
+from app.models import Performance, Reservation, ReservationEvent, ReservationStatus
+from storage.core import (
+    CANCELLED_STATUS, IMPORT_MANAGED_STATUSES, IMPORT_STATUSES, QR_ISSUABLE_STATUSES, _driver_sql, _utcnow,
+    write_transaction,
+)
+from storage.search import _index_reservations
+from storage.summary import _adjust_summary, _bump_data_version, _has_seat, _replace_summary, track_reservation_change
+
+# 대량 INSERT/UPDATE는 Core 문장 대신 드라이버에 바로 넘긴다 (INSERT는 여러 행 VALUES + RETURNING,
+# UPDATE는 executemany). Core는 행마다 파라미터 dict를 다시 만들어 5만 행이면 저장 시간이 몇 배가 된다.
+# 자리표시자 '?'는 _driver_sql이 DB 드라이버 형식으로 바꾼다.
+_INSERT_RESERVATION_SQL = (
+    'INSERT INTO reservations (performance_id, platform, reservation_number, seat_info, '
+    'name, phone, quantity, status) VALUES '
+)
+
+# _insert_reservation_rows가 INSERT 문장 하나에 넣는 예약 행 수 (8 x 500 = 4,000 파라미터)
+_INSERT_BATCH_ROWS = 500
+
+_INSERT_CREATED_EVENT_SQL = (
+    "INSERT INTO reservation_events (reservation_id, event_type, new_status, payload) "
+    "VALUES (?, 'reservation_created', ?, ?)"
+)
+
+_UPDATE_RESERVATION_SQL = (
+    'UPDATE reservations SET name = ?, phone = ?, quantity = ?, status = ?, '
+    'updated_at = CURRENT_TIMESTAMP WHERE id = ?'
+)
+
+_UPDATE_STATUS_SQL = 'UPDATE reservations SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?'
+
+# 가져오기 대상 회차의 기존 예약 (드라이버에서 바로 읽고 상태 문자열은 _STATUSES로 바꾼다)
+_SELECT_EXISTING_SQL = (
+    'SELECT id, platform, reservation_number, seat_info, name, phone, quantity, status '
+    'FROM reservations WHERE performance_id = ? ORDER BY id'
+)
+
+_STATUSES = {status.value: status for status in ReservationStatus}
+
+# 파일 배정상태 -> (예약 상태, 저장할 값)
+_IMPORT_STATUS_VALUES = {label: (status, status.value) for label, status in IMPORT_STATUSES.items()}
+
+
+def insert_reservations(conn, reservations):
+    """예약 여러 건을 한 번에 INSERT하고 입력 순서대로 ID 리스트 반환 (API 일괄 등록용)
+
+    reservations는 Reservation 컬럼 dict 리스트다. reservation_created 이벤트, 회차 요약,
+    데이터 버전, 검색 인덱스를 행마다가 아니라 몇 번의 집합 연산으로 갱신하며, 호출한 쪽의
+    트랜잭션(Connection 또는 ORM Session) 안에서 실행된다.
+    """
+    if not reservations:
+        return []
+
+    if not hasattr(conn, 'exec_driver_sql'):  # ORM Session
+        conn = conn.connection()
+
+    rows = [
+        (reservation['performance_id'], reservation['platform'], reservation['reservation_number'],
+         reservation['seat_info'], reservation['name'], reservation['phone'], reservation['quantity'],
+         ReservationStatus(reservation['status']).value)
+        for reservation in reservations
+    ]
+    ids = _insert_reservation_rows(conn, rows)
+    conn.exec_driver_sql(_driver_sql(conn, _INSERT_CREATED_EVENT_SQL), [
+        (reservation_id, row[7], json.dumps(_created_payload(reservation)))
+        for reservation_id, row, reservation in zip(ids, rows, reservations)
+    ])
+
+    deltas = {}
+    for reservation in reservations:
+        key = (reservation['performance_id'], reservation['platform'], reservation['status'])
+        count, seats, assigned = deltas.get(key, (0, 0, 0))
+        deltas[key] = (
+            count + 1, seats + (reservation['quantity'] or 0), assigned + _has_seat(reservation['seat_info'])
+        )
+    for (performance_id, platform, status), (count, seats, assigned) in deltas.items():
+        _adjust_summary(conn, performance_id, platform, status, count, seats, assigned)
+
+    conn.execute(
+        update(Performance)
+        .where(Performance.id.in_({key[0] for key in deltas}))
+        .values(data_version=Performance.data_version + 1)
+    )
+    return ids
+
+
+def _created_payload(reservation):
+    """reservation_created 이벤트 payload (값이 있는 컬럼만)"""
+    return {key: value for key, value in reservation.items() if value is not None}
+
+
+def _insert_reservation_rows(conn, rows):
+    """예약 행 [(회차 ID, 예매처, 예매번호, 좌석정보, 예매자명, 연락처, 매수, 상태)]을 INSERT/색인하고 입력 순서대로 ID 리스트 반환
+
+    _INSERT_BATCH_ROWS 행씩 여러 행 VALUES 문장 하나로 INSERT하고 RETURNING id로 DB가 매긴
+    ID를 읽는다 (SQLite 3.35 이상/Postgres). 같은 DB를 쓰는 다른 쓰기와 ID가 겹칠 수 없다.
+    한 문장 안에서 ID는 입력 순서대로 증가하므로 문장별로 정렬하면 입력 순서가 된다. 행마다
+    파라미터를 처리하는 SQLAlchemy insert().returning() 대신 드라이버에 바로 넘긴다.
+    """
+    values = '(' + ', '.join(['?'] * 8) + ')'
+    statements = {}
+    ids = []
+    for start in range(0, len(rows), _INSERT_BATCH_ROWS):
+        batch = rows[start:start + _INSERT_BATCH_ROWS]
+        sql = statements.get(len(batch))
+        if sql is None:
+            sql = statements[len(batch)] = _driver_sql(
+                conn, _INSERT_RESERVATION_SQL + ', '.join([values] * len(batch)) + ' RETURNING id'
+            )
+        # scalars().all()은 fetchall 한 번으로 읽는다 (행마다 fetchone하지 않음)
+        ids.extend(sorted(conn.exec_driver_sql(sql, tuple(chain.from_iterable(batch))).scalars().all()))
+
+    _index_reservations(conn, [(reservation_id, row[4], row[5], row[2]) for reservation_id, row in zip(ids, rows)])
+    return ids
+
+
+_ISSUE_TOKEN = (
+    update(Reservation)
+    .where(Reservation.id == bindparam('b_id'))
+    .values(token=bindparam('b_token'), status=ReservationStatus.issued)
+)
+
+
+def issue_performance_tokens(conn, performance_id, token_for):
+    """회차의 발권 대상 예약(QR_ISSUABLE_STATUSES)에 QR 토큰을 한 번에 발급하고 [(예약 ID, 토큰)] 반환
+
+    토큰은 token_for(예약 ID)로 만든다 (app/tokens.py의 키 기반 순열이라 예약 ID가 다르면
+    토큰도 달라서 중복 조회가 필요 없다). 예약 UPDATE와 qr_issued 이벤트는 각각 executemany
+    한 번으로 쓴다. 이미 토큰이 있는 예약은 단건 발권처럼 그 토큰을 그대로 쓴다. 호출한 쪽의
+    트랜잭션 안에서 실행된다.
+    """
+    rows = conn.execute(
+        select(Reservation.id, Reservation.platform, Reservation.quantity, Reservation.seat_info,
+               Reservation.status, Reservation.token)
+        .where(Reservation.performance_id == performance_id, Reservation.status.in_(QR_ISSUABLE_STATUSES))
+        .order_by(Reservation.id)
+    ).all()
+    if not rows:
+        return []
+
+    issued = [(row.id, row.token if row.token is not None else token_for(row.id)) for row in rows]
+
+    conn.execute(_ISSUE_TOKEN, [
+        {'b_id': reservation_id, 'b_token': token} for reservation_id, token in issued
+    ])
+    conn.execute(insert(ReservationEvent), [
+        {
+            'reservation_id': reservation_id, 'event_type': 'qr_issued',
+            'previous_status': row.status, 'new_status': ReservationStatus.issued,
+            'payload': {'token': token},
+        }
+        for row, (reservation_id, token) in zip(rows, issued)
+    ])
+
+    deltas = {}
+    for row in rows:
+        for status, sign in ((row.status, -1), (ReservationStatus.issued, 1)):
+            count, seats, assigned = deltas.get((row.platform, status), (0, 0, 0))
+            deltas[(row.platform, status)] = (
+                count + sign, seats + sign * (row.quantity or 0), assigned + sign * _has_seat(row.seat_info)
+            )
+    for (platform, status), (count, seats, assigned) in deltas.items():
+        _adjust_summary(conn, performance_id, platform, status, count, seats, assigned)
+
+    _bump_data_version(conn, performance_id)
+    return issued
+
+
+def set_reservation_status(engine, reservation_id, status, note=None):
+    """예약 하나의 상태를 바꾸고 이벤트/회차 요약도 함께 갱신 (예약이 없으면 False)"""
+    with write_transaction(engine) as conn:
+        previous_status = conn.execute(
+            select(Reservation.status).where(Reservation.id == reservation_id)
+        ).scalar()
+        if previous_status is None:
+            return False
+        if previous_status == status:
+            return True
+
+        conn.execute(
+            update(Reservation)
+            .where(Reservation.id == reservation_id)
+            .values(status=status, updated_at=_utcnow())
+        )
+        conn.execute(insert(ReservationEvent).values(
+            reservation_id=reservation_id, event_type='status_updated',
+            previous_status=previous_status, new_status=status,
+            payload={'note': note} if note else None,
+        ))
+        track_reservation_change(conn, reservation_id, previous_status)
+    return True
+
+
+
+def save_reservations(engine, performance_info, reservation_chunks):
+    """공연 회차의 예약 데이터를 하나의 트랜잭션으로 동기화하고 (공연 ID, 건수 요약) 반환
+
+    이미 저장된 회차면 (예매처, 예매번호, 좌석정보)로 기존 예약과 맞춰 보고 새 예약만 INSERT,
+    내용이 바뀐 예약만 UPDATE한다. 이번 파일에 없는 기존 예약은 삭제하지 않고 취소 상태로
+    바꾸므로 예약 ID(와 QR 토큰)가 유지되고 변경분만 기록된다. 발권/입장 이후 상태는 QR API가
+    관리하므로 파일의 배정상태로 되돌리지 않고, 파일에 없어도 취소하지 않는다 (일부만 내보낸
+    파일로 이미 전달된 QR이 무효가 되지 않도록 건수 요약의 'kept'로만 알린다). 가져오기로
+    상태가 바뀐 예약은 이벤트를 남긴다.
+    예약 데이터는 chunk(dict 리스트) 단위로 받아 executemany로 처리하며, 오류가 나면 전체를
+    롤백하고 예외를 그대로 전달한다. 예약의 created_at/updated_at은 행마다 값을 넘기지 않고
+    DB 기본값(now())에 맡긴다.
+    """
+    now = _utcnow()
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'cancelled': 0, 'kept': 0}
+    events = []
+
+    with write_transaction(engine) as conn:
+        performance_id = conn.execute(
+            select(Performance.id).where(
+                Performance.performance_name == performance_info['name'],
+                Performance.performance_date == performance_info['date'],
+                Performance.performance_time == performance_info['time'],
+            )
+        ).scalar()
+
+        # (예매처, 예매번호, 좌석정보) -> 기존 예약 행 리스트 (같은 키가 여러 번이면 ID 순서대로 대응)
+        existing = {}
+        if performance_id is not None:
+            rows = conn.exec_driver_sql(_driver_sql(conn, _SELECT_EXISTING_SQL), (performance_id,)).all()
+            for row in rows:
+                existing.setdefault((row[1], row[2], row[3]), []).append(row[:7] + (_STATUSES[row[7]],))
+
+        else:
+            performance_id = conn.execute(insert(Performance).values(
+                performance_name=performance_info['name'],
+                performance_date=performance_info['date'],
+                performance_time=performance_info['time'],
+                created_at=now, updated_at=now,
+            )).inserted_primary_key[0]
+
+        update_sql = _driver_sql(conn, _UPDATE_RESERVATION_SQL)
+        # (예매처, 상태) -> [건수, 좌석 수, 지정석 건수]: 저장 후 회차 요약 (저장한 예약 행을 DB에서 다시 집계하지 않음)
+        totals = {}
+        occurrences = Counter()
+        for reservation_data in reservation_chunks:
+            if not existing:
+                # 맞춰 볼 기존 예약이 없으면 (새 회차) 행을 바로 INSERT
+                inserts = []
+                for reservation in reservation_data:
+                    status, status_value = _IMPORT_STATUS_VALUES[reservation['배정상태']]
+                    inserts.append((
+                        performance_id, reservation['예매처'], reservation['예매번호'], reservation['좌석정보'],
+                        reservation['예매자명'], reservation['연락처'], reservation['매수'], status_value,
+                    ))
+                    total = totals.setdefault((reservation['예매처'], status), [0, 0, 0])
+                    total[0] += 1
+                    total[1] += reservation['매수'] or 0
+                    total[2] += _has_seat(reservation['좌석정보'])
+                _insert_reservation_rows(conn, inserts)
+                counts['inserted'] += len(inserts)
+                continue
+
+            inserts = []
+            updates = []
+            for reservation in reservation_data:
+                key = (reservation['예매처'], reservation['예매번호'], reservation['좌석정보'])
+                status = IMPORT_STATUSES[reservation['배정상태']]
+                matches = existing.get(key, ())
+                occurrence = occurrences[key]
+                occurrences[key] += 1
+
+                if occurrence >= len(matches):
+                    inserts.append((
+                        performance_id, key[0], key[1], key[2], reservation['예매자명'],
+                        reservation['연락처'], reservation['매수'], status.value,
+                    ))
+                else:
+                    match = matches[occurrence]
+                    if match[7] not in IMPORT_MANAGED_STATUSES:
+                        status = match[7]
+                    values = (reservation['예매자명'], reservation['연락처'], reservation['매수'], status)
+                    if match[4:] == values:
+                        counts['unchanged'] += 1
+                    else:
+                        updates.append((values[0], values[1], values[2], status.value, match[0]))
+                        if status != match[7]:
+                            events.append((match[0], match[7], status))
+
+                total = totals.setdefault((key[0], status), [0, 0, 0])
+                total[0] += 1
+                total[1] += reservation['매수'] or 0
+                total[2] += _has_seat(key[2])
+
+            if inserts:
+                _insert_reservation_rows(conn, inserts)
+            if updates:
+                conn.exec_driver_sql(update_sql, updates)
+            counts['inserted'] += len(inserts)
+            counts['updated'] += len(updates)
+
+        # 이번 파일에 없는 예약은 취소 처리 (발권/입장/만료 예약은 그대로 두고 건수만 집계)
+        missing = [row for key, rows in existing.items() for row in rows[occurrences[key]:]]
+        cancellations = [
+            row for row in missing
+            if row[7] in IMPORT_MANAGED_STATUSES and row[7] != CANCELLED_STATUS
+        ]
+        counts['kept'] = sum(row[7] not in IMPORT_MANAGED_STATUSES for row in missing)
+        if cancellations:
+            conn.exec_driver_sql(_driver_sql(conn, _UPDATE_STATUS_SQL), [
+                (CANCELLED_STATUS.value, row[0]) for row in cancellations
+            ])
+        events.extend((row[0], row[7], CANCELLED_STATUS) for row in cancellations)
+        counts['cancelled'] = len(cancellations)
+        for row in missing:
+            status = CANCELLED_STATUS if row[7] in IMPORT_MANAGED_STATUSES else row[7]
+            total = totals.setdefault((row[1], status), [0, 0, 0])
+            total[0] += 1
+            total[1] += row[6] or 0
+            total[2] += _has_seat(row[3])
+
+        if events:
+            conn.execute(insert(ReservationEvent), [
+                {
+                    'reservation_id': reservation_id, 'event_type': 'status_updated',
+                    'previous_status': previous_status, 'new_status': new_status,
+                    'payload': {'source': 'import'}, 'created_at': now,
+                }
+                for reservation_id, previous_status, new_status in events
+            ])
+
+        counts['total'] = counts['inserted'] + counts['updated'] + counts['unchanged']
+        _replace_summary(conn, performance_id, totals)
+        conn.execute(
+            update(Performance)
+            .where(Performance.id == performance_id)
+            .values(updated_at=now, data_version=Performance.data_version + 1)
+        )
+
+    return performance_id, counts
@@ -0,0 +1,53 @@
+"""
+QR API 테스트 공통 설정
+
+앱 모듈이 설정과 엔진을 처음 import할 때 읽으므로, 임시 SQLite DB와 QR 키를 먼저 환경 변수로
+지정한다. 캐시 폴더(data/...)가 저장소 안에 생기지 않도록 임시 폴더에서 실행한다.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TMP_DIR = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(TMP_DIR, 'test.db')}"
+os.environ['QR_TOKEN_KEY'] = 'test-token-key'
+os.environ['QR_SIGNING_KEY'] = 'test-signing-key'
+os.chdir(TMP_DIR)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+PERFORMANCE_INFO = {'name': '테스트 공연', 'date': '2024.11.25', 'time': '19:00'}
+
+
+@pytest.fixture(scope='session')
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope='session')
+def engine(client):
+    from app.db import get_engine
+    return get_engine()
+
+
+def make_rows(count, start=0):
+    """통합명부 형식의 예약 행 (지정석/비지정석 번갈아)"""
+    return [
+        {
+            '예매처': '인터파크',
+            '예매번호': f"T{start + i}",
+            '예매자명': f"예매자{start + i}",
+            '연락처': '010-0000-0000',
+            '좌석정보': f"A-{i + 1}" if i % 2 == 0 else '',
+            '매수': 1,
+            '배정상태': '지정' if i % 2 == 0 else '비지정',
+        }
+        for i in range(count)
+    ]
@@ -0,0 +1,27 @@
+"""비동기 엔진(aiosqlite)과 비동기 라우트"""
+from sqlalchemy import select
+
+from app.db import create_async_db_engine
+from app.models import Reservation
+from conftest import PERFORMANCE_INFO, make_rows
+from storage import save_reservations
+
+
+def test_async_sqlite_engine_uses_single_connection_pool(tmp_path):
+    engine = create_async_db_engine(f"sqlite:///{tmp_path / 'async.db'}")
+    try:
+        assert engine.pool.size() == 1
+    finally:
+        engine.sync_engine.dispose()
+
+
+def test_async_status_route(client, engine):
+    performance_id, _ = save_reservations(engine, PERFORMANCE_INFO, [make_rows(1, start=100)])
+    with engine.connect() as conn:
+        reservation_id = conn.execute(
+            select(Reservation.id).where(Reservation.performance_id == performance_id)
+        ).scalar()
+
+    response = client.patch(f"/reservations/{reservation_id}/status", json={'status': 'cancelled'})
+    assert response.status_code == 200, response.text
+    assert response.json()['status'] == 'cancelled'
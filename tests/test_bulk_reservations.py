@@ -0,0 +1,57 @@
+"""POST /reservations/bulk 항목별 결과"""
+from sqlalchemy import select, text
+
+from app.models import Reservation
+from conftest import PERFORMANCE_INFO, make_rows
+from storage import save_reservations
+
+
+def test_bulk_reports_each_item(client, engine):
+    performance_id, _ = save_reservations(
+        engine, {**PERFORMANCE_INFO, 'time': '14:00'}, [make_rows(1, start=200)]
+    )
+    items = [
+        {'performance_id': performance_id, 'platform': '인터파크', 'name': '정상'},
+        {'performance_id': performance_id, 'platform': '인터파크', 'quantity': -1},
+        None,
+        'not an object',
+        7,
+        {'performance_id': performance_id + 1000, 'platform': '인터파크'},
+        {'performance_id': performance_id, 'platform': '예스24', 'name': '정상2'},
+    ]
+
+    response = client.post('/reservations/bulk', json={'items': items})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    results = body['results']
+    assert body['created'] == 2 and body['failed'] == 5
+    assert [result['index'] for result in results] == list(range(len(items)))
+    assert results[0]['id'] is not None and results[0]['error'] is None
+    assert results[6]['id'] is not None and results[6]['id'] != results[0]['id']
+    assert 'quantity' in results[1]['error']
+    for index in (2, 3, 4):
+        assert results[index]['id'] is None
+        assert results[index]['error'] == 'Item must be a JSON object'
+    assert results[5]['error'] == 'Performance not found'
+
+
+def test_bulk_ids_match_rows_across_insert_batches(client, engine):
+    performance_id, _ = save_reservations(
+        engine, {**PERFORMANCE_INFO, 'time': '15:00'}, [make_rows(1, start=300)]
+    )
+    items = [
+        {'performance_id': performance_id, 'platform': '인터파크', 'name': f'일괄{i}', 'reservation_number': f'B{i}'}
+        for i in range(1200)
+    ]
+
+    response = client.post('/reservations/bulk', json={'items': items})
+    assert response.status_code == 200, response.text
+    ids = [result['id'] for result in response.json()['results']]
+
+    with engine.connect() as conn:
+        names = dict(conn.execute(select(Reservation.id, Reservation.name).where(Reservation.id.in_(ids))).all())
+        matches = conn.execute(text(
+            "SELECT rowid FROM reservations_fts WHERE reservations_fts MATCH '\"일괄1199\"'"
+        )).scalars().all()
+    assert [names[reservation_id] for reservation_id in ids] == [item['name'] for item in items]
+    assert matches == [ids[-1]]
@@ -0,0 +1,177 @@
+"""POST /checkin/{token}, POST /checkin/batch"""
+from sqlalchemy import select
+
+from app.checkin import CheckinService, get_checkin_service
+from app.models import Reservation, ReservationEvent, ReservationStatus
+from app.routers import checkin as checkin_router
+from conftest import PERFORMANCE_INFO, make_rows
+from storage import claim_checkin, fetch_summary, save_reservations, set_reservation_status
+
+CHECKIN_INFO = {**PERFORMANCE_INFO, 'name': '입장 테스트 공연'}
+
+
+def issue_tickets(client, engine, time, count, start):
+    performance_id, _ = save_reservations(engine, {**CHECKIN_INFO, 'time': time}, [make_rows(count, start=start)])
+    response = client.post(f'/performances/{performance_id}/issue-qr')
+    assert response.status_code == 200, response.text
+    return performance_id, response.json()['tickets']
+
+
+def reservation_status(engine, reservation_id):
+    with engine.connect() as conn:
+        return conn.execute(select(Reservation.status).where(Reservation.id == reservation_id)).scalar()
+
+
+def test_first_scan_admits_and_repeat_scan_is_rejected(client, engine):
+    _, [ticket] = issue_tickets(client, engine, '09:00', 1, start=1000)
+
+    response = client.post(f"/checkin/{ticket['token']}")
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body['status'] == 'checked_in' and body['reservation_id'] == ticket['reservation_id']
+    # 입장 판정은 응답 전에 DB에 반영된다
+    assert reservation_status(engine, ticket['reservation_id']) == ReservationStatus.checked_in
+
+    response = client.post(f"/checkin/{ticket['token']}")
+    assert response.status_code == 409
+    assert response.json()['detail'] == 'Already checked in'
+
+
+def test_unknown_token_is_not_found(client):
+    assert client.post('/checkin/zzzzzzzz').status_code == 404
+
+
+def test_token_that_is_not_issued_is_rejected(client, engine):
+    _, tickets = issue_tickets(client, engine, '09:30', 2, start=1100)
+    cancelled, reserved = (ticket['reservation_id'] for ticket in tickets)
+    # 다른 프로세스(예매 관리 화면 등)의 변경이라 이 API의 토큰 인덱스는 아직 발권 상태로 알고 있다
+    set_reservation_status(engine, cancelled, ReservationStatus.cancelled)
+    set_reservation_status(engine, reserved, ReservationStatus.reserved_assigned)
+
+    for ticket, expected in zip(tickets, (ReservationStatus.cancelled, ReservationStatus.reserved_assigned)):
+        response = client.post(f"/checkin/{ticket['token']}")
+        assert response.status_code == 409
+        assert response.json()['detail'] == f'Reservation is {expected.value}, not issued'
+        assert reservation_status(engine, ticket['reservation_id']) == expected
+
+
+def test_scan_admitted_by_another_worker_is_rejected(client, engine):
+    _, [ticket] = issue_tickets(client, engine, '10:00', 1, start=1200)
+    # 다른 API 워커가 먼저 입장 처리
+    assert claim_checkin(engine, ticket['reservation_id']) is not None
+    assert claim_checkin(engine, ticket['reservation_id']) is None
+
+    response = client.post(f"/checkin/{ticket['token']}")
+    assert response.status_code == 409
+    assert response.json()['detail'] == 'Already checked in'
+
+
+def test_full_write_queue_rejects_scan_without_admitting(client, engine, monkeypatch):
+    _, tickets = issue_tickets(client, engine, '10:30', 2, start=1300)
+    # 쓰기 스레드를 시작하지 않아 첫 입장 이벤트가 자리 하나뿐인 대기열을 계속 차지한다
+    service = CheckinService(engine, queue_size=1, queue_timeout=0)
+    monkeypatch.setattr(checkin_router, 'get_checkin_service', lambda: service)
+
+    assert client.post(f"/checkin/{tickets[0]['token']}").status_code == 200
+    response = client.post(f"/checkin/{tickets[1]['token']}")
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert reservation_status(engine, tickets[1]['reservation_id']) == ReservationStatus.issued
+
+    service.start()
+    service.stop()
+    assert service.backlog == 0
+
+
+def test_write_behind_flush_persists_checked_in_event(client, engine):
+    performance_id, [ticket] = issue_tickets(client, engine, '11:30', 1, start=1400)
+
+    response = client.post(f"/checkin/{ticket['token']}")
+    assert response.status_code == 200, response.text
+    assert get_checkin_service().flush()
+
+    with engine.connect() as conn:
+        events = conn.execute(
+            select(ReservationEvent.previous_status, ReservationEvent.new_status, ReservationEvent.payload)
+            .where(ReservationEvent.reservation_id == ticket['reservation_id'],
+                   ReservationEvent.event_type == 'checked_in')
+        ).all()
+        summary = fetch_summary(conn, performance_id)
+    assert [(event.previous_status, event.new_status) for event in events] == [
+        (ReservationStatus.issued, ReservationStatus.checked_in)
+    ]
+    assert events[0].payload['scanned_at'] == response.json()['checked_in_at'].replace('Z', '+00:00')
+    assert summary['by_status'] == {ReservationStatus.checked_in: 1}
+    assert reservation_status(engine, ticket['reservation_id']) == ReservationStatus.checked_in
+
+
+def upload_scans(client, scans):
+    response = client.post('/checkin/batch', json={'scans': [
+        {'token': token, 'reader_id': reader_id, 'scanned_at': scanned_at} for token, reader_id, scanned_at in scans
+    ]})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def checked_in_events(engine, reservation_id):
+    with engine.connect() as conn:
+        return conn.execute(
+            select(ReservationEvent.payload)
+            .where(ReservationEvent.reservation_id == reservation_id, ReservationEvent.event_type == 'checked_in')
+        ).scalars().all()
+
+
+def test_offline_scans_of_same_token_from_two_readers_earliest_wins(client, engine):
+    _, [ticket] = issue_tickets(client, engine, '12:00', 1, start=1500)
+    # 게이트 두 대가 같은 표를 오프라인으로 스캔했고, 늦게 스캔한 쪽이 먼저 올린다
+    late = upload_scans(client, [(ticket['token'], 'gate-2', '2024-11-25T18:31:00Z')])
+    early = upload_scans(client, [(ticket['token'], 'gate-1', '2024-11-25T18:30:00Z')])
+
+    assert late['results'][0]['verdict'] == 'checked_in'
+    [result] = early['results']
+    assert result['verdict'] == 'checked_in' and early['checked_in'] == 1
+    assert (result['first_reader_id'], result['first_scanned_at']) == ('gate-1', '2024-11-25T18:30:00+00:00')
+
+    # 같은 배치 안에서도 이른 스캔이 이기고 나머지는 중복 스캔이다
+    _, [other] = issue_tickets(client, engine, '12:30', 1, start=1600)
+    body = upload_scans(client, [(other['token'], 'gate-2', '2024-11-25T18:31:00Z'),
+                                 (other['token'], 'gate-1', '2024-11-25T18:30:00Z')])
+    assert [result['verdict'] for result in body['results']] == ['already_checked_in', 'checked_in']
+    assert {result['first_reader_id'] for result in body['results']} == {'gate-1'}
+    assert reservation_status(engine, other['reservation_id']) == ReservationStatus.checked_in
+    assert client.post(f"/checkin/{other['token']}").status_code == 409
+
+
+def test_offline_scan_of_token_revoked_after_bundle_is_rejected(client, engine):
+    _, [ticket] = issue_tickets(client, engine, '13:00', 1, start=1700)
+    # 게이트가 번들을 받은 뒤 예약이 취소됐다
+    set_reservation_status(engine, ticket['reservation_id'], ReservationStatus.cancelled)
+
+    body = upload_scans(client, [(ticket['token'], 'gate-1', '2024-11-25T18:30:00Z'),
+                                 ('zzzzzzzz', 'gate-1', '2024-11-25T18:30:05Z')])
+    assert body['checked_in'] == 0
+    assert [(result['verdict'], result['status']) for result in body['results']] == [
+        ('not_issued', 'cancelled'), ('unknown_token', None),
+    ]
+    assert reservation_status(engine, ticket['reservation_id']) == ReservationStatus.cancelled
+    assert checked_in_events(engine, ticket['reservation_id']) == []
+
+
+def test_resubmitting_same_offline_batch_changes_nothing(client, engine):
+    performance_id, tickets = issue_tickets(client, engine, '13:30', 3, start=1800)
+    scans = [(ticket['token'], 'gate-1', f'2024-11-25T18:3{i}:00Z') for i, ticket in enumerate(tickets)]
+    first = upload_scans(client, scans)
+    assert first['checked_in'] == 3
+    with engine.connect() as conn:
+        summary = fetch_summary(conn, performance_id)
+    events = {ticket['reservation_id']: checked_in_events(engine, ticket['reservation_id']) for ticket in tickets}
+
+    again = upload_scans(client, scans)
+    assert again['checked_in'] == 0
+    assert [result['verdict'] for result in again['results']] == ['already_checked_in'] * 3
+    assert [(result['first_reader_id'], result['first_scanned_at']) for result in again['results']] == [
+        (result['first_reader_id'], result['first_scanned_at']) for result in first['results']
+    ]
+    with engine.connect() as conn:
+        assert fetch_summary(conn, performance_id) == summary
+    assert {ticket['reservation_id']: checked_in_events(engine, ticket['reservation_id']) for ticket in tickets} == events
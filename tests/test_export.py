@@ -0,0 +1,21 @@
+"""예약 리스트 내보내기 캐시"""
+import os
+
+from conftest import PERFORMANCE_INFO, make_rows
+from export import ExportCache, export_reservations
+from storage import save_reservations
+
+
+def test_export_larger_than_cache_budget_is_kept(engine, tmp_path):
+    performance_id, _ = save_reservations(
+        engine, {**PERFORMANCE_INFO, 'time': '11:00'}, [make_rows(200, start=300)]
+    )
+    cache = ExportCache(str(tmp_path), max_bytes=1)
+
+    first = export_reservations(engine, performance_id, 'csv', cache=cache)
+    assert os.path.exists(first)
+
+    # 다음 파일을 만들면 한도를 넘은 이전 파일은 정리되고 새 파일은 남는다
+    second = export_reservations(engine, performance_id, 'xlsx', cache=cache)
+    assert os.path.exists(second)
+    assert not os.path.exists(first)
@@ -0,0 +1,140 @@
+"""예매 파일 병렬 파싱"""
+import os
+from concurrent.futures import Future
+from io import BytesIO
+
+from openpyxl import Workbook, load_workbook
+
+import ingest
+from ingest import parse_files_parallel, parse_workbook
+from parse_cache import ParseCache
+
+
+class Upload:
+    """Streamlit UploadedFile 대역 (name, getvalue)"""
+
+    def __init__(self, name, data):
+        self.name = name
+        self._data = data
+
+    def getvalue(self):
+        return self._data
+
+
+def make_interpark_file(name, rows, start=0):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(['예매번호', '예매자명', '휴대폰번호', '좌석정보', '매수'])
+    for i in range(start, start + rows):
+        sheet.append([f"T{i}", f"예매자{i}", '010-0000-0000', f"A-{i % 20 + 1}", 1])
+    output = BytesIO()
+    workbook.save(output)
+    return Upload(name, output.getvalue())
+
+
+def test_files_are_parsed_before_results_are_read(tmp_path):
+    cache = ParseCache(str(tmp_path), 10 ** 8)
+    uploads = [make_interpark_file('인터파크_1.xlsx', 30), make_interpark_file('인터파크_2.xlsx', 20, start=30)]
+
+    parsed = parse_files_parallel(uploads, max_workers=2, chunk_size=7, cache=cache)
+    # 결과를 읽기 전에 (쓰기 트랜잭션에 들어가기 전에) 두 파일 모두 캐시에 기록되어 있어야 한다
+    assert len([path for path in tmp_path.iterdir() if path.suffix == '.cache']) == 2
+
+    results = [(name, platform, sum(len(chunk) for chunk in chunks), error) for name, platform, chunks, error in parsed]
+    assert results == [('인터파크_1.xlsx', '인터파크', 30, None), ('인터파크_2.xlsx', '인터파크', 20, None)]
+
+
+class InlineExecutor:
+    """ProcessPoolExecutor 대역: 작업 인자를 기록하고 이 프로세스에서 바로 실행"""
+
+    calls = []
+
+    def __init__(self, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, function, *args):
+        self.calls.append(args)
+        future = Future()
+        future.set_result(function(*args))
+        return future
+
+
+def test_workers_get_a_file_path_not_the_upload_bytes(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, 'ProcessPoolExecutor', InlineExecutor)
+    InlineExecutor.calls = []
+    cache = ParseCache(str(tmp_path / 'cache'), 10 ** 8)
+    uploads = [make_interpark_file('인터파크_1.xlsx', 12), make_interpark_file('예매.xlsx', 8, start=12),
+               make_interpark_file('인터파크_1 복사본.xlsx', 12)]
+
+    parsed = parse_files_parallel(uploads, max_workers=2, chunk_size=5, cache=cache)
+    # 같은 내용의 파일은 한 번만, 작업에는 임시 파일 경로와 캐시 키, 파일명으로 감지한 예매처만 넘긴다
+    assert [(type(path), key, hint) for path, key, hint, _, _ in InlineExecutor.calls] == [
+        (str, ingest._cache_key(ingest.file_digest(uploads[0].getvalue()), '인터파크'), '인터파크'),
+        (str, ingest._cache_key(ingest.file_digest(uploads[1].getvalue()), None), None),
+    ]
+    assert [(name, sum(len(chunk) for chunk in chunks), error) for name, _, chunks, error in parsed] == [
+        ('인터파크_1.xlsx', 12, None), ('예매.xlsx', 8, None), ('인터파크_1 복사본.xlsx', 12, None),
+    ]
+    # 임시 파일은 파싱이 끝나면 지운다
+    assert not any(os.path.exists(path) for path, *_ in InlineExecutor.calls)
+
+
+def test_unreadable_file_reports_error(tmp_path):
+    cache = ParseCache(str(tmp_path), 10 ** 8)
+    parsed = list(parse_files_parallel([Upload('broken.xlsx', b'not a workbook')], cache=cache))
+    assert len(parsed) == 1
+    assert parsed[0][3]
+
+
+def test_numeric_booking_numbers_match_across_chunks():
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(['예매번호', '예매자명', '휴대폰번호', '좌석정보', '매수'])
+    sheet.append([12345, '예매자1', '010-0000-0000', 'A-1', 1])
+    sheet.append([12346, '예매자2', '010-0000-0000', 'A-2', 1])
+    sheet.append([12347, '예매자3', '010-0000-0000', 'A-3', 1])
+    sheet.append([None, '예매자4', '010-0000-0000', 'A-4', 1])
+    output = BytesIO()
+    workbook.save(output)
+
+    platform, _, chunks = parse_workbook(output.getvalue(), 'interpark.xlsx', chunk_size=2)
+    assert platform == '인터파크'
+    # 빈 칸이 있는 chunk에서도 숫자 예매번호가 float 문자열로 바뀌지 않아야 한다
+    assert [row['예매번호'] for chunk in chunks for row in chunk] == ['12345', '12346', '12347', '']
+
+
+def test_first_sheet_is_read_when_another_sheet_is_active():
+    upload = make_interpark_file('export.xlsx', 5)
+    workbook = load_workbook(BytesIO(upload.getvalue()))
+    workbook.create_sheet('메모').append(['다른 시트'])
+    workbook.active = 1
+    output = BytesIO()
+    workbook.save(output)
+
+    platform, _, chunks = parse_workbook(output.getvalue(), 'export.xlsx')
+    assert platform == '인터파크'
+    assert sum(len(chunk) for chunk in chunks) == 5
+
+
+def test_same_bytes_under_another_platform_name_are_not_served_from_cache(tmp_path):
+    # 인터파크와 예스24 형식에 모두 맞는 헤더: 파일명 키워드로 예매처를 고른다
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(['예매번호', '주문번호', '예매자명', '휴대폰번호', '좌석정보', '좌석', '매수'])
+    sheet.append(['T1', 'Y1', '예매자1', '010-0000-0000', 'A-1', 'A-1', 1])
+    output = BytesIO()
+    workbook.save(output)
+    data = output.getvalue()
+    cache = ParseCache(str(tmp_path), 10 ** 8)
+
+    for name, platform in (('yes24.xlsx', '예스24'), ('interpark.xlsx', '인터파크')):
+        [(_, parsed_platform, chunks, error)] = parse_files_parallel([Upload(name, data)], cache=cache)
+        assert error is None
+        assert parsed_platform == platform
+        list(chunks)
@@ -0,0 +1,74 @@
+"""POST /reservations/{id}/issue-qr"""
+from sqlalchemy import select
+
+from app.models import Reservation, ReservationEvent, ReservationStatus
+from conftest import PERFORMANCE_INFO, make_rows
+from storage import fetch_data_version, save_reservations, set_reservation_status
+
+
+def reservation_ids(engine, performance_id):
+    with engine.connect() as conn:
+        return list(conn.execute(
+            select(Reservation.id).where(Reservation.performance_id == performance_id).order_by(Reservation.id)
+        ).scalars())
+
+
+def test_token_on_already_issued_reservation_bumps_data_version(client, engine):
+    performance_id, _ = save_reservations(engine, {**PERFORMANCE_INFO, 'time': '12:00'}, [make_rows(1, start=600)])
+    [reservation_id] = reservation_ids(engine, performance_id)
+    # 토큰 없이 발권 상태가 된 예약
+    set_reservation_status(engine, reservation_id, ReservationStatus.issued)
+    with engine.connect() as conn:
+        version = fetch_data_version(conn, performance_id)
+
+    response = client.post(f"/reservations/{reservation_id}/issue-qr")
+    assert response.status_code == 200, response.text
+    with engine.connect() as conn:
+        assert fetch_data_version(conn, performance_id) == version + 1
+
+    # 이미 있는 토큰을 다시 내려주기만 하면 버전은 그대로
+    assert client.post(f"/reservations/{reservation_id}/issue-qr").status_code == 200
+    with engine.connect() as conn:
+        assert fetch_data_version(conn, performance_id) == version + 1
+
+
+def test_checked_in_cancelled_or_expired_reservation_is_not_reissued(client, engine):
+    performance_id, _ = save_reservations(engine, {**PERFORMANCE_INFO, 'time': '13:00'}, [make_rows(3, start=700)])
+    checked_in, cancelled, expired = reservation_ids(engine, performance_id)
+    set_reservation_status(engine, checked_in, ReservationStatus.checked_in)
+    set_reservation_status(engine, cancelled, ReservationStatus.cancelled)
+    set_reservation_status(engine, expired, ReservationStatus.expired)
+
+    for reservation_id, expected in ((checked_in, ReservationStatus.checked_in),
+                                     (cancelled, ReservationStatus.cancelled),
+                                     (expired, ReservationStatus.expired)):
+        response = client.post(f"/reservations/{reservation_id}/issue-qr")
+        assert response.status_code == 409, response.text
+        assert response.json()['detail'] == f'Reservation is {expected.value}'
+        with engine.connect() as conn:
+            assert conn.execute(
+                select(Reservation.status).where(Reservation.id == reservation_id)
+            ).scalar() == expected
+
+
+def test_scanned_ticket_is_not_reissued_for_another_entry(client, engine):
+    performance_id, _ = save_reservations(engine, {**PERFORMANCE_INFO, 'time': '17:00'}, [make_rows(1, start=800)])
+    [reservation_id] = reservation_ids(engine, performance_id)
+    token = client.post(f"/reservations/{reservation_id}/issue-qr").json()['token']
+    assert client.post(f"/checkin/{token}").status_code == 200
+
+    response = client.post(f"/reservations/{reservation_id}/issue-qr")
+    assert response.status_code == 409, response.text
+    assert response.json()['detail'] == 'Reservation is checked_in'
+    with engine.connect() as conn:
+        reservation = conn.execute(
+            select(Reservation.status, Reservation.token).where(Reservation.id == reservation_id)
+        ).one()
+        issued_events = conn.execute(
+            select(ReservationEvent.id).where(ReservationEvent.reservation_id == reservation_id,
+                                              ReservationEvent.event_type == 'qr_issued')
+        ).all()
+    assert (reservation.status, reservation.token) == (ReservationStatus.checked_in, token)
+    assert len(issued_events) == 1
+    # 같은 표로 다시 입장할 수 없다
+    assert client.post(f"/checkin/{token}").status_code == 409
@@ -0,0 +1,101 @@
+"""오프라인 입장 번들 (GET /performances/{id}/offline-bundle)"""
+import zlib
+
+import pytest
+from sqlalchemy import select
+
+from app.models import Reservation, ReservationStatus
+from app.offline import BUNDLE_DELTA, BUNDLE_FULL, _HEADER, apply_bundle
+from conftest import PERFORMANCE_INFO, make_rows
+from storage import save_reservations, set_reservation_status
+
+OFFLINE_INFO = {**PERFORMANCE_INFO, 'name': '오프라인 입장 공연'}
+
+
+def issue_tickets(client, engine, time, count, start):
+    performance_id, _ = save_reservations(engine, {**OFFLINE_INFO, 'time': time}, [make_rows(count, start=start)])
+    response = client.post(f'/performances/{performance_id}/issue-qr')
+    assert response.status_code == 200, response.text
+    return performance_id, response.json()['tickets']
+
+
+def fetch_bundle(client, performance_id, since=None):
+    url = f'/performances/{performance_id}/offline-bundle'
+    response = client.get(url) if since is None else client.get(f'{url}/delta', params={'since': since})
+    assert response.status_code == 200, response.text
+    return response.content, int(response.headers['X-Bundle-Version'])
+
+
+def seat_codes(engine, performance_id):
+    with engine.connect() as conn:
+        return dict(conn.execute(
+            select(Reservation.token, Reservation.seat_info).where(Reservation.performance_id == performance_id)
+        ).all())
+
+
+def test_full_bundle_round_trips_issued_tokens(client, engine):
+    performance_id, tickets = issue_tickets(client, engine, '09:00', 5, start=2000)
+    data, version = fetch_bundle(client, performance_id)
+
+    _, _, kind, bundle_performance, base_version, bundle_version = _HEADER.unpack_from(data)
+    assert (kind, bundle_performance, base_version, bundle_version) == (BUNDLE_FULL, performance_id, 0, version)
+
+    snapshot = apply_bundle(data)
+    seats = seat_codes(engine, performance_id)
+    assert (snapshot.performance_id, snapshot.version) == (performance_id, version)
+    assert snapshot.tokens == {int(ticket['token'], 36): seats[ticket['token']] or '' for ticket in tickets}
+    assert snapshot.revoked == set()
+
+
+def test_token_block_is_sorted_six_byte_numbers(client, engine):
+    performance_id, tickets = issue_tickets(client, engine, '09:30', 20, start=2100)
+    data, _ = fetch_bundle(client, performance_id)
+
+    body = zlib.decompress(data[_HEADER.size:])
+    count = int.from_bytes(body[:4], 'big')
+    block = body[4:4 + count * 6]
+    numbers = [int.from_bytes(block[start:start + 6], 'big') for start in range(0, len(block), 6)]
+    assert count == len(tickets)
+    assert numbers == sorted(int(ticket['token'], 36) for ticket in tickets)
+    assert all(number < 2 ** 42 for number in numbers)
+
+
+def test_delta_since_version_matches_new_full_bundle(client, engine):
+    performance_id, tickets = issue_tickets(client, engine, '10:00', 4, start=2200)
+    base_data, base_version = fetch_bundle(client, performance_id)
+    base = apply_bundle(base_data)
+
+    cancelled, expired = tickets[0], tickets[1]
+    set_reservation_status(engine, cancelled['reservation_id'], ReservationStatus.cancelled)
+    set_reservation_status(engine, expired['reservation_id'], ReservationStatus.expired)
+    delta, version = fetch_bundle(client, performance_id, since=base_version)
+
+    _, _, kind, _, delta_base, delta_version = _HEADER.unpack_from(delta)
+    assert (kind, delta_base, delta_version) == (BUNDLE_DELTA, base_version, version)
+    assert version > base_version
+
+    synced = apply_bundle(delta, base)
+    latest = apply_bundle(fetch_bundle(client, performance_id)[0])
+    assert (synced.version, synced.tokens, synced.revoked) == (latest.version, latest.tokens, latest.revoked)
+    assert synced.revoked == {cancelled['reservation_id'], expired['reservation_id']}
+    assert set(synced.tokens) == {int(ticket['token'], 36) for ticket in tickets[2:]}
+
+    # 받은 델타는 다른 버전의 스냅샷에 적용할 수 없다
+    with pytest.raises(ValueError):
+        apply_bundle(delta, latest)
+
+
+def test_delta_since_unknown_version_is_full_bundle(client, engine):
+    performance_id, _ = issue_tickets(client, engine, '10:30', 2, start=2300)
+    data, version = fetch_bundle(client, performance_id, since=10 ** 9)
+    assert _HEADER.unpack_from(data)[2] == BUNDLE_FULL
+    assert apply_bundle(data).version == version
+
+
+def test_reader_rejects_bad_magic_or_format(client, engine):
+    performance_id, _ = issue_tickets(client, engine, '11:00', 1, start=2400)
+    data, _ = fetch_bundle(client, performance_id)
+
+    for broken in (b'XKOB' + data[4:], data[:4] + bytes([2]) + data[5:], data[:_HEADER.size - 1]):
+        with pytest.raises(ValueError):
+            apply_bundle(broken)
@@ -0,0 +1,59 @@
+"""이전 Streamlit 전용 SQLite 스키마 변환"""
+import os
+import sqlite3
+
+from sqlalchemy import inspect
+
+from app.db import create_db_engine
+from conftest import PERFORMANCE_INFO, TMP_DIR, make_rows
+from storage import create_schema, fetch_performance_sessions, read_transaction, save_reservations
+
+
+def test_legacy_schema_drops_total_reservations():
+    path = os.path.join(TMP_DIR, 'legacy.db')
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE performances (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            performance_name TEXT NOT NULL,
+            performance_date TEXT NOT NULL,
+            performance_time TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            total_reservations INTEGER DEFAULT 0,
+            UNIQUE(performance_name, performance_date, performance_time)
+        );
+        CREATE TABLE reservations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            performance_id INTEGER NOT NULL,
+            platform TEXT NOT NULL,
+            reservation_number TEXT,
+            name TEXT,
+            phone TEXT,
+            seat_info TEXT,
+            quantity INTEGER DEFAULT 0,
+            status TEXT,
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (performance_id) REFERENCES performances (id)
+        );
+        INSERT INTO performances VALUES (1, '테스트 공연', '2024.11.25', '19:00', '2024-11-01T10:00:00',
+                                         '2024-11-01T10:00:00', 2);
+        INSERT INTO reservations VALUES (1, 1, '인터파크', 'T0', '예매자0', '010', 'A-1', 1, '지정', '2024-11-01T10:00:00');
+        INSERT INTO reservations VALUES (2, 1, '인터파크', 'T1', '예매자1', '010', '', 1, '취소', '2024-11-01T10:00:00');
+    ''')
+    conn.commit()
+    conn.close()
+
+    engine = create_db_engine(f'sqlite:///{path}')
+    try:
+        create_schema(engine)
+        with engine.connect() as conn:
+            columns = {column['name'] for column in inspect(conn).get_columns('performances')}
+        assert 'total_reservations' not in columns
+
+        save_reservations(engine, PERFORMANCE_INFO, [make_rows(3)])
+        with read_transaction(engine) as conn:
+            sessions = fetch_performance_sessions(conn, PERFORMANCE_INFO['name'])
+        assert [session[4] for session in sessions] == [3]
+    finally:
+        engine.dispose()
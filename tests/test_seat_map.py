@@ -0,0 +1,95 @@
+"""비트맵 좌석 지도"""
+import pytest
+from sqlalchemy import insert, select
+
+from app.models import Reservation, SeatStatus
+from conftest import PERFORMANCE_INFO, make_rows
+from seat_map import SEAT_AVAILABLE, SEAT_HELD, SEAT_OCCUPIED, SeatLayout, SeatMap, load_seat_map, save_seat_map
+from storage import fetch_seat_map_data, save_reservations, save_seat_map_data, write_transaction
+
+LAYOUT = SeatLayout([
+    {'name': 'VIP', 'rows': ['A'], 'seats_per_row': 10},
+    {'name': 'R', 'rows': ['B', 'C'], 'seats_per_row': 7},
+])
+
+
+def test_layout_maps_codes_to_indexes():
+    assert LAYOUT.size == 24
+    assert LAYOUT.index('A-1') == LAYOUT.index('a01') == 0
+    assert LAYOUT.index('C-7') == 23
+    assert LAYOUT.code(10) == 'B-01'
+    with pytest.raises(KeyError):
+        LAYOUT.index('B-8')
+
+
+def test_hold_occupy_release():
+    seat_map = SeatMap(LAYOUT)
+    assert seat_map.hold('A-3') and not seat_map.hold('A-3')
+    assert seat_map.occupy('A-3') and seat_map.status('A-3') == SEAT_OCCUPIED
+    assert seat_map.hold('B-2')
+    assert (seat_map.held_count, seat_map.occupied_count, seat_map.available_count) == (1, 1, 22)
+    assert seat_map.release('A-3') and not seat_map.release('A-4')
+    assert seat_map.status('A-3') == SEAT_AVAILABLE
+    assert seat_map.seats(SEAT_HELD) == ['B-02']
+
+
+def test_from_statuses_and_bytes_round_trip():
+    seat_map = SeatMap.from_statuses(LAYOUT, [
+        ('A-1', 'occupied'), ('A-1', 'selected'), ('B-3', 'selected'), ('Z-1', 'occupied'), ('C-1', 'available'),
+    ])
+    assert seat_map.seats(SEAT_OCCUPIED) == ['A-01']
+    assert seat_map.seats(SEAT_HELD) == ['B-03']
+
+    restored = SeatMap.from_bytes(LAYOUT, seat_map.to_bytes())
+    assert restored.to_bytes() == seat_map.to_bytes()
+    assert restored.held_count == 1 and restored.occupied_count == 1
+
+    other = SeatLayout([{'name': 'VIP', 'rows': ['A'], 'seats_per_row': 24}])
+    with pytest.raises(ValueError):
+        SeatMap.from_bytes(other, seat_map.to_bytes())
+
+
+def test_layout_from_config():
+    layout = SeatLayout.from_config('뮤지컬 오페라의 유령')
+    assert layout.size == 20 + 15 + 20 * 2
+    assert layout.code(layout.index('D-20')) == 'D-20'
+    assert SeatLayout.from_config('뮤지컬 오페라의 유령') is layout
+    assert SeatLayout.from_config('배치 없는 공연') is None
+
+
+def test_seat_map_is_rebuilt_from_seat_status_and_persisted(engine):
+    performance_id, _ = save_reservations(
+        engine, {'name': '뮤지컬 오페라의 유령', 'date': '2024.12.01', 'time': '19:00'}, [make_rows(2, start=900)]
+    )
+    with write_transaction(engine) as conn:
+        reservation_id = conn.execute(
+            select(Reservation.id).where(Reservation.performance_id == performance_id)
+        ).scalars().first()
+        conn.execute(insert(SeatStatus), [
+            {'reservation_id': reservation_id, 'seat_code': 'A-1', 'status': 'occupied'},
+            {'reservation_id': reservation_id, 'seat_code': 'B-3', 'status': 'selected'},
+        ])
+
+    # 저장된 좌석 지도가 없으면 seat_status로 만들어 저장
+    seat_map = load_seat_map(engine, performance_id)
+    assert seat_map.seats(SEAT_OCCUPIED) == ['A-01'] and seat_map.seats(SEAT_HELD) == ['B-03']
+    with engine.connect() as conn:
+        assert fetch_seat_map_data(conn, performance_id)[1] == seat_map.to_bytes()
+
+    # 이후에는 저장된 비트맵을 읽는다
+    assert seat_map.hold('C-5')
+    save_seat_map(engine, performance_id, seat_map)
+    assert load_seat_map(engine, performance_id).seats(SEAT_HELD) == ['B-03', 'C-05']
+
+    # 다른 배치로 만든 비트맵이면 seat_status로 다시 만든다
+    with write_transaction(engine) as conn:
+        save_seat_map_data(conn, performance_id, SeatMap(LAYOUT).to_bytes())
+    assert load_seat_map(engine, performance_id).seats(SEAT_HELD) == ['B-03']
+
+
+def test_seat_map_needs_a_configured_layout(engine):
+    performance_id, _ = save_reservations(
+        engine, {**PERFORMANCE_INFO, 'date': '2024.12.01'}, [make_rows(1, start=950)]
+    )
+    assert load_seat_map(engine, performance_id) is None
+    assert load_seat_map(engine, performance_id + 1000) is None
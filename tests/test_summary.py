@@ -0,0 +1,66 @@
+"""회차 요약 (예약 리스트 통계 카드)"""
+from sqlalchemy import select
+
+from app.models import PerformanceSummary, Reservation, ReservationStatus
+from conftest import PERFORMANCE_INFO, make_rows
+from storage import (
+    claim_checkin, fetch_performance_sessions, fetch_summary, save_reservations, set_reservation_status,
+    write_transaction,
+)
+from storage.summary import _refresh_summary
+
+
+def summary_rows(engine, performance_id):
+    with engine.connect() as conn:
+        return sorted(tuple(row) for row in conn.execute(
+            select(PerformanceSummary.platform, PerformanceSummary.status, PerformanceSummary.reservations,
+                   PerformanceSummary.seats, PerformanceSummary.assigned)
+            .where(PerformanceSummary.performance_id == performance_id)
+        ))
+
+
+def test_assigned_counts_survive_issue_and_check_in(engine):
+    performance_id, _ = save_reservations(engine, {**PERFORMANCE_INFO, 'time': '16:00'}, [make_rows(10, start=400)])
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(Reservation.id, Reservation.seat_info)
+            .where(Reservation.performance_id == performance_id).order_by(Reservation.id)
+        ).all()
+        assert fetch_summary(conn, performance_id)['assigned'] == 5
+        assert fetch_summary(conn, performance_id)['unassigned'] == 5
+
+    # 지정석 2건, 비지정석 1건 발권 후 지정석 1건 입장, 비지정석 1건 취소
+    assigned = [row.id for row in rows if row.seat_info]
+    unassigned = [row.id for row in rows if not row.seat_info]
+    for reservation_id in (assigned[0], assigned[1], unassigned[0]):
+        set_reservation_status(engine, reservation_id, ReservationStatus.issued)
+    assert claim_checkin(engine, assigned[0]) == (assigned[0], performance_id)
+    set_reservation_status(engine, unassigned[1], ReservationStatus.cancelled)
+
+    with engine.connect() as conn:
+        summary = fetch_summary(conn, performance_id)
+    assert summary['by_status'][ReservationStatus.issued] == 2
+    assert summary['by_status'][ReservationStatus.checked_in] == 1
+    assert (summary['assigned'], summary['unassigned']) == (5, 4)
+
+    # 다시 가져오기(발권/입장 예약은 유지)와 전체 재집계 결과도 같아야 한다
+    save_reservations(engine, {**PERFORMANCE_INFO, 'time': '16:00'}, [make_rows(10, start=400)])
+    incremental = summary_rows(engine, performance_id)
+    with write_transaction(engine) as conn:
+        _refresh_summary(conn, performance_id)
+    assert summary_rows(engine, performance_id) == incremental
+
+
+def test_session_total_includes_api_creates(client, engine):
+    info = {**PERFORMANCE_INFO, 'name': '회차 건수 공연'}
+    performance_id, _ = save_reservations(engine, info, [make_rows(3, start=500)])
+
+    response = client.post('/reservations/bulk', json={'items': [
+        {'performance_id': performance_id, 'platform': '인터파크', 'name': f"API{i}"} for i in range(2)
+    ]})
+    assert response.status_code == 200, response.text
+    set_reservation_status(engine, response.json()['results'][0]['id'], ReservationStatus.cancelled)
+
+    # 가져온 3건 + API로 등록한 2건 - 취소 1건
+    with engine.connect() as conn:
+        assert [session[4] for session in fetch_performance_sessions(conn, info['name'])] == [4]